@@ -2,74 +2,36 @@
 # 3D POWER SYSTEM VISUALIZATION – 9-BUS MULTI-VOLTAGE NETWORK
 # ============================================================
 
+import os
+import sys
+
+import matplotlib
+
+if '--headless' in sys.argv:
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 from matplotlib.lines import Line2D
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import load_grid
+from gridcontrol.network import PQ, PV, SLACK
+from gridcontrol.render import BUS_TYPE_LABELS, draw_network
+from gridcontrol.report import summarize
+
 # --------------------------
 # 1. SYSTEM DEFINITION
 # --------------------------
 
-# Bus positions by voltage level (z-axis represents voltage hierarchy)
-bus_positions = {
-    'Bus_1': (0, 0, 3),     # 132 kV (Swing Bus)
-    'Bus_2': (4, 2, 2),     # 129.4 kV
-    'Bus_3': (8, 0, 2),     # 129.5 kV
-    'Bus_4': (12, 2, 2),    # 129.4 kV
-    'Bus_5': (16, 0, 1),    # 10.76 kV
-    'Bus_6': (20, 2, 1),    # 10.76 kV (Voltage Control)
-    'Bus_7': (12, -2, 2),   # 129.4 kV
-    'Bus_8': (8, -4, 1),    # 10.8 kV (Voltage Control)
-    'Bus_9': (4, -2, 0),    # 0.414 kV
-}
-
-# Bus voltages
-bus_voltages = {
-    'Bus_1': '132.0 kV', 'Bus_2': '129.4 kV', 'Bus_3': '129.5 kV',
-    'Bus_4': '129.4 kV', 'Bus_5': '10.76 kV', 'Bus_6': '10.76 kV',
-    'Bus_7': '129.4 kV', 'Bus_8': '10.8 kV',  'Bus_9': '0.414 kV'
-}
-
-# Bus types
-bus_types = {
-    'Bus_1': 'Swing Bus',
-    'Bus_6': 'Voltage Control',
-    'Bus_8': 'Voltage Control'
-}
-
-# Transmission line connections
-connections = [
-    ('Bus_2', 'Bus_3'),
-    ('Bus_3', 'Bus_4'),
-    ('Bus_5', 'Bus_6')
-]
-
-# Transformers
-transformers = {
-    'T1 (50 MVA)': ('Bus_1', 'Bus_2'),
-    'T3 (25 MVA)': ('Bus_5', 'Bus_4'),
-    'T7 (30 MVA)': ('Bus_8', 'Bus_3'),
-    'T10 (15 MVA)': ('Bus_8', 'Bus_9'),
-    'T12 (20 MVA)': ('Bus_6', 'Bus_7')
-}
-
-# Generators
-generators = {
-    'Gen1 (Swing Bus)': 'Bus_1',
-    'Gen2 (60 MW)': 'Bus_6',
-    'Gen3 (40 MW)': 'Bus_8'
-}
-
-# Loads
-loads = {
-    'Load (45.2 MW, 32.1 Mvar)': 'Bus_2',
-    'Load (28.7 MW, 22.3 Mvar)': 'Bus_3',
-    'Load (33.6 MW, 25.8 Mvar)': 'Bus_4',
-    'Load (18.9 MW, 15.2 Mvar)': 'Bus_5',
-    'Load (22.4 MW, 17.8 Mvar)': 'Bus_7',
-    'Load (12.3 MW, 9.6 Mvar)': 'Bus_9'
-}
+# Network topology, ratings and voltages (gridcontrol/grids/grid5.py)
+net = load_grid(5)
+pos = net.bus_xyz
+kv_labels = np.char.add(net.bus_kv.astype(str), ' kV')
+type_labels = BUS_TYPE_LABELS[net.bus_type]
+line_idx = np.flatnonzero(net.lines)
+xfmr_idx = np.flatnonzero(net.transformers)
+summary = summarize(net)
+system = summary['system']
 
 # --------------------------
 # 2. PLOTTING STARTS
@@ -86,61 +48,27 @@ voltage_colors = {
     0: 'orange'    # 0.4 kV
 }
 
-# Plot buses
-for bus, (x, y, z) in bus_positions.items():
-    color = voltage_colors[z]
-    size = 150
-    if bus == 'Bus_1':
-        marker = 'D'
-        size = 250
-    elif bus in ['Bus_6', 'Bus_8']:
-        marker = 's'
-        size = 200
-    else:
-        marker = 'o'
-    
-    ax.scatter(x, y, z, color=color, s=size, alpha=0.8, edgecolor='black', marker=marker)
-    v_str = bus_voltages[bus]
-    label_type = bus_types.get(bus, 'Load Bus')
-    ax.text(x, y, z + 0.2, f"{bus}\n{v_str}\n{label_type}", ha='center', va='bottom',
-            fontsize=8, weight='bold', color='black')
-
-# Transmission lines
-for b1, b2 in connections:
-    x_vals = [bus_positions[b1][0], bus_positions[b2][0]]
-    y_vals = [bus_positions[b1][1], bus_positions[b2][1]]
-    z_vals = [bus_positions[b1][2], bus_positions[b2][2]]
-    ax.plot(x_vals, y_vals, z_vals, color='gray', linewidth=2, alpha=0.7)
-
-# Transformers
-for name, (b1, b2) in transformers.items():
-    x_vals = [bus_positions[b1][0], bus_positions[b2][0]]
-    y_vals = [bus_positions[b1][1], bus_positions[b2][1]]
-    z_vals = [bus_positions[b1][2], bus_positions[b2][2]]
-    ax.plot(x_vals, y_vals, z_vals, color='purple', linewidth=3, alpha=0.8)
-    
-    # Midpoint label and symbol
-    mx, my, mz = np.mean(x_vals), np.mean(y_vals), np.mean(z_vals)
-    ax.scatter(mx, my, mz, color='purple', marker='s', s=100)
-    ax.text(mx, my, mz + 0.15, name, fontsize=7, color='purple', ha='center')
-
-# Generators
-for gen, bus in generators.items():
-    x, y, z = bus_positions[bus]
-    gen_z = z + 0.8
-    ax.plot([x, x], [y, y], [z, gen_z], color='darkgreen', linewidth=2)
-    ax.scatter(x, y, gen_z, color='darkgreen', marker='^', s=120)
-    ax.text(x + 0.5, y, gen_z + 0.1, gen, color='darkgreen', fontsize=8)
-
-# Loads
-offset = 0
-for load, bus in loads.items():
-    x, y, z = bus_positions[bus]
-    load_z = z - 0.8 - offset * 0.1
-    ax.plot([x, x], [y, y], [z, load_z], color='darkred', linewidth=2)
-    ax.scatter(x, y, load_z, color='darkred', marker='v', s=100)
-    ax.text(x - 0.5, y, load_z - 0.1, load, color='darkred', fontsize=7)
-    offset += 1
+# Buses coloured by voltage level and shaped by type; branches, generators
+# and loads as batched collections
+artists = draw_network(ax, net, style={
+    'bus_color': [voltage_colors[int(z)] for z in pos[:, 2]],
+    'bus_markers': {SLACK: ('D', 250), PV: ('s', 200), PQ: ('o', 150)},
+    'bus_label': '{name}\n{kv} kV\n{type}',
+    'bus_label_dz': 0.2,
+    'bus_label_kw': {'ha': 'center', 'va': 'bottom', 'fontsize': 8, 'weight': 'bold', 'color': 'black'},
+    'xfmr_color': 'purple',
+    'xfmr_label_dz': 0.15,
+    'gen_color': 'darkgreen',
+    'gen_height': 0.8,
+    'gen_alpha': 1.0,
+    'gen_label_dz': 0.1,
+    'load_color': 'darkred',
+    'load_drop': 0.8,
+    'load_step': 0.1,
+    'load_alpha': 1.0,
+    'load_label_dz': -0.1,
+    'symbol_alpha': 1.0,
+})
 
 # Voltage planes
 xx, yy = np.meshgrid(np.linspace(-2, 22, 8), np.linspace(-5, 4, 8))
@@ -154,7 +82,7 @@ for level, color, label in plane_defs:
     ax.text(22, 0, level, label, fontsize=10, weight='bold')
 
 # Axis settings
-ax.set_title('Grid 5: IEEE 9 Bus Network', fontsize=16, fontweight='bold')
+ax.set_title(net.title, fontsize=16, fontweight='bold')
 ax.set_xlabel('X-axis (Geographic Distance)', fontsize=12)
 ax.set_ylabel('Y-axis (Geographic Distance)', fontsize=12)
 ax.set_zlabel('Z-axis (Voltage Level)', fontsize=12)
@@ -183,103 +111,74 @@ print("9-BUS HIERARCHICAL POWER SYSTEM DETAILED SUMMARY - GRID TOPOLOGY")
 print("="*70)
 
 print(f"\nSYSTEM OVERVIEW:")
-print(f"├── Total Buses: {len(bus_positions)}")
-print(f"├── Total Generators: {len(generators)}")
-print(f"├── Total Loads: {len(loads)}")
-print(f"├── Total Transmission Lines: {len(connections)}")
-print(f"└── Total Transformers: {len(transformers)}")
+print(f"├── Total Buses: {net.n_bus}")
+print(f"├── Total Generators: {len(net.gen_bus)}")
+print(f"├── Total Loads: {len(net.load_bus)}")
+print(f"├── Total Transmission Lines: {len(line_idx)}")
+print(f"└── Total Transformers: {len(xfmr_idx)}")
 
 print(f"\nBUS INFORMATION & VOLTAGE RATINGS:")
 print("-" * 50)
-for i, (bus, voltage) in enumerate(bus_voltages.items(), 1):
-    bus_type = bus_types.get(bus, 'Load Bus')
-    pos = bus_positions[bus]
-    print(f"{i:2d}. {bus:<8} | Voltage: {voltage:<12} | Type: {bus_type:<15} | Position: {pos}")
+for i, (bus, voltage, bus_type, p) in enumerate(zip(net.bus_names, kv_labels, type_labels, pos), 1):
+    print(f"{i:2d}. {bus:<8} | Voltage: {voltage:<12} | Type: {bus_type:<15} | Position: {tuple(p.astype(int).tolist())}")
 
 print(f"\nBUS CONNECTIONS (TRANSMISSION LINES):")
 print("-" * 50)
-for i, (bus1, bus2) in enumerate(connections, 1):
-    v1 = bus_voltages.get(bus1, 'N/A')
-    v2 = bus_voltages.get(bus2, 'N/A')
-    print(f"{i:2d}. {bus1} ({v1}) ↔ {bus2} ({v2})")
+for i, (f, t) in enumerate(zip(net.branch_from[line_idx], net.branch_to[line_idx]), 1):
+    print(f"{i:2d}. {net.bus_names[f]} ({kv_labels[f]}) ↔ {net.bus_names[t]} ({kv_labels[t]})")
 
 print(f"\nTRANSFORMER CONNECTIONS:")
 print("-" * 50)
-for i, (trans_name, (bus1, bus2)) in enumerate(transformers.items(), 1):
-    v1 = bus_voltages.get(bus1, 'N/A')
-    v2 = bus_voltages.get(bus2, 'N/A')
-    print(f"{i}. {trans_name}")
-    print(f"   └── {bus1} ({v1}) ↔ {bus2} ({v2})")
+for i, k in enumerate(xfmr_idx, 1):
+    f, t = net.branch_from[k], net.branch_to[k]
+    print(f"{i}. {net.branch_names[k]}")
+    print(f"   └── {net.bus_names[f]} ({kv_labels[f]}) ↔ {net.bus_names[t]} ({kv_labels[t]})")
 
 print(f"\nGENERATOR CONNECTIONS:")
 print("-" * 50)
-total_gen_capacity = 100.0  # Swing + 60 MW + 40 MW
-for i, (gen_name, bus) in enumerate(generators.items(), 1):
-    voltage = bus_voltages.get(bus, 'N/A')
+total_gen_capacity = system['gen_mw']
+for i, (gen_name, b) in enumerate(zip(net.gen_names, net.gen_bus), 1):
     print(f"{i}. {gen_name}")
-    print(f"   └── Connected to: {bus} ({voltage})")
+    print(f"   └── Connected to: {net.bus_names[b]} ({kv_labels[b]})")
 print(f"\nTotal Generation Capacity: {total_gen_capacity} MW")
 
 print(f"\nLOAD CONNECTIONS:")
 print("-" * 50)
-total_load_capacity = 161.1  # Total load capacity
-for i, (load_name, bus) in enumerate(loads.items(), 1):
-    voltage = bus_voltages.get(bus, 'N/A')
+total_load_capacity = system['load_mva']
+for i, (load_name, b) in enumerate(zip(net.load_names, net.load_bus), 1):
     print(f"{i:2d}. {load_name}")
-    print(f"    └── Connected to: {bus} ({voltage})")
-print(f"\nTotal Load Capacity: {total_load_capacity} MVA")
+    print(f"    └── Connected to: {net.bus_names[b]} ({kv_labels[b]})")
+print(f"\nTotal Load Capacity: {total_load_capacity:.1f} MVA")
 
 print(f"\nVOLTAGE LEVEL ANALYSIS:")
 print("-" * 50)
-voltage_levels = {}
-for bus, voltage in bus_voltages.items():
-    if voltage not in voltage_levels:
-        voltage_levels[voltage] = []
-    voltage_levels[voltage].append(bus)
-
-for voltage, buses in sorted(voltage_levels.items(), key=lambda x: float(x[0].split()[0]), reverse=True):
-    print(f"• {voltage}: {', '.join(buses)}")
+for level in summary['levels']:
+    print(f"• {level['kv']:g} kV: {', '.join(level['bus_names'])}")
 
 print(f"\nSYSTEM CHARACTERISTICS:")
 print("-" * 50)
-print(f"• Voltage Range: 0.414 kV to 132.0 kV")
-print(f"• Voltage Levels: 4 (132 kV, 129 kV, 11 kV, 0.4 kV)")
-print(f"• High Voltage Level: 132.0 kV ({len([v for v in bus_voltages.values() if v == '132.0 kV'])} bus)")
-print(f"• Transmission Level: 129.4-129.5 kV ({len([v for v in bus_voltages.values() if '129' in v])} buses)")
-print(f"• Sub-transmission Level: 10.76-10.8 kV ({len([v for v in bus_voltages.values() if '10.' in v])} buses)")
-print(f"• Distribution Level: 0.414 kV ({len([v for v in bus_voltages.values() if v == '0.414 kV'])} bus)")
-print(f"• Generation-Load Ratio: {total_gen_capacity/total_load_capacity:.2f}")
-print(f"• Total Transformer Capacity: 140 MVA")
+print(f"• Voltage Range: {system['kv_min']} kV to {system['kv_max']} kV")
+level_kv = ', '.join(f"{level['kv']:g} kV" for level in summary['levels'])
+print(f"• Voltage Levels: {system['levels']} ({level_kv})")
+roles = ['High Voltage', 'Transmission', 'Sub-transmission', 'Distribution']
+for role, level in zip(roles, summary['levels']):
+    kv_range = f"{level['kv_min']}" if level['kv_min'] == level['kv_max'] else f"{level['kv_min']}-{level['kv_max']}"
+    print(f"• {role} Level: {kv_range} kV ({level['buses']} {'bus' if level['buses'] == 1 else 'buses'})")
+print(f"• Generation-Load Ratio: {system['gen_load_ratio']:.2f}")
+print(f"• Total Transformer Capacity: {system['transformer_mva']:g} MVA")
 print(f"• Network Type: Hierarchical multi-voltage power system")
 print(f"• Topology: Radial with interconnections at transmission level")
-print(f"• System Frequency: 50 Hz")
+print(f"• System Frequency: {net.frequency:g} Hz")
 
 print(f"\nLOAD DISTRIBUTION BY VOLTAGE LEVEL:")
 print("-" * 50)
-load_details = {
-    'Bus_2 (129.4 kV)': '45.2 MW, 32.1 Mvar',
-    'Bus_3 (129.5 kV)': '28.7 MW, 22.3 Mvar',
-    'Bus_4 (129.4 kV)': '33.6 MW, 25.8 Mvar',
-    'Bus_5 (10.76 kV)': '18.9 MW, 15.2 Mvar',
-    'Bus_7 (129.4 kV)': '22.4 MW, 17.8 Mvar',
-    'Bus_9 (0.414 kV)': '12.3 MW, 9.6 Mvar'
-}
-
-for bus, load_info in load_details.items():
-    print(f"• {bus}: {load_info}")
+for load in summary['loads_by_bus']:
+    print(f"• {load['bus']} ({load['kv']} kV): {load['mw']:g} MW, {load['mvar']:g} Mvar")
 
 print(f"\nTRANSFORMER CAPACITY ANALYSIS:")
 print("-" * 50)
-transformer_details = {
-    'T1 (50 MVA)': '132 kV → 129.4 kV',
-    'T3 (25 MVA)': '10.76 kV → 129.4 kV',
-    'T7 (30 MVA)': '10.8 kV → 129.5 kV',
-    'T10 (15 MVA)': '10.8 kV → 0.414 kV',
-    'T12 (20 MVA)': '10.76 kV → 129.4 kV'
-}
-
-for trans, connection in transformer_details.items():
-    print(f"• {trans}: {connection}")
+for xf in summary['transformers']:
+    print(f"• {xf['name']}: {xf['from_kv']:g} kV → {xf['to_kv']:g} kV")
 
 print("\n" + "="*70)
 
@@ -289,4 +188,18 @@ ax.view_init(elev=25, azim=45)
 # Adjust layout
 plt.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
 
-plt.show()
+# Live mode: animate load-flow voltages and branch loading over the diagram
+if '--live' in sys.argv:
+    from gridcontrol.grids import load_case
+    from gridcontrol.live import LiveDashboard, load_flow_stream
+    case = load_case(5)
+    anim = LiveDashboard(ax, net, artists, case).animate(load_flow_stream(case))
+
+# Display the plot (or save it without a display)
+if '--headless' in sys.argv:
+    # Next to this script unless --out DIR is given
+    out = (sys.argv[sys.argv.index('--out') + 1] if '--out' in sys.argv
+           else os.path.dirname(os.path.abspath(__file__)))
+    fig.savefig(os.path.join(out, 'grid5_SLD.png'), dpi=100)
+else:
+    plt.show()
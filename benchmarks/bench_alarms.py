@@ -0,0 +1,58 @@
+"""Alarm evaluation time per tick vs. measurement point count.
+
+Usage: python benchmarks/bench_alarms.py [--grids 5] [--buses 100 1000] [--rate 1000] [--period 0.5]
+
+Builds a hub of ``--grids`` synthetic grids of each size streaming bus
+voltages, injections and branch loadings at ``--rate`` samples/s, writes
+one evaluation period of rows to every grid and times
+:meth:`AlarmEngine.tick` over all points.  ``load`` is the fraction of the
+period spent evaluating.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.alarms import AlarmEngine
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.telemetry import SimulatedSource, TelemetryHub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grids', type=int, default=5)
+    parser.add_argument('--buses', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--rate', type=float, default=1000.0)
+    parser.add_argument('--period', type=float, default=0.5)
+    parser.add_argument('--ticks', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = int(args.rate * args.period)
+    print(f"{'buses':>6} {'points':>7} {'rows/tick':>9} {'tick ms':>8} {'load':>6} {'events':>7}")
+    for n in args.buses:
+        net = synthetic_network(n)
+        hub = TelemetryHub(capacity=2 * rows)
+        sources = []
+        for g in range(args.grids):
+            name = f'{net.name}-{g}'
+            hub.add_grid(name, net.bus_names, branch_names=net.branch_names)
+            sources.append((hub.streams[name], SimulatedSource(net, args.rate, seed=g, branches=True)))
+        engine = AlarmEngine(hub, limits={'vm': {'rate': 0.02}, 'loading': {'high': 0.8}})
+        times = []
+        for _ in range(args.ticks):
+            for stream, source in sources:
+                stream.write(*source.sample(rows))
+            t0 = time.perf_counter()
+            engine.tick()
+            times.append(time.perf_counter() - t0)
+        tick = np.median(times)
+        print(f'{n:6d} {len(engine):7d} {rows * args.grids:9d} {tick * 1e3:8.2f} '
+              f'{tick / args.period:6.1%} {engine.log.seq:7d}')
+
+
+if __name__ == '__main__':
+    main()
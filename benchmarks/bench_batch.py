@@ -0,0 +1,41 @@
+"""Batch runner wall-clock time vs. worker count.
+
+Usage: python benchmarks/bench_batch.py [--variants 16] [--buses 500] [--workers 1 4]
+
+Runs the load-flow, short-circuit and summary studies (``--render`` adds
+the SLD images) for ``--variants`` synthetic feeders into a temporary
+directory, once per worker count.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.batch import run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variants', type=int, default=16)
+    parser.add_argument('--buses', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--render', action='store_true')
+    args = parser.parse_args()
+
+    specs = [f'synthetic:{args.buses}:{seed}' for seed in range(args.variants)]
+    studies = ['loadflow', 'shortcircuit', 'summary'] + (['render'] if args.render else [])
+    print(f"{'workers':>7} {'tasks':>6} {'failed':>6} {'time':>8} {'tasks/s':>8}")
+    for workers in dict.fromkeys(args.workers):
+        with tempfile.TemporaryDirectory() as out:
+            t0 = time.perf_counter()
+            results = run_batch(specs, out, studies, workers)
+            elapsed = time.perf_counter() - t0
+        failed = sum(not r.ok for r in results)
+        print(f'{workers:7d} {len(results):6d} {failed:6d} {elapsed:7.2f}s {len(results) / elapsed:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
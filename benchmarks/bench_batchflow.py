@@ -0,0 +1,73 @@
+"""Batched multi-scenario Newton-Raphson vs. looping the single-case solver.
+
+Usage: python benchmarks/bench_batchflow.py [--scenarios 1000] [--sizes 300]
+
+For grid1-grid5 (and synthetic networks of ``--sizes`` buses) draws
+``--scenarios`` random load levels (+-20% per bus) and solves them with
+``newton_raphson`` in a loop, with the loop reusing Ybus and the Jacobian
+structure, and with one ``newton_raphson_batch`` call.  ``max |dV|`` is the
+largest voltage difference between the batched and looped solutions.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.powerflow import (JacobianStructure, batch_injections, bus_sets, newton_raphson,
+                                   newton_raphson_batch)
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.ybus import make_ybus
+
+
+def loop(net, scale, **kw):
+    pd0, qd0 = net.pd.copy(), net.qd.copy()
+    V = np.empty((len(scale), net.n_bus), dtype=complex)
+    try:
+        for k, s in enumerate(scale):
+            net.pd[:], net.qd[:] = pd0 * s, qd0 * s
+            V[k] = newton_raphson(net, **kw).V
+    finally:
+        net.pd[:], net.qd[:] = pd0, qd0
+    return V
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[300])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    nets = [load_case(g) for g in GRIDS] + [synthetic_network(n) for n in args.sizes]
+    print(f"{'network':<14} {'buses':>6} {'loop/s':>9} {'reuse/s':>9} {'batch/s':>9} "
+          f"{'speedup':>8} {'max |dV|':>9}")
+    for net in nets:
+        scale = rng.uniform(0.8, 1.2, (args.scenarios, net.n_bus))
+        ybus = make_ybus(net)
+        _, pv, pq = bus_sets(net.bus_type)
+        jac = JacobianStructure(ybus, np.concatenate((pv, pq)), pq)
+
+        t0 = time.perf_counter()
+        v_loop = loop(net, scale)
+        t_loop = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        loop(net, scale, ybus=ybus, jac=jac)
+        t_reuse = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        sbus = batch_injections(net, pd=net.pd * scale, qd=net.qd * scale)
+        result = newton_raphson_batch(net, sbus, ybus=ybus, jac=jac)
+        t_batch = time.perf_counter() - t0
+
+        n = args.scenarios
+        print(f'{net.name:<14} {net.n_bus:6d} {n / t_loop:9.0f} {n / t_reuse:9.0f} '
+              f'{n / t_batch:9.0f} {t_loop / t_batch:7.1f}x {np.abs(result.V - v_loop).max():9.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Continuation power flow time vs. network size.
+
+Usage: python benchmarks/bench_cpf.py [--sizes 300 1000 3000] [--buses 16] [--workers 1 4]
+
+For grid1-grid5 and synthetic networks of ``--sizes`` buses traces the PV
+curve of the all-loads direction to the nose and reports the margin, the
+continuation steps and LU factorizations, then times
+:func:`loadability` on ``--buses`` load buses (all of them for the study
+grids) for each ``--workers`` count.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.cpf import loadability, trace
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.network import SLACK
+from gridcontrol.synthetic import synthetic_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[300, 1000, 3000])
+    parser.add_argument('--buses', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    nets = [load_case(g) for g in GRIDS] + [synthetic_network(n) for n in args.sizes]
+    workers = sorted(set(args.workers))
+    print(f"{'network':<14} {'buses':>6} {'margin MW':>10} {'steps':>5} {'LU':>5} {'trace':>8} {'loads':>5} "
+          + ' '.join(f'{"w=" + str(w):>8}' for w in workers))
+    for net in nets:
+        t0 = time.perf_counter()
+        curve = trace(net)
+        elapsed = time.perf_counter() - t0
+        loads = np.flatnonzero((net.pd > 0) & (net.bus_type != SLACK))
+        if len(loads) > args.buses and net.n_bus > 9:
+            loads = loads[np.linspace(0, len(loads) - 1, args.buses).astype(int)]
+        times = []
+        for w in workers:
+            t0 = time.perf_counter()
+            loadability(net, loads, workers=w)
+            times.append(time.perf_counter() - t0)
+        print(f'{net.name:<14} {net.n_bus:6d} {curve.margin:10.1f} {curve.steps:5d} {curve.factorizations:5d} '
+              f'{elapsed:7.3f}s {len(loads):5d} ' + ' '.join(f'{t:7.3f}s' for t in times))
+
+
+if __name__ == '__main__':
+    main()
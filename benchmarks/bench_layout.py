@@ -0,0 +1,51 @@
+"""Automatic SLD layout time: first layout vs. cached lookups.
+
+Usage: python benchmarks/bench_layout.py [--sizes 1000 10000] [--iterations 50]
+
+Lays out synthetic networks from their branch graph alone, then repeats
+the call served from memory and from the on-disk cache (a temporary
+directory).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.layout import clear_cache, layout
+from gridcontrol.synthetic import synthetic_network
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'branches':>8} {'layout':>9} {'memory':>9} {'disk':>9} {'edge mean/max':>14}")
+    for n in args.sizes:
+        net = synthetic_network(n)
+        with tempfile.TemporaryDirectory() as directory:
+            clear_cache()
+            run = lambda: layout(net, iterations=args.iterations, directory=directory)
+            xyz, cold = timed(run)
+            _, memory = timed(run)
+            clear_cache()
+            _, disk = timed(run)
+        length = np.hypot(*(xyz[net.branch_to, :2] - xyz[net.branch_from, :2]).T)
+        print(f'{n:7d} {net.n_branch:8d} {cold:8.2f}s {memory * 1e3:7.2f}ms {disk * 1e3:7.2f}ms '
+              f'{length.mean():6.2f}/{length.max():<6.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Live dashboard frame time: blitting vs. full redraw.
+
+Usage: python benchmarks/bench_live.py [--sizes 9 300 1000] [--frames 30]
+
+Each frame applies a new set of bus voltages and branch loadings to a
+:class:`LiveDashboard` over a drawn synthetic network.  ``blit`` updates the
+drawn artists in place and redraws only them over the cached
+background; ``redraw`` does the same update followed by a full canvas draw,
+which is what re-plotting every tick costs at best.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.live import LiveDashboard, frame_times
+from gridcontrol.render import draw_network
+from gridcontrol.synthetic import synthetic_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[9, 300, 1000])
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'mode':<7} {'frame':>9} {'fps':>7}")
+    for n in args.sizes:
+        net = synthetic_network(n)
+        rng = np.random.default_rng(0)
+        frames = [(1.0 + 0.03 * rng.standard_normal(net.n_bus), rng.uniform(0, 1.1, net.n_branch))
+                  for _ in range(args.frames)]
+        fig = plt.figure(figsize=(10, 8))
+        ax = fig.add_subplot(111, projection='3d')
+        dash = LiveDashboard(ax, net, draw_network(ax, net))
+        fig.canvas.draw()
+
+        t = np.median(frame_times(dash, frames))
+        print(f'{n:7d} {"blit":<7} {t * 1e3:7.2f}ms {1 / t:7.1f}')
+
+        times = []
+        for frame in frames[:max(3, args.frames // 5)]:
+            t0 = time.perf_counter()
+            dash.update(frame)
+            fig.canvas.draw()
+            times.append(time.perf_counter() - t0)
+        t = np.median(times)
+        print(f'{n:7d} {"redraw":<7} {t * 1e3:7.2f}ms {1 / t:7.1f}')
+        plt.close(fig)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Headless PNG export time: template reuse and worker count.
+
+Usage: python benchmarks/bench_plots.py [--variants 8] [--buses 200] [--workers 1 4]
+
+Exports every plot of ``--variants`` synthetic feeders into a temporary
+directory, once per worker count, after timing one plot drawn into a
+fresh figure against the cached template.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol import plots
+from gridcontrol.powerflow import solve
+from gridcontrol.synthetic import synthetic_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variants', type=int, default=8)
+    parser.add_argument('--buses', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    result = solve(synthetic_network(args.buses))
+    with tempfile.TemporaryDirectory() as out:
+        path = os.path.join(out, 'p.png')
+        for label, reset in (('fresh figure', True), ('template', False)):
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                if reset:
+                    plots._templates.clear()
+                plots.draw_load_flow('active_power', result).save(path)
+            print(f'{label:>12}: {(time.perf_counter() - t0) / args.repeat * 1e3:7.1f} ms/plot')
+
+    specs = [f'synthetic:{args.buses}:{seed}' for seed in range(args.variants)]
+    print(f"\n{'workers':>7} {'images':>7} {'time':>8} {'images/s':>9}")
+    for workers in dict.fromkeys(args.workers):
+        with tempfile.TemporaryDirectory() as out:
+            t0 = time.perf_counter()
+            paths = plots.export_all(specs, out, workers=workers)
+            elapsed = time.perf_counter() - t0
+        print(f'{workers:7d} {len(paths):7d} {elapsed:7.2f}s {len(paths) / elapsed:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Load-flow solve time vs. network size for each solver mode.
+
+Usage: python benchmarks/bench_powerflow.py [--sizes 1000 10000] [--repeat 3]
+
+Modes are the sparse solvers of :mod:`gridcontrol.powerflow` plus a dense
+baseline that keeps the MATLAB scripts' structure (full Ybus, full Jacobian,
+dense solve) but is vectorized with NumPy so it can run at all beyond nine
+buses; it is skipped above ``--dense-max`` buses.  For the fast-decoupled and
+DC modes, ``reuse`` is the time of a repeated solve with the factors of the
+first one.  ``max |dV|`` is the largest complex voltage difference from NR.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.powerflow import bus_injections, bus_sets, initial_voltage, solve
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.ybus import make_ybus
+
+
+def dense_newton_raphson(net, tol=1e-6, max_iter=30):
+    ybus = make_ybus(net).toarray()
+    ref, pv, pq = bus_sets(net.bus_type)
+    pvpq = np.concatenate((pv, pq))
+    sbus = bus_injections(net)
+    V = initial_voltage(net)
+    vm, va = np.abs(V), np.angle(V)
+    n_a = len(pvpq)
+    for it in range(max_iter + 1):
+        ibus = ybus @ V
+        mis = V * np.conj(ibus) - sbus
+        F = np.concatenate((mis.real[pvpq], mis.imag[pq]))
+        if np.abs(F).max() < tol:
+            return V, it
+        if it == max_iter:
+            break
+        diag_v = np.diag(V)
+        diag_i = np.diag(ibus)
+        diag_vn = np.diag(V / np.abs(V))
+        ds_dva = 1j * diag_v @ np.conj(diag_i - ybus @ diag_v)
+        ds_dvm = diag_v @ np.conj(ybus @ diag_vn) + np.conj(diag_i) @ diag_vn
+        J = np.block([
+            [ds_dva.real[np.ix_(pvpq, pvpq)], ds_dvm.real[np.ix_(pvpq, pq)]],
+            [ds_dva.imag[np.ix_(pq, pvpq)], ds_dvm.imag[np.ix_(pq, pq)]],
+        ])
+        dx = np.linalg.solve(J, -F)
+        va[pvpq] += dx[:n_a]
+        vm[pq] += dx[n_a:]
+        V = vm * np.exp(1j * va)
+    return V, -1
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dense-max', type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = [load_case(g) for g in GRIDS] + [synthetic_network(n) for n in args.sizes]
+    print(f"{'case':<16} {'buses':>6} {'mode':<6} {'iter':>4} {'solve':>10} {'reuse':>10} "
+          f"{'max |dV|':>9}")
+    for net in cases:
+        nr = None
+        for mode in ('nr', 'fdxb', 'fdbx', 'dc', 'dense'):
+            if mode == 'dense':
+                if net.n_bus > args.dense_max:
+                    continue
+                t, (V, it) = timed(lambda: dense_newton_raphson(net), args.repeat)
+                reuse = ''
+            else:
+                t, res = timed(lambda: solve(net, mode), args.repeat)
+                V, it = res.V, res.iterations
+                reuse = ''
+                if res.factors is not None:
+                    t_reuse, _ = timed(lambda: solve(net, mode, factors=res.factors), args.repeat)
+                    reuse = f'{t_reuse * 1e3:8.2f}ms'
+            if nr is None:
+                nr = V
+            print(f'{net.name:<16} {net.n_bus:6d} {mode:<6} {it:4d} {t * 1e3:8.2f}ms {reuse:>10} '
+                  f'{np.abs(V - nr).max():9.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Probabilistic load-flow throughput and sketch memory vs. sample count.
+
+Usage: python benchmarks/bench_probabilistic.py [--grid grid3] [--buses 0] [--samples 10000 100000] [--workers 1 4]
+
+Runs the Monte-Carlo load flow for each sample count and worker count and
+reports samples per second, the (constant) sketch size and the P95 voltage
+at the weakest bus.  Runs with the same seed give the same sketches for
+any worker count.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import load_case
+from gridcontrol.probabilistic import probabilistic_load_flow
+from gridcontrol.synthetic import synthetic_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grid', default='grid3')
+    parser.add_argument('--buses', type=int, default=0)
+    parser.add_argument('--samples', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    net = synthetic_network(args.buses) if args.buses else load_case(args.grid)
+    print(repr(net))
+    print(f"{'samples':>8} {'workers':>7} {'time':>8} {'samples/s':>10} {'sketch MB':>10} {'min P5 V':>9}")
+    for samples in args.samples:
+        for workers in dict.fromkeys(args.workers):
+            t0 = time.perf_counter()
+            result = probabilistic_load_flow(net, samples, args.batch, workers)
+            elapsed = time.perf_counter() - t0
+            size = sum(s.counts.nbytes for s in (result.vm, result.loading, result.flow)) / 2**20
+            p5 = np.nanmin(result.vm.quantile(0.05))
+            print(f'{samples:8d} {workers:7d} {elapsed:7.2f}s {samples / elapsed:10.0f} '
+                  f'{size:10.2f} {p5:9.4f}')
+
+
+if __name__ == '__main__':
+    main()
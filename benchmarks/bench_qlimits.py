@@ -0,0 +1,71 @@
+"""Newton-Raphson with generator Q limits: iterations, switches and time.
+
+Usage: python benchmarks/bench_qlimits.py [--sizes 1000 3000 10000] [--fraction 0.3]
+
+Solves grid1-grid5 and synthetic networks of ``--sizes`` buses with and
+without Q-limit enforcement.  On the synthetic networks (which carry no
+limits) a ``--fraction`` of the PV buses gets limits at half of its
+unconstrained reactive output, so those buses must switch to PQ.
+``restrict`` is the time to re-index the Jacobian structure for the final
+bus split, ``rebuild`` the time to build that structure from scratch.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.powerflow import JacobianStructure, bus_sets, newton_raphson
+from gridcontrol.synthetic import synthetic_network
+
+
+def tighten(net, fraction, seed):
+    """Give a ``fraction`` of the PV buses limits at half their unconstrained Qg."""
+    _, pv, _ = bus_sets(net.bus_type)
+    qg = newton_raphson(net).qg
+    pick = pv[np.random.default_rng(seed).random(len(pv)) < fraction]
+    net.qmin[pick] = np.minimum(0.5 * qg[pick], 0.0)
+    net.qmax[pick] = np.maximum(0.5 * qg[pick], 0.0)
+    return net
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 3000, 10000])
+    parser.add_argument('--fraction', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    nets = [load_case(g) for g in GRIDS]
+    nets += [tighten(synthetic_network(n), args.fraction, args.seed) for n in args.sizes]
+    print(f"{'network':<14} {'buses':>6} {'pv':>5} {'plain':>8} {'its':>4} {'q-lim':>8} {'its':>4} "
+          f"{'switch':>6} {'held':>5} {'restrict':>9} {'rebuild':>9}")
+    for net in nets:
+        ref, pv, pq = bus_sets(net.bus_type)
+        t0 = time.perf_counter()
+        plain = newton_raphson(net)
+        t1 = time.perf_counter()
+        limited = newton_raphson(net, q_limits=True)
+        t2 = time.perf_counter()
+        assert limited.converged, net.name
+
+        ybus = limited.ybus
+        pvpq = np.concatenate((pv, pq))
+        full = JacobianStructure(ybus, pvpq, pvpq)
+        split = np.concatenate((pq, limited.q_limited))
+        t3 = time.perf_counter()
+        jac = full.restrict(split)
+        t4 = time.perf_counter()
+        JacobianStructure(ybus, pvpq, jac.pq)
+        t5 = time.perf_counter()
+        print(f'{net.name:<14} {net.n_bus:6d} {len(pv):5d} {(t1 - t0) * 1e3:6.1f}ms {plain.iterations:4d} '
+              f'{(t2 - t1) * 1e3:6.1f}ms {limited.iterations:4d} {limited.switches:6d} '
+              f'{len(limited.q_limited):5d} {(t4 - t3) * 1e3:7.2f}ms {(t5 - t4) * 1e3:7.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
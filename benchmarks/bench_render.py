@@ -0,0 +1,79 @@
+"""Frame time of the batched SLD renderer vs. one artist per element.
+
+Usage: python benchmarks/bench_render.py [--sizes 1000 10000] [--frames 10]
+
+Each frame rotates the view and redraws the Agg canvas, which is what an
+interactive rotation costs.  The per-element baseline mirrors the original
+gridN_SLD.py loops and is skipped above ``--legacy-max`` buses.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.render import draw_network
+from gridcontrol.synthetic import synthetic_network
+
+
+def draw_per_element(ax, net):
+    pos = net.bus_xyz
+    for x, y, z in pos:
+        ax.scatter(x, y, z, color='blue', s=150, alpha=0.8, edgecolor='black')
+    for (xs, ys, zs) in net.branch_segments().transpose(0, 2, 1):
+        ax.plot(xs, ys, zs, color='gray', linewidth=2, alpha=0.7)
+    for x, y, z in pos[net.gen_bus]:
+        ax.plot([x, x], [y, y], [z, z + 1], color='green', linewidth=2, alpha=0.7)
+        ax.scatter(x, y, z + 1, color='green', marker='^', s=120, alpha=0.8)
+    for k, (x, y, z) in enumerate(pos[net.load_bus]):
+        ax.plot([x, x], [y, y], [z, z - 1 - k * 0.2], color='red', linewidth=2, alpha=0.7)
+        ax.scatter(x, y, z - 1 - k * 0.2, color='red', marker='v', s=100, alpha=0.8)
+
+
+def bench(net, draw, frames):
+    fig = plt.figure(figsize=(16, 12))
+    ax = fig.add_subplot(111, projection='3d')
+    t0 = time.perf_counter()
+    draw(ax, net)
+    fig.canvas.draw()
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for k in range(frames):
+        ax.view_init(elev=20, azim=45 + 5 * k)
+        fig.canvas.draw()
+    frame = (time.perf_counter() - t0) / frames
+    n_artists = len(ax.get_children())
+    plt.close(fig)
+    return build, frame, n_artists
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--frames', type=int, default=10)
+    parser.add_argument('--legacy-max', type=int, default=1000)
+    args = parser.parse_args()
+
+    modes = {
+        'batched': lambda ax, net: draw_network(ax, net, labels=False),
+        'batched+lod': lambda ax, net: draw_network(ax, net, labels='auto'),
+        'per-element': draw_per_element,
+    }
+    print(f"{'buses':>7} {'branches':>8} {'mode':<12} {'artists':>8} {'first draw':>11} {'frame':>10}")
+    for n in args.sizes:
+        net = synthetic_network(n)
+        for mode, draw in modes.items():
+            if mode == 'per-element' and n > args.legacy_max:
+                continue
+            build, frame, n_artists = bench(net, draw, args.frames)
+            print(f'{n:7d} {net.n_branch:8d} {mode:<12} {n_artists:8d} '
+                  f'{build * 1e3:9.1f}ms {frame * 1e3:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
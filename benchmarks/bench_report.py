@@ -0,0 +1,38 @@
+"""Bulk summary report time for many networks.
+
+Usage: python benchmarks/bench_report.py [--grids 300] [--buses 200]
+
+Summarizes ``--grids`` synthetic networks of ``--buses`` buses each and
+writes the text, JSON and CSV reports in one pass to a temporary
+directory.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.report import write_reports
+from gridcontrol.synthetic import synthetic_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grids', type=int, default=300)
+    parser.add_argument('--buses', type=int, default=200)
+    args = parser.parse_args()
+
+    nets = [synthetic_network(args.buses, seed=i) for i in range(args.grids)]
+    with tempfile.TemporaryDirectory() as out:
+        t0 = time.perf_counter()
+        write_reports(nets, out)
+        elapsed = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(out, f)) for f in os.listdir(out))
+    print(f'{args.grids} grids x {args.buses} buses: {elapsed:.2f} s '
+          f'({elapsed / args.grids * 1e3:.2f} ms/grid, {size / 2**20:.1f} MB written)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""PTDF/LODF build cost, storage and what-if query time vs. load-flow re-solves.
+
+Usage: python benchmarks/bench_sensitivity.py [--sizes 1000 3000] [--queries 100]
+
+A query is "flows on every branch after moving 10 MW from one bus to
+another"; it is answered by a PTDF mat-vec and, for reference, by a full DC
+re-solve.  ``cached`` is the cost of asking for the factors again.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.powerflow import solve
+from gridcontrol.sensitivity import clear_cache, sensitivity_factors
+from gridcontrol.synthetic import synthetic_network
+
+STORAGE = (
+    ('float64', np.float64, 0.0),
+    ('float32', np.float32, 0.0),
+    ('f32+1e-3', np.float32, 1e-3),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 3000])
+    parser.add_argument('--queries', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'storage':<9} {'build':>9} {'cached':>9} {'MB':>8} "
+          f"{'query':>9} {'DC solve':>9} {'max err MW':>10}")
+    for n in args.sizes:
+        net = synthetic_network(n)
+        rng = np.random.default_rng(0)
+        pairs = rng.integers(1, n, size=(args.queries, 2))
+        base = solve(net, 'dc')
+        f0 = base.branch_flows()[0].real
+
+        t0 = time.perf_counter()
+        exact = []
+        for a, b in pairs:
+            net.pg[a] += 10.0
+            net.pg[b] -= 10.0
+            exact.append(solve(net, 'dc', factors=base.factors).branch_flows()[0].real - f0)
+            net.pg[a] -= 10.0
+            net.pg[b] += 10.0
+        t_dc = (time.perf_counter() - t0) / args.queries
+
+        for label, dtype, threshold in STORAGE:
+            clear_cache()
+            t0 = time.perf_counter()
+            sensitivity_factors(net, dtype=dtype, threshold=threshold)
+            t_build = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            sens = sensitivity_factors(net, dtype=dtype, threshold=threshold)
+            t_cached = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            approx = [sens.transfer(a, b, 10.0) for a, b in pairs]
+            t_query = (time.perf_counter() - t0) / args.queries
+            err = max(np.abs(x - y).max() for x, y in zip(approx, exact))
+            print(f'{n:7d} {label:<9} {t_build:8.2f}s {t_cached * 1e6:7.1f}us '
+                  f'{sens.nbytes / 2**20:8.1f} {t_query * 1e3:7.3f}ms {t_dc * 1e3:7.3f}ms '
+                  f'{err:10.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""All-bus fault sweep time vs. network size.
+
+Usage: python benchmarks/bench_shortcircuit.py [--sizes 1000 10000] [--repeat 3]
+
+Compares three ways of getting the Zbus diagonal: selected inversion on the
+sparse LDL' factors (what :func:`fault_currents` uses), one triangular solve
+per bus on the same LU (skipped above ``--solve-max`` buses) and a dense
+inverse (skipped above ``--dense-max`` buses).  ``sweep`` is the complete
+four-fault-type calculation for every bus.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.shortcircuit import _diagonal_by_solves, fault_currents, sequence_ybus, zbus_diagonal
+from gridcontrol.synthetic import synthetic_network
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--solve-max', type=int, default=10000)
+    parser.add_argument('--dense-max', type=int, default=3000)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'method':<10} {'Zbus diag':>11} {'max err':>9}")
+    for n in args.sizes:
+        net = synthetic_network(n)
+        y1 = sequence_ybus(net)[0]
+        t, ref = timed(lambda: zbus_diagonal(y1), args.repeat)
+        print(f'{n:7d} {"selected":<10} {t * 1e3:9.1f}ms')
+        if n <= args.solve_max:
+            t, z = timed(lambda: _diagonal_by_solves(y1), 1)
+            print(f'{n:7d} {"solves":<10} {t * 1e3:9.1f}ms {np.abs(z - ref).max():9.1e}')
+        if n <= args.dense_max:
+            t, z = timed(lambda: np.diag(np.linalg.inv(y1.toarray())), 1)
+            print(f'{n:7d} {"dense":<10} {t * 1e3:9.1f}ms {np.abs(z - ref).max():9.1e}')
+        t, _ = timed(lambda: fault_currents(net), args.repeat)
+        print(f'{n:7d} {"sweep":<10} {t * 1e3:9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Re-solve time after a branch switching event: rebuild vs. incremental.
+
+Usage: python benchmarks/bench_switching.py [--sizes 1000 10000] [--events 20]
+
+For each event a random in-service line is opened.  ``rebuild`` rebuilds the
+bus matrices and refactorizes; ``incremental`` patches the Ybus in place and
+folds the change into the existing factors with a Woodbury correction.
+Times are per event, for the Ybus update, a DC re-solve and an update of
+the positive-sequence Zbus diagonal (fault levels).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.powerflow import solve
+from gridcontrol.shortcircuit import sequence_ybus, zbus_diagonal
+from gridcontrol.switching import IncrementalYbus, WoodburySolver
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.ybus import make_ybus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--events', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'mode':<12} {'Ybus':>10} {'DC solve':>10} {'Zbus diag':>10} {'max err':>9}")
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        # Only mesh lines are opened, so the network stays connected
+        net = synthetic_network(n)
+        degree = np.bincount(np.concatenate((net.branch_from, net.branch_to)), minlength=n)
+        mesh = np.flatnonzero(net.lines & (degree[net.branch_from] > 2) & (degree[net.branch_to] > 2))
+        events = rng.choice(mesh, args.events, replace=False)
+
+        sw = IncrementalYbus(net)
+        dc = solve(net, 'dc')
+        y1 = sequence_ybus(net)[0]
+        z_base = zbus_diagonal(y1)
+        zsolver = WoodburySolver(y1)
+        t_y = t_dc = t_z = 0.0
+        for k in events:
+            t0 = time.perf_counter()
+            change = sw.open(k)
+            t1 = time.perf_counter()
+            dc.factors.apply(change)
+            dc = solve(net, 'dc', factors=dc.factors)
+            t2 = time.perf_counter()
+            zsolver.update(change.buses, change.delta)
+            z_inc = zsolver.inverse_diagonal(z_base)
+            t3 = time.perf_counter()
+            t_y, t_dc, t_z = t_y + t1 - t0, t_dc + t2 - t1, t_z + t3 - t2
+        m = len(events)
+        print(f'{n:7d} {"incremental":<12} {t_y / m * 1e3:8.3f}ms {t_dc / m * 1e3:8.3f}ms '
+              f'{t_z / m * 1e3:8.3f}ms')
+
+        t0 = time.perf_counter()
+        make_ybus(net)
+        t1 = time.perf_counter()
+        dc_ref = solve(net, 'dc')
+        t2 = time.perf_counter()
+        z_ref = zbus_diagonal(sequence_ybus(net)[0])
+        t3 = time.perf_counter()
+        err = max(np.abs(dc.va - dc_ref.va).max(), np.abs(z_inc - z_ref).max())
+        print(f'{n:7d} {"rebuild":<12} {(t1 - t0) * 1e3:8.3f}ms {(t2 - t1) * 1e3:8.3f}ms '
+              f'{(t3 - t2) * 1e3:8.3f}ms {err:9.1e}')
+
+
+if __name__ == '__main__':
+    main()
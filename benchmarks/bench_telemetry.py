@@ -0,0 +1,63 @@
+"""Telemetry ingest and delta-push throughput vs. bus count.
+
+Usage: python benchmarks/bench_telemetry.py [--buses 100 500] [--block 20] [--subscribers 4]
+
+Samples of every bus are published to a :class:`TelemetryHub` as fast as
+possible (no real-time pacing) in blocks of ``--block`` rows while
+``--subscribers`` consumers pull deltas.  ``rows/s`` is the sustainable
+sample rate per grid; ``MB`` is the hub's total buffer memory, which stays
+fixed however long the run.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.telemetry import SimulatedSource, TelemetryHub
+
+
+async def run(net, rows, block, subscribers):
+    hub = TelemetryHub(capacity=10_000)
+    stream = hub.add_grid(net.name, net.bus_names)
+    source = SimulatedSource(net, rate=1000.0, block=block)
+    blocks = [source.sample(block) for _ in range(8)]
+    got = [0] * subscribers
+
+    async def consume(i):
+        async for delta in hub.subscribe(net.name, since=0):
+            got[i] += len(delta.times)
+
+    tasks = [asyncio.create_task(consume(i)) for i in range(subscribers)]
+    t0 = time.perf_counter()
+    for i in range(rows // block):
+        await hub.publish(net.name, *blocks[i % len(blocks)])
+        await asyncio.sleep(0)
+    await hub.close()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    nbytes = stream.vm.data.nbytes + stream.p.data.nbytes + 2 * stream.vm.times.nbytes
+    return elapsed, min(got), nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--buses', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--block', type=int, default=20)
+    parser.add_argument('--subscribers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'buses':>7} {'rows':>8} {'delivered':>9} {'time':>8} {'rows/s':>10} {'values/s':>10} {'MB':>6}")
+    for n in args.buses:
+        net = synthetic_network(n)
+        elapsed, delivered, nbytes = asyncio.run(run(net, args.rows, args.block, args.subscribers))
+        print(f'{n:7d} {args.rows:8d} {delivered:9d} {elapsed:7.2f}s {args.rows / elapsed:10.0f} '
+              f'{args.rows * n * 2 / elapsed:10.2e} {nbytes / 2**20:6.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Quasi-static time-series throughput: steps per second vs. worker count.
+
+Usage: python benchmarks/bench_timeseries.py [--grid grid2] [--buses 0] [--steps 35040] [--workers 1 4]
+
+Simulates a synthetic year of 15-minute load profiles (one per load) on a
+study grid, or on a synthetic feeder with ``--buses N``, into a temporary
+directory, once per worker count.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import load_case
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.timeseries import load_results, simulate, synthetic_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--grid', default='grid2')
+    parser.add_argument('--buses', type=int, default=0)
+    parser.add_argument('--steps', type=int, default=35040)
+    parser.add_argument('--method', default='nr')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    net = synthetic_network(args.buses) if args.buses else load_case(args.grid)
+    names = net.load_names.tolist() if len(net.load_names) <= 64 else net.bus_names[net.load_bus].tolist()
+    profiles = synthetic_profiles(list(dict.fromkeys(names)), args.steps)
+    print(f'{net!r}, {profiles.steps} steps, {len(profiles.names)} profiles')
+    print(f"{'workers':>7} {'time':>8} {'steps/s':>9} {'failed':>6} {'mean iter':>9}")
+    for workers in dict.fromkeys(args.workers):
+        with tempfile.TemporaryDirectory() as out:
+            t0 = time.perf_counter()
+            failed = simulate(net, profiles, out, args.method, workers)
+            elapsed = time.perf_counter() - t0
+            iterations = float(load_results(out).iterations.mean())
+        print(f'{workers:7d} {elapsed:7.2f}s {profiles.steps / elapsed:9.0f} {failed:6d} {iterations:9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Transient-stability simulation time vs. network size and batch size.
+
+Usage: python benchmarks/bench_transient.py [--sizes 300 1000] [--faults 32] [--batch 1 8 32] [--workers 1 4]
+
+For grid1-grid5 and synthetic networks of ``--sizes`` buses builds the
+machine model and simulates up to ``--faults`` branch faults (cleared by
+tripping the branch) for ``--t-end`` seconds.  ``setup`` is the model and
+per-disturbance network reduction time.  The other columns are the total
+time per ``--batch`` size (disturbances integrated together) and per
+``--workers`` count at the largest batch size.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.transient import StabilityModel, default_disturbances, run_study
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[300, 1000])
+    parser.add_argument('--faults', type=int, default=32)
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--t-end', type=float, default=2.0)
+    parser.add_argument('--step', type=float, default=0.005)
+    args = parser.parse_args()
+
+    nets = [load_case(g) for g in GRIDS] + [synthetic_network(n) for n in args.sizes]
+    workers = sorted(set(args.workers))
+    print(f"{'network':<14} {'buses':>6} {'mach':>5} {'faults':>6} {'unstable':>8} {'setup':>8} "
+          + ' '.join(f'{"b=" + str(b):>8}' for b in args.batch) + ' '
+          + ' '.join(f'{"w=" + str(w):>8}' for w in workers))
+    for net in nets:
+        on = np.flatnonzero(net.branch_status != 0)
+        pick = on[np.linspace(0, len(on) - 1, min(args.faults, len(on))).astype(int)]
+        disturbances = default_disturbances(net, branches=None if net.n_bus <= 9 else pick)
+        t0 = time.perf_counter()
+        model = StabilityModel(net)
+        for d in disturbances:
+            model.reduce(d.bus, d.zf)
+            model.reduce(trip=d.trip)
+        setup = time.perf_counter() - t0
+
+        times, unstable = [], 0
+        for b in args.batch:
+            t0 = time.perf_counter()
+            result = run_study(net, disturbances, model.machines, workers=1, batch=b,
+                               t_end=args.t_end, step=args.step)
+            times.append(time.perf_counter() - t0)
+            unstable = int((~result.stable).sum())
+        for w in workers:
+            t0 = time.perf_counter()
+            run_study(net, disturbances, model.machines, workers=w, batch=max(args.batch),
+                      t_end=args.t_end, step=args.step)
+            times.append(time.perf_counter() - t0)
+        print(f'{net.name:<14} {net.n_bus:6d} {len(model.machines):5d} {len(disturbances):6d} '
+              f'{unstable:8d} {setup:7.3f}s ' + ' '.join(f'{t:7.3f}s' for t in times))
+
+
+if __name__ == '__main__':
+    main()
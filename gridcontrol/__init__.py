@@ -0,0 +1,7 @@
+"""Python tooling for the ETAP/MATLAB real-time grid control project."""
+
+from .grids import GRIDS, load_case, load_grid
+from .network import LINE, PQ, PV, SLACK, TRANSFORMER, Network
+
+__all__ = ['GRIDS', 'LINE', 'Network', 'PQ', 'PV', 'SLACK', 'TRANSFORMER', 'load_case',
+           'load_grid']
@@ -0,0 +1,285 @@
+"""Rule-based alarms evaluated on the live telemetry streams.
+
+Python replacement for ``generateAlerts`` in ``GridControl_GUI.m``, which
+returns canned messages.  Every bus voltage, bus injection and (when
+streamed) branch loading of every grid of a
+:class:`~gridcontrol.telemetry.TelemetryHub` is a *point*, and an
+:class:`AlarmEngine` keeps its rules as flat per-point arrays across all
+grids: low and high limits with a deadband, and a rate-of-change limit.
+
+Each :meth:`AlarmEngine.tick` reads the rows written to every ring buffer
+since the previous tick, reduces them to the per-point minimum, maximum
+and latest value, and evaluates all rules in one vectorised pass:
+
+* a limit alarm raises when any sample crosses the limit and clears once
+  the latest sample is back inside it by the deadband (hysteresis);
+* a rate alarm raises when the change since the previous tick exceeds the
+  limit (per second) and clears below :data:`RATE_RESET` of it.
+
+Alarm state is one ``(points, 3)`` boolean array, so an alarm is reported
+once when it raises and once when it clears, however many ticks it stays
+active.  Transitions go to an event log held in a
+:class:`~gridcontrol.telemetry.RingBuffer`::
+
+    engine = AlarmEngine(hub, limits={'loading': {'high': 0.9}})
+    engine.tick()
+    for alarm in engine.events():
+        print(alarm.message)
+
+Run ``python -m gridcontrol.alarms`` for a simulated session.
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+
+import numpy as np
+
+from .telemetry import RingBuffer
+
+CHANNELS = ('vm', 'p', 'loading')
+KINDS = ('low', 'high', 'rate')
+# Per-channel default rules; nan disables a rule
+DEFAULT_LIMITS = {
+    'vm': {'low': 0.95, 'high': 1.05, 'deadband': 0.005, 'rate': 0.05},
+    'p': {'low': np.nan, 'high': np.nan, 'deadband': 0.0, 'rate': np.nan},
+    'loading': {'low': np.nan, 'high': 1.0, 'deadband': 0.02, 'rate': np.nan},
+}
+# A rate alarm clears below this fraction of its limit
+RATE_RESET = 0.8
+
+LABELS = {
+    ('vm', 'low'): 'Undervoltage', ('vm', 'high'): 'Overvoltage', ('vm', 'rate'): 'Voltage swing',
+    ('p', 'low'): 'Low injection', ('p', 'high'): 'High injection', ('p', 'rate'): 'Power ramp',
+    ('loading', 'low'): 'Underload', ('loading', 'high'): 'Overload',
+    ('loading', 'rate'): 'Loading ramp',
+}
+_UNITS = {'vm': ('{:.1%}', '{:+.3f} pu/s'), 'p': ('{:.1f} MW', '{:+.1f} MW/s'),
+          'loading': ('{:.1%}', '{:+.1%}/s')}
+
+
+@dataclass
+class Alarm:
+    """One alarm transition (or, from :meth:`AlarmEngine.active_alarms`, state)."""
+
+    time: float
+    grid: str
+    element: str
+    channel: str
+    kind: str
+    raised: bool
+    value: float
+
+    @property
+    def message(self):
+        """``generateAlerts``-style text, e.g. ``[12.500s] grid5: Undervoltage at Bus5 (94.6%)``."""
+        fmt = _UNITS[self.channel][self.kind == 'rate']
+        text = f'[{self.time:.3f}s] {self.grid}: {LABELS[self.channel, self.kind]} at {self.element} ' \
+               f'({fmt.format(self.value)})'
+        return text if self.raised else text + ' cleared'
+
+
+class AlarmEngine:
+    """Limit and rate-of-change alarms over every point of ``hub``.
+
+    The points are those of the hub's streams when the engine is created.
+    ``limits`` maps a channel to rule overrides (``low``, ``high``,
+    ``deadband``, ``rate``) applied to all its points; use
+    :meth:`set_limits` for individual elements.
+    """
+
+    def __init__(self, hub, limits=None, log_capacity=10_000):
+        self.hub = hub
+        self._sources = []      # (stream, [(ring buffer, slice)])
+        names, grids, channels = [], [], []
+        n = 0
+        for stream in hub.streams.values():
+            buffers = []
+            for c, channel in enumerate(CHANNELS):
+                buf = getattr(stream, channel)
+                if buf is None:
+                    continue
+                labels = stream.branch_names if channel == 'loading' else stream.bus_names
+                buffers.append((buf, slice(n, n + buf.width)))
+                names.append(labels)
+                grids.append(np.full(buf.width, stream.name, dtype=object))
+                channels.append(np.full(buf.width, c, dtype=np.int8))
+                n += buf.width
+            self._sources.append((stream, buffers))
+        self.names = np.concatenate(names) if names else np.array([], dtype=str)
+        self.grid = np.concatenate(grids) if grids else np.array([], dtype=object)
+        self.channel = np.concatenate(channels) if channels else np.array([], dtype=np.int8)
+
+        rules = {c: dict(DEFAULT_LIMITS[c], **(limits or {}).get(c, {})) for c in CHANNELS}
+        for key in ('low', 'high', 'deadband', 'rate'):
+            table = np.array([rules[c][key] for c in CHANNELS], dtype=np.float64)
+            setattr(self, key, table[self.channel])
+
+        self.seq = {stream.name: stream.seq for stream, _ in self._sources}
+        self.active = np.zeros((n, len(KINDS)), dtype=bool)
+        self.raised_at = np.full((n, len(KINDS)), np.nan)
+        self.raised_value = np.full((n, len(KINDS)), np.nan)
+        self.log = RingBuffer(log_capacity, 4)      # point, kind, raised, value
+        self.ticks = 0
+        # Latest value/time per point and the per-tick reductions
+        self._value = np.full(n, np.nan)
+        self._time = np.full(n, np.nan)
+        self._min = np.empty(n)
+        self._max = np.empty(n)
+        self._fresh = np.empty(n, dtype=bool)
+
+    def __len__(self):
+        return len(self.names)
+
+    def points(self, grid=None, channel=None, elements=None):
+        """Boolean mask of the points matching all given selectors."""
+        mask = np.ones(len(self), dtype=bool)
+        if grid is not None:
+            mask &= self.grid == grid
+        if channel is not None:
+            mask &= self.channel == CHANNELS.index(channel)
+        if elements is not None:
+            mask &= np.isin(self.names, np.atleast_1d(elements))
+        return mask
+
+    def set_limits(self, grid=None, channel=None, elements=None, **rules):
+        """Override ``low``/``high``/``deadband``/``rate`` on the selected points."""
+        mask = self.points(grid, channel, elements)
+        for key, value in rules.items():
+            if key not in ('low', 'high', 'deadband', 'rate'):
+                raise TypeError(f'unknown alarm rule {key!r}')
+            getattr(self, key)[mask] = value
+        return int(mask.sum())
+
+    def _read(self):
+        """Reduce the rows written since the last tick into the scratch arrays."""
+        fresh = self._fresh
+        fresh[:] = False
+        last_time = self._time.copy()
+        last_value = self._value.copy()
+        for stream, buffers in self._sources:
+            seq = self.seq[stream.name]
+            if stream.seq <= seq:
+                continue
+            self.seq[stream.name] = stream.seq
+            for buf, sl in buffers:
+                _, times, rows = buf.since(seq)
+                rows.min(axis=0, out=self._min[sl])
+                rows.max(axis=0, out=self._max[sl])
+                self._value[sl] = rows[-1]
+                self._time[sl] = times[-1]
+                fresh[sl] = True
+        return fresh, last_time, last_value
+
+    def tick(self):
+        """Evaluate all rules on the new rows; return the transitions logged.
+
+        Transitions are stamped with the time of the point's latest sample.
+        """
+        fresh, last_time, last_value = self._read()
+        self.ticks += 1
+        if not fresh.any():
+            return []
+        value, lo, hi, db = self._value, self.low, self.high, self.deadband
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = (value - last_value) / (self._time - last_time)
+            speed = np.abs(rate)
+            raise_ = np.column_stack((self._min < lo, self._max > hi, speed > self.rate))
+            clear = np.column_stack((value > lo + db, value < hi - db,
+                                     speed <= RATE_RESET * self.rate))
+        raise_ &= fresh[:, None]
+        clear &= fresh[:, None]
+        was = self.active
+        raised = raise_ & ~was
+        cleared = (was | raise_) & clear
+        self.active = (was | raise_) & ~clear
+
+        peak = np.column_stack((self._min, self._max, rate))
+        self.raised_at[raised] = self._time[np.nonzero(raised)[0]]
+        self.raised_value[raised] = peak[raised]
+        # Raise before clear, so a transient within one tick logs both in order
+        p_up, k_up = np.nonzero(raised)
+        p_down, k_down = np.nonzero(cleared)
+        current = np.column_stack((value, value, rate))
+        point = np.concatenate((p_up, p_down))
+        kind = np.concatenate((k_up, k_down))
+        if not len(point):
+            return []
+        up = np.concatenate((np.ones(len(p_up)), np.zeros(len(p_down))))
+        values = np.concatenate((peak[p_up, k_up], current[p_down, k_down]))
+        start = self.log.seq
+        self.log.write(self._time[point], np.column_stack((point, kind, up, values)))
+        return self.events(start)
+
+    def _alarm(self, time, point, kind, raised, value):
+        return Alarm(float(time), self.grid[point], str(self.names[point]),
+                     CHANNELS[self.channel[point]], KINDS[kind], bool(raised), float(value))
+
+    def events(self, since=None, grid=None):
+        """Logged transitions after log sequence ``since`` (default: all retained)."""
+        _, times, rows = self.log.since(self.log.first if since is None else since)
+        out = [self._alarm(t, int(p), int(k), up, v) for t, (p, k, up, v) in zip(times, rows)]
+        return out if grid is None else [a for a in out if a.grid == grid]
+
+    def active_alarms(self, grid=None):
+        """Currently active alarms, stamped with when they raised."""
+        mask = self.active if grid is None else self.active & (self.grid == grid)[:, None]
+        return [self._alarm(self.raised_at[p, k], p, k, True, self.raised_value[p, k])
+                for p, k in zip(*np.nonzero(mask))]
+
+    def alerts(self, grid, limit=50):
+        """The latest ``limit`` event messages of ``grid`` (the GUI alert list)."""
+        return [a.message for a in self.events(grid=grid)[-limit:]]
+
+    async def run(self, period=0.5):
+        """Tick every ``period`` seconds until cancelled."""
+        loop = asyncio.get_running_loop()
+        due = loop.time()
+        while True:
+            self.tick()
+            due += period
+            await asyncio.sleep(max(0.0, due - loop.time()))
+
+
+async def _session(nets, rate, duration, period, limits):
+    from .telemetry import SimulatedSource, TelemetryHub
+
+    hub = TelemetryHub(capacity=int(rate * max(period, 1.0) * 4))
+    for net in nets:
+        hub.add_grid(net.name, net.bus_names, branch_names=net.branch_names)
+    engine = AlarmEngine(hub, limits)
+    ticker = asyncio.create_task(engine.run(period))
+    await asyncio.gather(*(SimulatedSource(net, rate, branches=True).run(hub, net.name, duration)
+                           for net in nets))
+    ticker.cancel()
+    engine.tick()
+    return engine
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_case
+
+    parser = argparse.ArgumentParser(description='Alarm engine over simulated telemetry.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--rate', type=float, default=1000.0, help='samples per second per grid')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds')
+    parser.add_argument('--period', type=float, default=0.5, help='evaluation period (s)')
+    parser.add_argument('--vmin', type=float, default=DEFAULT_LIMITS['vm']['low'])
+    parser.add_argument('--vmax', type=float, default=DEFAULT_LIMITS['vm']['high'])
+    parser.add_argument('--max-loading', type=float, default=DEFAULT_LIMITS['loading']['high'])
+    parser.add_argument('--limit', type=int, default=20, help='messages shown per grid')
+    args = parser.parse_args(argv)
+
+    nets = [load_case(g) for g in args.grids]
+    limits = {'vm': {'low': args.vmin, 'high': args.vmax}, 'loading': {'high': args.max_loading}}
+    engine = asyncio.run(_session(nets, args.rate, args.duration, args.period, limits))
+    print(f'{len(engine)} points, {engine.ticks} ticks, {engine.log.seq} events')
+    for net in nets:
+        active = engine.active_alarms(net.name)
+        print(f'\n=== {net.title} ({net.name}): {len(active)} active ===')
+        for message in engine.alerts(net.name, args.limit):
+            print(message)
+
+
+if __name__ == '__main__':
+    main()
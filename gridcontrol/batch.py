@@ -0,0 +1,257 @@
+"""Batch runner: every study for every grid in one process pool.
+
+Grid specs are strings, so they are cheap to send to workers:
+
+* ``grid1`` ... ``grid5`` - the built-in study grids;
+* a path to a Python grid definition (same layout as the ``gridN`` modules,
+  ``STUDY_*`` tables optional) or to a directory of them;
+* ``synthetic:<buses>[:<seed>]`` - a generated feeder variant.
+
+Each (grid, study) pair is one task.  Studies write their output below
+``<out>/<grid>/`` and return a few headline figures; failures are recorded
+with their traceback instead of aborting the run.  ``<out>/batch.json``
+indexes all tasks::
+
+    python -m gridcontrol.batch --out results --workers 8
+    python -m gridcontrol.batch variants/ synthetic:2000:1 --studies loadflow
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from .grids import GRIDS, definition, grid_name
+from .network import Network
+
+STUDIES = ('loadflow', 'shortcircuit', 'summary', 'render')
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one study on one grid."""
+
+    grid: str
+    study: str
+    ok: bool
+    elapsed: float
+    outputs: list = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+    error: str = ''
+
+
+def _is_definition(path):
+    with open(path, encoding='utf-8', errors='replace') as fh:
+        text = fh.read()
+    return 'BUS_POSITIONS' in text or 'BUS_VOLTAGES' in text
+
+
+def discover(paths=(), builtin=True):
+    """Grid specs: the built-in grids (unless not ``builtin``) plus definitions
+    found under ``paths``.
+
+    Directories are searched (non-recursively) for ``*.py`` files defining
+    ``BUS_POSITIONS`` or ``BUS_VOLTAGES``; other specs are passed through unchanged.
+    """
+    specs = list(GRIDS) if builtin else []
+    for path in paths:
+        if os.path.isdir(path):
+            specs += [p for p in sorted(glob.glob(os.path.join(path, '*.py'))) if _is_definition(p)]
+        else:
+            specs.append(path)
+    return list(dict.fromkeys(specs))
+
+
+def spec_name(spec):
+    """Output directory name of a grid spec."""
+    if spec.startswith('synthetic:'):
+        return spec.replace(':', '_')
+    if spec.endswith('.py'):
+        return os.path.splitext(os.path.basename(spec))[0]
+    return grid_name(spec)
+
+
+@lru_cache(maxsize=16)
+def _definition(spec):
+    if spec.endswith('.py'):
+        module_spec = importlib.util.spec_from_file_location(spec_name(spec), spec)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        return module
+    return definition(spec)
+
+
+def load_networks(spec):
+    """``(grid, case)`` networks of a spec; ``case`` is the study network.
+
+    For synthetic specs both are the same network.  Definitions without
+    ``STUDY_BUSES`` have no study network (``case`` is ``None``).
+    """
+    if spec.startswith('synthetic:'):
+        from .synthetic import synthetic_network
+
+        parts = spec.split(':')
+        net = synthetic_network(int(parts[1]), seed=int(parts[2]) if len(parts) > 2 else 0)
+        net.name = spec_name(spec)
+        return net, net
+    defn = _definition(spec)
+    name = spec_name(spec)
+    grid = Network.from_definition(defn, name=name)
+    case = Network.from_definition(defn, name=name, study=True) if hasattr(defn, 'STUDY_BUSES') else None
+    return grid, case
+
+
+def _study_network(spec):
+    case = load_networks(spec)[1]
+    if case is None:
+        raise ValueError(f'{spec}: no load-flow study tables (STUDY_BUSES)')
+    return case
+
+
+def _loadflow(spec, out):
+    from .powerflow import report, solve
+
+    result = solve(_study_network(spec))
+    path = os.path.join(out, 'loadflow.txt')
+    with open(path, 'w', encoding='utf-8') as fh:
+        report(result, file=fh)
+    loss = result.losses
+    return [path], dict(converged=bool(result.converged), iterations=int(result.iterations),
+                        vmin=float(result.vm.min()), vmax=float(result.vm.max()),
+                        loss_mw=float(loss.real), loss_mvar=float(loss.imag))
+
+
+def _shortcircuit(spec, out):
+    from .shortcircuit import FAULT_TYPES, fault_currents, report
+
+    result = fault_currents(_study_network(spec))
+    path = os.path.join(out, 'shortcircuit.txt')
+    with open(path, 'w', encoding='utf-8') as fh:
+        report(result, file=fh)
+    worst = np.nanmax(result.ka, axis=0)
+    return [path], {f'max_{f}_ka': float(v) for f, v in zip(FAULT_TYPES, worst)}
+
+
+def _summary(spec, out):
+    from .report import format_text, json_safe, summarize
+
+    summary = summarize(load_networks(spec)[0])
+    paths = [os.path.join(out, 'summary.txt'), os.path.join(out, 'summary.json')]
+    with open(paths[0], 'w', encoding='utf-8') as fh:
+        fh.write(format_text(summary) + '\n')
+    with open(paths[1], 'w') as fh:
+        json.dump(json_safe(summary), fh, indent=1)
+    s = summary['system']
+    return paths, dict(gen_mw=s['gen_mw'], load_mva=s['load_mva'], levels=s['levels'])
+
+
+def _render(spec, out):
+    # Figure without pyplot: no GUI backend, no global figure registry
+    from matplotlib.figure import Figure
+
+    from .render import draw_network
+
+    net = load_networks(spec)[0]
+    fig = Figure(figsize=(12, 9))
+    ax = fig.add_subplot(projection='3d')
+    draw_network(ax, net)
+    ax.set_title(net.title)
+    path = os.path.join(out, 'sld.png')
+    fig.savefig(path, dpi=100)
+    return [path], {}
+
+
+_RUNNERS = {'loadflow': _loadflow, 'shortcircuit': _shortcircuit, 'summary': _summary,
+            'render': _render}
+
+
+def run_task(spec, study, out):
+    """Run one study on one grid, writing below ``out/<grid>``.
+
+    A study that reports ``converged=False`` counts as failed.
+    """
+    t0 = time.perf_counter()
+    name = spec
+    try:
+        name = spec_name(spec)
+        directory = os.path.join(out, name)
+        os.makedirs(directory, exist_ok=True)
+        outputs, metrics = _RUNNERS[study](spec, directory)
+        ok = metrics.get('converged', True)
+        return TaskResult(name, study, ok, time.perf_counter() - t0,
+                          [os.path.relpath(p, out) for p in outputs], metrics,
+                          '' if ok else f'{study} did not converge')
+    except Exception:
+        return TaskResult(name, study, False, time.perf_counter() - t0,
+                          error=traceback.format_exc())
+
+
+def _run_packed(task):
+    return run_task(*task)
+
+
+def run_batch(specs, out, studies=STUDIES, workers=None):
+    """Run ``studies`` for every spec; returns the :class:`TaskResult` list.
+
+    ``workers`` defaults to the CPU count; ``1`` runs in-process.  The
+    index is written to ``<out>/batch.json``.
+    """
+    unknown = set(studies) - set(_RUNNERS)
+    if unknown:
+        raise ValueError(f'unknown studies: {", ".join(sorted(unknown))}')
+    os.makedirs(out, exist_ok=True)
+    tasks = [(spec, study, out) for spec in specs for study in studies]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [_run_packed(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_run_packed, tasks))
+    elapsed = time.perf_counter() - t0
+    with open(os.path.join(out, 'batch.json'), 'w') as fh:
+        json.dump(dict(workers=workers, elapsed=elapsed, tasks=[asdict(r) for r in results]),
+                  fh, indent=1, default=float)
+    return results
+
+
+def report(results, file=None):
+    """Print one line per task and the failures."""
+    out = lambda *a: print(*a, file=file)
+    out(f"{'grid':<24} {'study':<13} {'status':<6} {'time':>7}  metrics")
+    for r in results:
+        metrics = ', '.join(f'{k}={v:.4g}' if isinstance(v, float) else f'{k}={v}'
+                            for k, v in r.metrics.items())
+        out(f"{r.grid:<24} {r.study:<13} {'ok' if r.ok else 'FAILED':<6} {r.elapsed:6.2f}s  {metrics}")
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        out(f'\n--- {r.grid} / {r.study} ---\n{r.error}')
+    out(f'\n{len(results) - len(failed)}/{len(results)} tasks succeeded')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run all studies for many grids in parallel.')
+    parser.add_argument('specs', nargs='*',
+                        help='extra definition files/directories or synthetic:<buses>[:<seed>]')
+    parser.add_argument('--out', default='batch_output')
+    parser.add_argument('--studies', nargs='+', default=list(STUDIES), choices=STUDIES)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--only', action='store_true', help='skip the built-in grids')
+    args = parser.parse_args(argv)
+
+    specs = discover(args.specs, builtin=not args.only)
+    results = run_batch(specs, args.out, args.studies, args.workers)
+    report(results)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+"""On-disk cache of parsed study results.
+
+Reading an ETAP result file (see :mod:`gridcontrol.etap`) is done once; the
+parsed record is stored column by column as uncompressed ``.npy`` files, so
+later loads memory-map the arrays instead of re-querying the database.
+Entries are keyed by the reader and the source file's SHA-1; the source
+size and mtime are kept alongside, so an unchanged file is recognised from
+a ``stat`` alone and a touched-but-identical one after re-hashing.
+
+The cache holds at most ``max_entries`` entries and ``max_bytes`` bytes and
+evicts the least recently used ones beyond that::
+
+    cache = StudyCache()
+    lf = cache.get(study_file(5, 'LF1S'), load_flow_results)
+
+The directory defaults to ``$GRIDCONTROL_CACHE`` or ``~/.cache/gridcontrol``.
+"""
+
+import dataclasses
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+DEFAULT_DIR = os.environ.get('GRIDCONTROL_CACHE',
+                             os.path.join(os.path.expanduser('~'), '.cache', 'gridcontrol'))
+
+_INDEX = 'index.json'
+
+
+def file_digest(path, chunk=1 << 20):
+    """SHA-1 of the contents of ``path``."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _qualname(obj):
+    return f'{obj.__module__}:{obj.__qualname__}'
+
+
+def _resolve(name):
+    module, _, attr = name.partition(':')
+    return getattr(importlib.import_module(module), attr)
+
+
+def _write_record(directory, record):
+    """Store a dataclass of arrays and scalars as ``<field>.npy`` files."""
+    os.makedirs(directory)
+    nbytes = 0
+    for f in dataclasses.fields(record):
+        value = np.asarray(getattr(record, f.name))
+        np.save(os.path.join(directory, f.name + '.npy'), value, allow_pickle=False)
+        nbytes += value.nbytes
+    with open(os.path.join(directory, 'meta.json'), 'w') as fh:
+        json.dump({'type': _qualname(type(record))}, fh)
+    return nbytes
+
+
+def _read_record(directory):
+    """Inverse of :func:`_write_record`; arrays are memory-mapped read-only."""
+    with open(os.path.join(directory, 'meta.json')) as fh:
+        cls = _resolve(json.load(fh)['type'])
+    values = {}
+    for f in dataclasses.fields(cls):
+        value = np.load(os.path.join(directory, f.name + '.npy'), mmap_mode='r', allow_pickle=False)
+        values[f.name] = value.item() if value.ndim == 0 else value
+    return cls(**values)
+
+
+class StudyCache:
+    """Directory of cached records with an LRU index."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_entries=64, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    # Index: {key: {source, size, mtime_ns, sha1, nbytes, used}}
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.directory, _INDEX)) as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = os.path.join(self.directory, f'{_INDEX}.{os.getpid()}')
+        with open(tmp, 'w') as fh:
+            json.dump(index, fh, indent=1)
+        os.replace(tmp, os.path.join(self.directory, _INDEX))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _lookup(self, index, source, st, reader):
+        """Key of a valid entry for ``source``, hashing only if the stat changed."""
+        name = _qualname(reader)
+        for key, e in index.items():
+            if (e['source'] == source and e['reader'] == name and e['size'] == st.st_size
+                    and e['mtime_ns'] == st.st_mtime_ns):
+                return key, None
+        digest = file_digest(source)
+        key = f'{reader.__name__}-{digest[:20]}'
+        return (key if key in index else None), digest
+
+    def get(self, path, reader):
+        """``reader(path)``, served from the cache when the file is unchanged."""
+        source = os.path.abspath(path)
+        st = os.stat(source)
+        index = self._load_index()
+        key, digest = self._lookup(index, source, st, reader)
+        if key is not None and os.path.isdir(self._path(key)):
+            try:
+                record = _read_record(self._path(key))
+            except (OSError, ValueError, KeyError):
+                record = None
+            if record is not None:
+                self.hits += 1
+                index[key].update(source=source, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                                  used=time.time())
+                self._save_index(index)
+                return record
+
+        self.misses += 1
+        record = reader(path)
+        digest = digest or file_digest(source)
+        key = f'{reader.__name__}-{digest[:20]}'
+        shutil.rmtree(self._path(key), ignore_errors=True)
+        nbytes = _write_record(self._path(key), record)
+        index = self._load_index()
+        index[key] = dict(source=source, reader=_qualname(reader), size=st.st_size,
+                          mtime_ns=st.st_mtime_ns, sha1=digest, nbytes=nbytes, used=time.time())
+        self._evict(index, keep=key)
+        self._save_index(index)
+        return record
+
+    def _evict(self, index, keep=None):
+        """Drop least recently used entries beyond the size limits."""
+        order = sorted(index, key=lambda k: index[k]['used'])
+        total = sum(e['nbytes'] for e in index.values())
+        for key in order:
+            if len(index) <= self.max_entries and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key]['nbytes']
+            del index[key]
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def entries(self):
+        """Index entries, most recently used first."""
+        index = self._load_index()
+        return sorted(({'key': k, **e} for k, e in index.items()), key=lambda e: -e['used'])
+
+    def clear(self):
+        """Remove every cached entry."""
+        for key in self._load_index():
+            shutil.rmtree(self._path(key), ignore_errors=True)
+        self._save_index({})
+
+
+_default = None
+
+
+def default_cache():
+    """Process-wide :class:`StudyCache` in :data:`DEFAULT_DIR`."""
+    global _default
+    if _default is None:
+        _default = StudyCache()
+    return _default
+
+
+def cached(reader, path, cache=None):
+    """``reader(path)`` through ``cache`` (the default cache if ``None``)."""
+    return (cache or default_cache()).get(path, reader)
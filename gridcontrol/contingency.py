@@ -0,0 +1,251 @@
+"""N-1 branch contingency analysis.
+
+Each in-service branch is opened in turn and the AC load flow re-solved from
+the base-case voltages (warm start) on an :class:`IncrementalYbus`, so an
+outage costs one in-place Ybus patch and a few Newton iterations.  Outages
+are first screened with LODFs: cases whose predicted post-outage loading
+stays below ``screen`` are reported as safe without an AC solve (voltage
+limits are not checked for them), and outages that island the network are
+flagged.  An outage that shifts flow onto an unrated branch (or takes out
+an unrated branch carrying flow) cannot be bounded this way and is always
+solved.  The remaining cases fan out over a process pool.
+
+Run ``python -m gridcontrol.contingency grid1`` for a report.
+"""
+
+import argparse
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .powerflow import DCFactors, newton_raphson
+from .sensitivity import transfer_ptdf
+from .switching import IncrementalYbus
+
+# Outcomes
+SCREENED = 'screened'
+ISLANDING = 'islanding'
+DIVERGED = 'diverged'
+SECURE = 'secure'
+VIOLATION = 'violation'
+
+
+@dataclass
+class Contingency:
+    """Outcome of one branch outage."""
+
+    branch: int
+    name: str
+    outcome: str
+    predicted_loading: float = np.nan
+    iterations: int = 0
+    vmin: float = np.nan
+    vmax: float = np.nan
+    max_loading: float = np.nan
+    undervoltage: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+    overvoltage: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+    overloaded: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+
+
+@dataclass
+class ContingencyReport:
+    """All outages of an N-1 run plus timing."""
+
+    net: object
+    base: object
+    results: list
+    elapsed: float
+    workers: int
+
+    def count(self, outcome):
+        return sum(r.outcome == outcome for r in self.results)
+
+    @property
+    def throughput(self):
+        """Contingencies evaluated per second (screened ones included)."""
+        return len(self.results) / self.elapsed if self.elapsed else np.inf
+
+    @property
+    def violations(self):
+        return [r for r in self.results if r.outcome in (VIOLATION, DIVERGED)]
+
+
+def screen_outages(net, base, branches, block=256, min_shift=0.01):
+    """LODF-predicted worst post-outage loading and islanding flags.
+
+    Post-outage active flows are ``P + LODF[:, k] * P[k]`` with the base-case
+    reactive flows kept, evaluated a block of outages at a time so memory
+    stays ``O(n_branch * block)``.  Outages whose flow shift reaches an
+    unrated branch by more than ``min_shift`` MW are predicted at ``inf``.
+    """
+    factors = DCFactors(net)
+    sf = base.branch_flows()[0]
+    p, q = sf.real, sf.imag
+    unrated = np.isnan(net.branch_mva)
+    rating = np.where(unrated, np.inf, net.branch_mva)
+    predicted = np.empty(len(branches))
+    islanding = np.zeros(len(branches), dtype=bool)
+    for start in range(0, len(branches), block):
+        ks = branches[start:start + block]
+        cols = np.arange(len(ks))
+        tp = transfer_ptdf(net, ks, factors)
+        denom = 1.0 - tp[ks, cols]
+        isl = np.abs(denom) < 1e-8
+        shift = tp / np.where(isl, 1.0, denom) * p[ks]
+        shift[ks, cols] = -p[ks]
+        post = p[:, None] + shift
+        loading = np.hypot(post, q[:, None]) / rating[:, None]
+        loading[ks, cols] = 0.0
+        blind = (unrated[:, None] & (np.abs(shift) > min_shift)).any(axis=0)
+        predicted[start:start + len(ks)] = np.where(blind, np.inf, loading.max(axis=0))
+        islanding[start:start + len(ks)] = isl
+    return predicted, islanding
+
+
+_state = {}
+
+
+def _init_worker(net, v0, options):
+    # Outages are switched in place on ``net``: pool workers get a pickled
+    # copy, in-process runs pass one (see run_n1)
+    _state.update(net=net, v0=v0, options=options, sw=IncrementalYbus(net))
+
+
+def _solve_outages(branches):
+    net, sw, v0, opt = _state['net'], _state['sw'], _state['v0'], _state['options']
+    out = []
+    for k in branches:
+        name = str(net.branch_names[k])
+        sw.open(k)
+        try:
+            res = newton_raphson(net, tol=opt['tol'], max_iter=opt['max_iter'], v0=v0, ybus=sw.ybus)
+        finally:
+            sw.close(k)
+        if not res.converged:
+            out.append(Contingency(k, name, DIVERGED, iterations=res.iterations))
+            continue
+        vm = res.vm
+        loading = res.loading
+        loading[k] = 0.0
+        c = Contingency(
+            k, name, SECURE, iterations=res.iterations, vmin=vm.min(), vmax=vm.max(),
+            max_loading=np.nanmax(loading, initial=0.0),
+            undervoltage=np.flatnonzero(vm < opt['vmin']),
+            overvoltage=np.flatnonzero(vm > opt['vmax']),
+            overloaded=np.flatnonzero(loading > 1.0))
+        if len(c.undervoltage) or len(c.overvoltage) or len(c.overloaded):
+            c.outcome = VIOLATION
+        out.append(c)
+    return out
+
+
+def run_n1(net, branches=None, workers=None, screen=0.9, vmin=0.95, vmax=1.05, tol=1e-6,
+           max_iter=20, chunk=None, base=None):
+    """Run the N-1 study and return a :class:`ContingencyReport`.
+
+    ``branches`` defaults to every in-service branch; out-of-service ones
+    are rejected with ``ValueError``.  ``screen`` is the predicted loading
+    (fraction of rating) below which an outage is skipped; ``None`` solves
+    every non-islanding outage.  ``workers`` defaults to the
+    CPU count; ``1`` runs in-process.
+    """
+    t0 = time.perf_counter()
+    if base is None:
+        base = newton_raphson(net, tol=tol)
+    if not base.converged:
+        raise RuntimeError(f'{net.name}: base case load flow did not converge')
+    if branches is None:
+        branches = np.flatnonzero(net.branch_status != 0)
+    branches = np.asarray(branches, dtype=np.intp)
+    names = net.branch_names
+    open_ = branches[net.branch_status[branches] == 0]
+    if len(open_):
+        raise ValueError(f'{net.name}: branches already out of service: '
+                         + ', '.join(names[open_].tolist()))
+
+    predicted, islanding = screen_outages(net, base, branches)
+    results = {}
+    todo = []
+    for k, pred, isl in zip(branches.tolist(), predicted, islanding):
+        if isl:
+            results[k] = Contingency(k, str(names[k]), ISLANDING, pred)
+        elif screen is not None and pred < screen:
+            results[k] = Contingency(k, str(names[k]), SCREENED, pred)
+        else:
+            todo.append(k)
+
+    options = dict(tol=tol, max_iter=max_iter, vmin=vmin, vmax=vmax)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo)))
+    chunk = chunk or max(1, int(np.ceil(len(todo) / (4 * workers))))
+    chunks = [todo[i:i + chunk] for i in range(0, len(todo), chunk)]
+    if workers == 1:
+        _init_worker(copy.deepcopy(net), base.V, options)
+        solved = map(_solve_outages, chunks)
+        done = [c for part in solved for c in part]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(net, base.V, options)) as pool:
+            done = [c for part in pool.map(_solve_outages, chunks) for c in part]
+    predicted_by_branch = dict(zip(branches.tolist(), predicted))
+    for c in done:
+        c.predicted_loading = predicted_by_branch[c.branch]
+        results[c.branch] = c
+
+    return ContingencyReport(net, base, [results[k] for k in branches],
+                             time.perf_counter() - t0, workers)
+
+
+def report(rep, file=None, limit=50):
+    """Print the outcome summary and the violating outages."""
+    net = rep.net
+    out = lambda *a: print(*a, file=file)
+    out(f'\n=== {net.title}: N-1 contingency analysis ===')
+    out(f'{len(rep.results)} outages in {rep.elapsed:.2f} s '
+        f'({rep.throughput:.1f} contingencies/s, {rep.workers} workers)')
+    for outcome in (SECURE, SCREENED, VIOLATION, ISLANDING, DIVERGED):
+        out(f'  {outcome:<10} {rep.count(outcome):6d}')
+    bad = rep.violations
+    if not bad:
+        return
+    out('\nOutage          Result     Iter  Vmin     Vmax     Loading  Violations')
+    out('-' * 78)
+    for c in bad[:limit]:
+        detail = []
+        if len(c.undervoltage):
+            detail.append('UV ' + ','.join(net.bus_names[c.undervoltage][:4]))
+        if len(c.overvoltage):
+            detail.append('OV ' + ','.join(net.bus_names[c.overvoltage][:4]))
+        if len(c.overloaded):
+            detail.append('OL ' + ','.join(net.branch_names[c.overloaded][:4]))
+        out(f'{c.name:<14}  {c.outcome:<9}  {c.iterations:4d}  {c.vmin:7.4f}  {c.vmax:7.4f}  '
+            f'{c.max_loading:7.1%}  {"; ".join(detail)}')
+    if len(bad) > limit:
+        out(f'... {len(bad) - limit} more')
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_case
+
+    parser = argparse.ArgumentParser(description='N-1 branch contingency analysis.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--screen', type=float, default=0.9,
+                        help='skip outages with predicted loading below this (negative: no screening)')
+    parser.add_argument('--vmin', type=float, default=0.95)
+    parser.add_argument('--vmax', type=float, default=1.05)
+    args = parser.parse_args(argv)
+
+    for grid in args.grids:
+        rep = run_n1(load_case(grid), workers=args.workers,
+                     screen=None if args.screen < 0 else args.screen,
+                     vmin=args.vmin, vmax=args.vmax)
+        report(rep)
+
+
+if __name__ == '__main__':
+    main()
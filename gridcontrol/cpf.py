@@ -0,0 +1,412 @@
+"""Continuation power flow: PV/QV curves and voltage-stability margins.
+
+Python counterpart of the ETAP voltage-stability study (``grid3``'s
+``Untitled.VS1S``).  Bus injections are ``S0 + lam * d`` for a load-increase
+*direction* ``d`` (:func:`direction`), and the curve of solutions
+``(V, lam)`` is traced from the base case past the nose point with a
+predictor-corrector scheme using local parameterization:
+
+* the predictor steps along the tangent of the curve, from the augmented
+  Jacobian ``[[J, -d], [e_k']]`` with ``k`` the largest tangent component;
+* the corrector is Newton-Raphson with ``x_k`` held at its predicted value,
+  on the same augmented matrix;
+* the step grows when the corrector converges quickly and shrinks when it
+  is slow or fails.  When ``dlam`` changes sign the step is cut back and
+  retried down to ``nose_step``, and the nose is the maximum of the cubic
+  Hermite fit of ``lam`` between the two points around it.
+
+``J`` is assembled by the Newton-Raphson :class:`JacobianStructure` and the
+augmented matrix is built around its CSC arrays (one extra row and
+column), then factored with ``splu``; the fill-reducing column ordering of
+the first factorization is kept for the whole trace.  ``lam`` is in pu of added active
+load (Mvar for purely reactive directions), so ``lam * base_mva`` is the
+loadability margin in MW.  PV buses hold their voltage set-points along
+the curve (generator Q limits are not enforced).
+
+:func:`loadability` traces one direction per PQ load bus (its own load
+grown at constant power factor) and fans the directions out over a process
+pool::
+
+    curve = trace(load_case(3))                  # all loads, PV curve
+    curve.margin, net.bus_names[curve.critical]
+    margins = loadability(load_case(3), workers=4)
+
+Run ``python -m gridcontrol.cpf grid3`` for a report.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .network import PQ
+from .powerflow import JacobianStructure, bus_sets, newton_raphson
+
+NOSE = 'nose'
+FULL = 'full'
+
+
+@dataclass
+class Curve:
+    """A traced PV curve: continuation points and the nose."""
+
+    net: object
+    direction: np.ndarray           # d, pu injection per unit lam
+    lam: np.ndarray                 # (points,)
+    V: np.ndarray                   # (points, n_bus) complex, None unless kept
+    vm_track: np.ndarray            # (points, n_bus) of watched buses, see ``watch``
+    watch: np.ndarray               # bus indices of vm_track columns
+    lam_max: float
+    critical: int                   # bus with the largest voltage sensitivity at the nose
+    nose_vm: float                  # its voltage at the nose
+    steps: int
+    factorizations: int
+    converged: bool                 # the nose was located
+
+    @property
+    def margin(self):
+        """Loadability margin in MW (Mvar for a purely reactive direction)."""
+        return self.lam_max * self.net.base_mva
+
+    def pv(self, bus):
+        """``(added load in MW, vm)`` along the curve at watched ``bus``."""
+        col = np.flatnonzero(self.watch == bus)
+        if not len(col):
+            raise ValueError(f'bus {bus} was not watched during the trace')
+        return self.lam * self.net.base_mva, self.vm_track[:, col[0]]
+
+
+@dataclass
+class Margin:
+    """Loadability of one load bus."""
+
+    bus: int
+    name: str
+    margin: float                   # MW of extra load at the bus
+    nose_vm: float                  # its voltage at the nose
+    critical: int
+    steps: int
+    factorizations: int
+    converged: bool
+
+
+def direction(net, buses=None, dispatch=False, reactive=False):
+    """Load-increase direction ``d`` (pu injection per unit ``lam``).
+
+    The loads of ``buses`` (default: all) grow at constant power factor,
+    scaled so one unit of ``lam`` is 1 pu of added active load.  With
+    ``reactive`` only their reactive load grows (1 pu Mvar per unit; for
+    QV curves).  With ``dispatch`` the PV generators pick up the added
+    active load in proportion to their output instead of the slack.
+    """
+    pd, qd = net.pd / net.base_mva, net.qd / net.base_mva
+    mask = np.zeros(net.n_bus, dtype=bool)
+    mask[np.arange(net.n_bus) if buses is None else buses] = True
+    if reactive:
+        d = np.where(mask, -1j, 0.0)
+        return d / mask.sum()
+    load = np.where(mask, pd + 1j * qd, 0.0)
+    total = load.real.sum()
+    if total <= 0:
+        raise ValueError(f'{net.name}: no active load to increase at the selected buses')
+    d = -load / total
+    if dispatch:
+        _, pv, _ = bus_sets(net.bus_type)
+        pg = np.clip(net.pg[pv], 0.0, None)
+        if pg.sum() > 0:
+            d[pv] += pg / pg.sum()
+    return d
+
+
+def _augment(J, column, k):
+    """CSC of ``[[J, column], [e_k', 0]]`` built on ``J``'s arrays."""
+    n = J.shape[0]
+    data, indices, indptr = J.data, J.indices, J.indptr
+    nz = np.flatnonzero(column)
+    if k < n:
+        at = indptr[k + 1]
+        data = np.insert(data, at, 1.0)
+        indices = np.insert(indices, at, n)
+        indptr = indptr.copy()
+        indptr[k + 1:] += 1
+        last_rows, last_vals = nz, column[nz]
+    else:
+        last_rows, last_vals = np.append(nz, n), np.append(column[nz], 1.0)
+    data = np.concatenate((data, last_vals))
+    indices = np.concatenate((indices, last_rows)).astype(np.int32)
+    indptr = np.append(indptr, indptr[-1] + len(last_rows)).astype(np.int32)
+    return sp.csc_matrix((data, indices, indptr), shape=(n + 1, n + 1))
+
+
+def _hermite_max(la, lb, ma, mb):
+    """Maximum over ``[0, 1]`` of the cubic with ends ``la``/``lb`` and slopes ``ma``/``mb``."""
+    roots = np.roots([6 * la + 3 * ma - 6 * lb + 3 * mb, -6 * la - 4 * ma + 6 * lb - 2 * mb, ma])
+    s = np.concatenate(([0.0, 1.0], roots[np.isreal(roots)].real))
+    s = s[(s >= 0) & (s <= 1)]
+    return float(np.max((2 * s ** 3 - 3 * s ** 2 + 1) * la + (s ** 3 - 2 * s ** 2 + s) * ma
+                        + (3 * s ** 2 - 2 * s ** 3) * lb + (s ** 3 - s ** 2) * mb))
+
+
+class Continuation:
+    """Reusable continuation setup for one network and base case.
+
+    Builds Ybus, the Jacobian structure and the base-case solution once;
+    :meth:`trace` then follows any number of directions from it.
+    """
+
+    def __init__(self, net, base=None, tol=1e-8):
+        self.net = net
+        self.tol = tol
+        self.base = newton_raphson(net, tol=tol) if base is None else base
+        if not self.base.converged:
+            raise RuntimeError(f'{net.name}: base case load flow did not converge')
+        self.ybus = self.base.ybus
+        ref, pv, pq = bus_sets(net.bus_type)
+        self.pvpq, self.pq = np.concatenate((pv, pq)), pq
+        self.jac = JacobianStructure(self.ybus, self.pvpq, pq)
+        self.s0 = self.base.sbus
+        self._order = None
+
+    def _x(self, V, lam):
+        return np.concatenate((np.angle(V[self.pvpq]), np.abs(V[self.pq]), [lam]))
+
+    def _voltage(self, x, V):
+        n_a = len(self.pvpq)
+        vm, va = np.abs(V), np.angle(V)
+        va[self.pvpq] = x[:n_a]
+        vm[self.pq] = x[n_a:-1]
+        return vm * np.exp(1j * va)
+
+    def _mismatch(self, V, lam, d):
+        ibus = self.ybus @ V
+        mis = V * np.conj(ibus) - self.s0 - lam * d
+        return np.concatenate((mis.real[self.pvpq], mis.imag[self.pq])), ibus
+
+    def _solve(self, V, ibus, dr, k, rhs):
+        """Solve the augmented system at ``V`` for ``rhs``."""
+        A = _augment(self.jac.assemble(V, ibus), -dr, k)
+        if self._order is None:
+            lu = splu(A)
+            self._order = np.argsort(lu.perm_c)
+            return lu.solve(rhs)
+        x = np.empty_like(rhs)
+        x[self._order] = splu(A[:, self._order], permc_spec='NATURAL').solve(rhs)
+        return x
+
+    def _tangent(self, V, ibus, dr, k, previous):
+        """Unit tangent at ``V``, oriented along the ``previous`` one."""
+        rhs = np.zeros(len(previous))
+        rhs[-1] = 1.0
+        t = self._solve(V, ibus, dr, k, rhs)
+        t /= np.linalg.norm(t)
+        return -t if t @ previous < 0 else t
+
+    def _correct(self, x, V, d, dr, k, max_iter):
+        """Newton on the augmented system with ``x[k]`` fixed; ``(x, V, its, ok)``."""
+        for its in range(max_iter + 1):
+            V = self._voltage(x, V)
+            F, ibus = self._mismatch(V, x[-1], d)
+            if np.abs(F).max() < self.tol:
+                return x, V, its, True
+            if its == max_iter or not np.isfinite(F).all():
+                break
+            x = x + self._solve(V, ibus, dr, k, np.append(-F, 0.0))
+        return x, V, its, False
+
+    def trace(self, d, stop=NOSE, step=0.1, min_step=1e-4, max_step=5.0, nose_step=0.01,
+              max_steps=500, max_iter=8, vmin=0.2, watch=None, keep_voltages=False):
+        """Trace the curve for direction ``d``; return a :class:`Curve`.
+
+        ``stop='nose'`` ends once the nose is located; ``'full'`` continues
+        down the lower branch until ``lam`` returns to 0.  Either way the trace
+        ends when a PQ bus voltage falls below ``vmin``, or when a failing
+        corrector has cut the step below ``min_step``.  ``watch`` selects
+        the buses whose voltage magnitude is recorded (default all);
+        ``keep_voltages`` also keeps every complex voltage.
+        """
+        net = self.net
+        d = np.asarray(d, dtype=complex)
+        dr = np.concatenate((d.real[self.pvpq], d.imag[self.pq]))
+        watch = np.arange(net.n_bus) if watch is None else np.atleast_1d(watch)
+        V = self.base.V.copy()
+        x = self._x(V, 0.0)
+        k = len(x) - 1
+        ibus = self.ybus @ V
+        t = self._tangent(V, ibus, dr, k, np.eye(len(x))[k])
+        factorizations = 1
+        lams, vms, volts = [0.0], [np.abs(V[watch])], [V] if keep_voltages else None
+        h, steps = step, 0
+        nose, critical, nose_vm = None, -1, np.nan
+        while steps < max_steps:
+            k = int(np.argmax(np.abs(t)))
+            x_new, V_new, its, ok = self._correct(x + h * t, V, d, dr, k, max_iter)
+            factorizations += its
+            if not ok:
+                h /= 2
+                if h < min_step:
+                    break
+                continue
+            ibus = self.ybus @ V_new
+            t_new = self._tangent(V_new, ibus, dr, k, t)
+            factorizations += 1
+            if nose is None and t_new[-1] < 0 < t[-1]:
+                if h > nose_step:
+                    h /= 4          # passed the nose: retry with a smaller step
+                    continue
+                chord = np.linalg.norm(x_new - x)
+                nose = _hermite_max(x[-1], x_new[-1], t[-1] * chord, t_new[-1] * chord)
+                mag = np.abs(t_new[len(self.pvpq):-1])
+                critical = int(self.pq[np.argmax(mag)]) if len(mag) else -1
+                nose_vm = float(np.abs(V_new[critical])) if critical >= 0 else np.nan
+            x, V, t = x_new, V_new, t_new
+            steps += 1
+            lams.append(x[-1])
+            vms.append(np.abs(V[watch]))
+            if keep_voltages:
+                volts.append(V)
+            if nose is not None and (stop == NOSE or x[-1] <= 0):
+                break
+            if len(self.pq) and np.abs(V[self.pq]).min() < vmin:
+                break
+            h = min(h * 1.5, max_step) if its <= 3 else (h * 0.7 if its > 5 else h)
+            h = max(h, min_step)
+
+        lam = np.array(lams)
+        return Curve(net, d, lam, np.array(volts) if keep_voltages else None, np.array(vms),
+                     watch, lam.max() if nose is None else nose, critical, nose_vm, steps,
+                     factorizations, nose is not None)
+
+
+def trace(net, d=None, **kwargs):
+    """PV curve of ``net`` for direction ``d`` (default: all loads, see :func:`direction`)."""
+    cont = Continuation(net)
+    return cont.trace(direction(net) if d is None else d, **kwargs)
+
+
+def qv_curve(net, bus, **kwargs):
+    """QV curve at PQ ``bus``: reactive load in Mvar vs. its voltage.
+
+    Returns ``(q, vm, curve)``; ``curve.margin`` is the reactive margin.
+    """
+    if net.bus_type[bus] != PQ:
+        raise ValueError(f'{net.bus_names[bus]} is not a PQ bus')
+    curve = Continuation(net).trace(direction(net, [bus], reactive=True), stop=FULL,
+                                    watch=[bus], **kwargs)
+    q, vm = curve.pv(bus)
+    return q, vm, curve
+
+
+_state = {}
+
+
+def _init_worker(net, base, options):
+    _state.update(cont=Continuation(net, base, options.pop('tol')), options=options)
+
+
+def _trace_buses(buses):
+    cont, opt = _state['cont'], _state['options']
+    net = cont.net
+    out = []
+    for b in buses:
+        c = cont.trace(direction(net, [b]), watch=[b], **opt)
+        out.append(Margin(b, str(net.bus_names[b]), c.margin,
+                          float(c.vm_track[np.argmax(c.lam), 0]), c.critical, c.steps,
+                          c.factorizations, c.converged))
+    return out
+
+
+def loadability(net, buses=None, workers=None, tol=1e-8, chunk=None, **options):
+    """Margin of every load bus (its own load grown alone), as :class:`Margin` records.
+
+    ``buses`` defaults to the PQ buses with active load: the slack meets its
+    own load directly, and a PV bus holds its voltage set-point along the
+    curve (Q limits are not enforced), so neither has a meaningful nose.
+    Explicit ``buses`` may include PV buses.  ``workers`` defaults
+    to the CPU count; ``1`` runs in-process.  ``options`` go to
+    :meth:`Continuation.trace`.
+    """
+    base = newton_raphson(net, tol=tol)
+    if buses is None:
+        buses = np.flatnonzero((net.pd > 0) & (net.bus_type == PQ))
+    todo = [int(b) for b in buses]
+    options = dict(options, tol=tol)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo)))
+    chunk = chunk or max(1, int(np.ceil(len(todo) / (4 * workers))))
+    chunks = [todo[i:i + chunk] for i in range(0, len(todo), chunk)]
+    if workers == 1:
+        _init_worker(net, base, options)
+        return [m for part in map(_trace_buses, chunks) for m in part]
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(net, base, options)) as pool:
+        return [m for part in pool.map(_trace_buses, chunks) for m in part]
+
+
+def report(curve, margins=(), file=None, points=12):
+    """Print the system PV curve summary and the per-bus margins."""
+    net = curve.net
+    out = lambda *a: print(*a, file=file)
+    state = 'nose located' if curve.converged else 'nose NOT located'
+    out(f'\n=== {net.title}: continuation power flow ===')
+    out(f'All loads: margin {curve.margin:.2f} MW (x{1 + curve.margin / max(net.pd.sum(), 1e-12):.3f} '
+        f'of {net.pd.sum():.2f} MW), {state} after {curve.steps} steps, '
+        f'{curve.factorizations} factorizations')
+    if curve.critical >= 0:
+        out(f'Critical bus: {net.bus_names[curve.critical]} ({curve.nose_vm:.4f} pu at the nose)')
+    if curve.critical >= 0 and curve.critical in curve.watch:
+        mw, vm = curve.pv(curve.critical)
+        pick = np.unique(np.linspace(0, len(mw) - 1, min(points, len(mw))).astype(int))
+        out(f'\nPV curve at {net.bus_names[curve.critical]}')
+        out('Added load (MW)   V (p.u.)')
+        for p, v in zip(mw[pick], vm[pick]):
+            out(f'{p:14.2f}   {v:8.4f}')
+    if len(margins):
+        out('\nLoad bus    Load (MW)  Margin (MW)  V nose   Critical   Steps')
+        out('-' * 62)
+        for m in sorted(margins, key=lambda m: m.margin):
+            out(f'{m.name:<10}  {net.pd[m.bus]:9.2f}  {m.margin:11.2f}  {m.nose_vm:7.4f}  '
+                f'{net.bus_names[m.critical] if m.critical >= 0 else "-":<9}  {m.steps:5d}')
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_case
+
+    parser = argparse.ArgumentParser(description='Continuation power flow and loadability margins.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--dispatch', action='store_true',
+                        help='PV generators pick up added load (default: the slack)')
+    parser.add_argument('--no-buses', action='store_true', help='skip the per-load-bus margins')
+    parser.add_argument('--qv', default=None, help='also print the QV curve at this bus name')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    for grid in args.grids:
+        net = load_case(grid)
+        if args.qv is not None:
+            hits = np.flatnonzero(net.bus_names == args.qv)
+            if not len(hits):
+                parser.error(f'--qv: {net.name} has no bus named {args.qv!r}')
+            bus = int(hits[0])
+            if net.bus_type[bus] != PQ:
+                parser.error(f'--qv: {args.qv} is not a PQ bus of {net.name} '
+                             '(QV curves hold the voltage of PV and slack buses)')
+        t0 = time.perf_counter()
+        curve = trace(net, direction(net, dispatch=args.dispatch))
+        margins = [] if args.no_buses else loadability(net, workers=args.workers)
+        report(curve, margins)
+        if args.qv is not None:
+            q, vm, qv = qv_curve(net, bus)
+            print(f'\nQV curve at {args.qv}: reactive margin {qv.margin:.2f} Mvar')
+            print('Q load (Mvar)   V (p.u.)')
+            for a, v in zip(q[::max(1, len(q) // 12)], vm[::max(1, len(q) // 12)]):
+                print(f'{a:13.2f}   {v:8.4f}')
+        print(f'({time.perf_counter() - t0:.2f} s)')
+
+
+if __name__ == '__main__':
+    main()
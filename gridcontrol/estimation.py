@@ -0,0 +1,497 @@
+"""Sparse weighted-least-squares state estimation with bad-data detection.
+
+Reconciles noisy measurements with the network model: bus voltage
+magnitudes and angles, bus injections and branch-end flows are fitted by
+Gauss-Newton on the WLS objective ``J = sum(((z - h(V)) / sigma)**2)``,
+using the same Ybus and polar derivatives as the Newton-Raphson load flow
+(:class:`~gridcontrol.powerflow.JacobianStructure`).
+
+A :class:`StateEstimator` is built once per network and measurement
+layout.  It fixes the sparsity pattern of the measurement Jacobian ``H``
+and a fill-reducing ordering of the gain matrix ``G = H' W H``; every
+iteration of every scan then assembles ``H`` by a gather straight into
+that ordering and factorizes ``G`` without a new ordering step.
+
+After convergence the chi-square test on ``J`` (and, for large
+measurement sets, a bound on the largest weighted residual) decides
+whether bad data is suspected; if so the largest normalized residual
+``|r_i| / sqrt(Omega_ii)``, ``Omega = R - H inv(G) H'``, identifies it, the
+measurement is dropped (weight zero, so the layout is unchanged) and the
+estimate is repeated::
+
+    est = StateEstimator(net, meas)
+    result = est.estimate(meas)
+    result.bad          # indices of removed measurements
+
+:class:`TelemetryEstimator` feeds it from a telemetry stream once per scan.
+Run ``python -m gridcontrol.estimation grid3`` for a demonstration.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from scipy.stats import chi2, norm
+
+from .network import PQ
+from .powerflow import JacobianStructure, bus_sets
+from .ybus import branch_admittances, branch_flows, make_ybus
+
+# Measurement kinds: bus voltage magnitude (pu) and angle (degrees), bus
+# injections (pu) and branch flows entering the from/to end (pu)
+KINDS = ('vm', 'va', 'p', 'q', 'pf', 'qf', 'pt', 'qt')
+_BUS_KINDS = 4
+DEFAULT_SIGMA = {'vm': 0.004, 'va': 0.01, 'p': 0.01, 'q': 0.01,
+                 'pf': 0.008, 'qf': 0.008, 'pt': 0.008, 'qt': 0.008}
+# Normalized residuals above this flag bad data
+LNR_THRESHOLD = 3.0
+
+
+@dataclass
+class Measurements:
+    """Parallel arrays of measurements.
+
+    ``kind`` indexes :data:`KINDS`; ``index`` is the bus (``vm``, ``va``,
+    ``p``, ``q``) or branch (flows) measured.
+    """
+
+    kind: np.ndarray
+    index: np.ndarray
+    value: np.ndarray
+    sigma: np.ndarray
+
+    def __len__(self):
+        return len(self.kind)
+
+    @classmethod
+    def of(cls, kind, index, value, sigma=None):
+        """Measurements of one kind; ``sigma`` defaults to :data:`DEFAULT_SIGMA`."""
+        index = np.atleast_1d(np.asarray(index, dtype=np.intp))
+        sigma = DEFAULT_SIGMA[kind] if sigma is None else sigma
+        return cls(np.full(len(index), KINDS.index(kind), dtype=np.int8), index,
+                   np.broadcast_to(np.asarray(value, dtype=np.float64), index.shape).copy(),
+                   np.broadcast_to(np.asarray(sigma, dtype=np.float64), index.shape).copy())
+
+    def __add__(self, other):
+        return Measurements(*(np.concatenate((a, b)) for a, b in
+                              zip((self.kind, self.index, self.value, self.sigma),
+                                  (other.kind, other.index, other.value, other.sigma))))
+
+    def labels(self, net):
+        """``'p@Bus5'``-style text per measurement."""
+        return [f'{KINDS[k]}@{(net.bus_names if k < _BUS_KINDS else net.branch_names)[i]}'
+                for k, i in zip(self.kind, self.index)]
+
+
+def measured_values(net, V, kind, index):
+    """Exact values ``h(V)`` of measurements ``(kind, index)``."""
+    s_bus = V * np.conj(make_ybus(net) @ V)
+    sf, st = branch_flows(net, V)
+    table = np.stack((np.abs(V), np.rad2deg(np.angle(V)), s_bus.real, s_bus.imag))
+    flows = np.stack((sf.real, sf.imag, st.real, st.imag))
+    bus = kind < _BUS_KINDS
+    out = np.empty(len(kind))
+    out[bus] = table[kind[bus], index[bus]]
+    out[~bus] = flows[kind[~bus] - _BUS_KINDS, index[~bus]]
+    return out
+
+
+def synthetic_measurements(net, V, kinds=('vm', 'p', 'q', 'pf', 'qf'), sigma=None, seed=0):
+    """A full set of ``kinds`` measured at state ``V`` with Gaussian noise.
+
+    Bus kinds cover every bus, flow kinds every in-service branch.
+    """
+    rng = np.random.default_rng(seed)
+    sigma = dict(DEFAULT_SIGMA, **(sigma or {}))
+    on = np.flatnonzero(net.branch_status != 0)
+    meas = None
+    for kind in kinds:
+        index = np.arange(net.n_bus) if KINDS.index(kind) < _BUS_KINDS else on
+        part = Measurements.of(kind, index, 0.0, sigma[kind])
+        meas = part if meas is None else meas + part
+    meas.value = measured_values(net, V, meas.kind, meas.index) + meas.sigma * rng.standard_normal(len(meas))
+    return meas
+
+
+def telemetry_measurements(net, vm, p, sigma_vm=DEFAULT_SIGMA['vm'], sigma_p=DEFAULT_SIGMA['p'],
+                           sigma_pseudo=0.1):
+    """Measurements from one telemetry row: ``vm`` (pu) and ``p`` (MW) per bus.
+
+    Reactive injections are not streamed, so the model's load ``-qd`` at
+    PQ buses is added as pseudo-measurements with the loose
+    ``sigma_pseudo`` (pu); generator reactive output is left free.
+    """
+    buses = np.arange(net.n_bus)
+    pq = np.flatnonzero(net.bus_type == PQ)
+    return (Measurements.of('vm', buses, vm, sigma_vm)
+            + Measurements.of('p', buses, np.asarray(p) / net.base_mva, sigma_p)
+            + Measurements.of('q', pq, -np.nan_to_num(net.qd[pq]) / net.base_mva, sigma_pseudo))
+
+
+@dataclass
+class EstimationResult:
+    """Estimated state and measurement residuals.
+
+    ``residuals`` are ``z - h(V)`` for every measurement (removed ones
+    included); ``bad`` lists the measurements dropped as bad data and
+    ``normalized`` the largest normalized residual of each removal round.
+    """
+
+    net: object
+    V: np.ndarray
+    converged: bool
+    iterations: int
+    measurements: Measurements
+    residuals: np.ndarray
+    objective: float
+    chi2_limit: float
+    bad: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+    normalized: list = field(default_factory=list)
+
+    @property
+    def vm(self):
+        """Voltage magnitudes (pu)."""
+        return np.abs(self.V)
+
+    @property
+    def va(self):
+        """Voltage angles (degrees)."""
+        return np.rad2deg(np.angle(self.V))
+
+    @property
+    def suspect(self):
+        """True if the final objective still fails the chi-square test."""
+        return self.objective > self.chi2_limit
+
+
+class StateEstimator:
+    """WLS estimator for one network and measurement layout.
+
+    ``layout`` gives the ``kind``/``index`` of the measurements (values are
+    not used); :meth:`estimate` takes measurements in the same order.
+    """
+
+    def __init__(self, net, layout, ybus=None):
+        self.net = net
+        self.ybus = make_ybus(net) if ybus is None else ybus
+        self.kind = np.asarray(layout.kind)
+        self.index = np.asarray(layout.index)
+        n = net.n_bus
+        self.ref = bus_sets(net.bus_type)[0]
+        if not len(self.ref):
+            self.ref = np.array([0])
+        angle = np.setdiff1d(np.arange(n), self.ref)
+        n_a = len(angle)
+        self.n_state = n_a + n
+        col_a = np.full(n, -1, dtype=np.intp)
+        col_a[angle] = np.arange(n_a)
+        col_m = n_a + np.arange(n)
+        self._angle = angle
+        self._jac = JacobianStructure(self.ybus, angle, np.arange(n))
+
+        # Flow measurements: near/far buses and two-port terms at the near end
+        yff, yft, ytf, ytt = branch_admittances(net)
+        flow = np.flatnonzero(self.kind >= _BUS_KINDS)
+        br = self.index[flow]
+        at_to = self.kind[flow] >= KINDS.index('pt')
+        f, t = net.branch_from[br], net.branch_to[br]
+        self._flow = flow
+        self._near = np.where(at_to, t, f)
+        self._far = np.where(at_to, f, t)
+        self._y_nn = np.where(at_to, ytt[br], yff[br])
+        self._y_nf = np.where(at_to, ytf[br], yft[br])
+        self._flow_imag = np.isin(self.kind[flow], (KINDS.index('qf'), KINDS.index('qt')))
+
+        # Injection measurements take every Ybus entry of their row
+        inj = np.flatnonzero((self.kind == KINDS.index('p')) | (self.kind == KINDS.index('q')))
+        ptr = self.ybus.indptr
+        counts = ptr[self.index[inj] + 1] - ptr[self.index[inj]]
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        self._inj_rows = np.repeat(inj, counts)
+        self._inj_nz = np.repeat(ptr[self.index[inj]], counts) + within
+        self._inj_imag = np.repeat(self.kind[inj] == KINDS.index('q'), counts)
+        ycols = self._jac.cols[self._inj_nz]
+
+        # Pattern of H in the order :meth:`_values` produces the values
+        vm = np.flatnonzero(self.kind == KINDS.index('vm'))
+        va = np.flatnonzero(self.kind == KINDS.index('va'))
+        rows = np.concatenate((vm, va, self._inj_rows, self._inj_rows, np.tile(flow, 4)))
+        cols = np.concatenate((col_m[self.index[vm]], col_a[self.index[va]], col_a[ycols],
+                               col_m[ycols], col_a[self._near], col_a[self._far],
+                               col_m[self._near], col_m[self._far]))
+        keep = cols >= 0
+        self._keep = np.flatnonzero(keep)
+        rows, cols = rows[keep], cols[keep]
+        self._vm, self._va = vm, va
+
+        # Fill-reducing ordering of G from its value at a flat start, reused
+        # for every factorization (SuperLU then runs with NATURAL ordering)
+        order = np.lexsort((rows, cols))
+        self._rows, self._cols, self._order = rows[order], cols[order], order
+        w = 1.0 / np.asarray(layout.sigma, dtype=np.float64) ** 2
+        V = np.ones(n, dtype=complex)
+        G = self._gain(self._assemble(V, np.arange(self.n_state)), w)[0]
+        try:
+            lu = splu(G, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                      options=dict(SymmetricMode=True))
+        except RuntimeError:
+            raise ValueError('the network is not observable from these measurements') from None
+        self.perm = lu.perm_c
+        self._pcols = self.perm[self._cols]
+        order = np.lexsort((self._rows, self._pcols))
+        self._order = self._order[order]
+        self._rows, self._pcols = self._rows[order], self._pcols[order]
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(self._pcols,
+                                                                  minlength=self.n_state))))
+
+    def __len__(self):
+        return len(self.kind)
+
+    def _values(self, V):
+        """``h(V)`` and the nonzeros of ``H`` in pattern order."""
+        ibus = self.ybus @ V
+        s_bus = V * np.conj(ibus)
+        dva, dvm = self._jac.derivatives(V, ibus)
+        d_a, d_m = dva[self._inj_nz], dvm[self._inj_nz]
+        d_a = np.where(self._inj_imag, d_a.imag, d_a.real)
+        d_m = np.where(self._inj_imag, d_m.imag, d_m.real)
+
+        vn, vf = V[self._near], V[self._far]
+        c = vn * np.conj(self._y_nf * vf)
+        an, af = np.abs(vn), np.abs(vf)
+        s_flow = an ** 2 * np.conj(self._y_nn) + c
+        parts = np.stack((1j * c, -1j * c, 2 * an * np.conj(self._y_nn) + c / an, c / af))
+        parts = np.where(self._flow_imag, parts.imag, parts.real)
+
+        h = np.empty(len(self.kind))
+        h[self._vm] = np.abs(V[self.index[self._vm]])
+        h[self._va] = np.angle(V[self.index[self._va]])
+        inj = self.kind == KINDS.index('p')
+        h[inj] = s_bus.real[self.index[inj]]
+        inj = self.kind == KINDS.index('q')
+        h[inj] = s_bus.imag[self.index[inj]]
+        h[self._flow] = np.where(self._flow_imag, s_flow.imag, s_flow.real)
+        values = np.concatenate((np.ones(len(self._vm) + len(self._va)), d_a, d_m, parts.ravel()))
+        return h, values[self._keep]
+
+    def _assemble(self, V, perm):
+        """``H`` at ``V`` with state columns renumbered by ``perm``."""
+        values = self._values(V)[1]
+        cols = perm[self._cols]
+        return sp.csc_matrix((values[self._order], (self._rows, cols)),
+                             shape=(len(self.kind), self.n_state))
+
+    def _gain(self, H, w):
+        Hw = sp.csc_matrix((H.data * w[H.indices], H.indices, H.indptr), shape=H.shape)
+        return (H.T @ Hw).tocsc(), Hw
+
+    def _factor(self, G):
+        try:
+            return splu(G, permc_spec='NATURAL', diag_pivot_thresh=0.0,
+                        options=dict(SymmetricMode=True))
+        except RuntimeError:
+            raise ValueError('the network is not observable from these measurements') from None
+
+    def _solve(self, z, w, V, tol, max_iter):
+        """Gauss-Newton from ``V``; returns ``(V, converged, iterations, r, H, lu)``."""
+        va, vm = np.angle(V), np.abs(V)
+        n_a = len(self._angle)
+        converged = False
+        for iterations in range(1, max_iter + 1):
+            h, values = self._values(V)
+            H = sp.csc_matrix((values[self._order], self._rows, self._indptr),
+                              shape=(len(self.kind), self.n_state))
+            r = z - h
+            G, Hw = self._gain(H, w)
+            lu = self._factor(G)
+            dx = lu.solve(Hw.T @ r)[self.perm]
+            va[self._angle] += dx[:n_a]
+            vm += dx[n_a:]
+            V = vm * np.exp(1j * va)
+            if np.abs(dx).max() < tol:
+                converged = True
+                break
+        r = z - self._values(V)[0]
+        return V, converged, iterations, r, H, lu
+
+    def normalized_residuals(self, H, lu, r, w, candidates=None, block=256):
+        """``|r_i| / sqrt(Omega_ii)`` for measurements with ``w > 0``, else ``nan``.
+
+        ``Omega_ii = 1/w_i - h_i' inv(G) h_i`` takes one solve per
+        measurement, so ``candidates`` limits the evaluation to the
+        measurements with the largest weighted residuals ``|r_i| sqrt(w_i)``
+        (a lower bound of the normalized residual).  Critical measurements
+        (``Omega_ii`` ~ 0) also get ``nan``.
+        """
+        rows = H.tocsr()
+        live = np.flatnonzero(w > 0)
+        if candidates is not None and candidates < len(live):
+            weighted = np.abs(r[live]) * np.sqrt(w[live])
+            live = live[np.argpartition(weighted, -candidates)[-candidates:]]
+        out = np.full(len(r), np.nan)
+        for lo in range(0, len(live), block):
+            idx = live[lo:lo + block]
+            hb = rows[idx].toarray()
+            x = lu.solve(np.ascontiguousarray(hb.T))
+            omega = 1.0 / w[idx] - np.einsum('ij,ji->i', hb, x)
+            ok = omega > 1e-10 / w[idx]
+            out[idx[ok]] = np.abs(r[idx[ok]]) / np.sqrt(omega[ok])
+        return out
+
+    def estimate(self, measurements, v0=None, tol=1e-6, max_iter=20, bad_data=True, alpha=0.01,
+                 threshold=LNR_THRESHOLD, max_removals=10, candidates=200):
+        """Estimate the state from ``measurements`` (laid out as the estimator).
+
+        ``v0`` warm-starts from a previous estimate (default: flat start at
+        the reference angles).  With ``bad_data`` a failed chi-square test
+        (confidence ``1 - alpha``) or a weighted residual beyond the
+        ``1 - alpha`` bound of the largest of ``m`` standard normals triggers
+        largest-normalized-residual
+        removal while the largest exceeds ``threshold``, evaluated over
+        ``candidates`` suspects (see :meth:`normalized_residuals`; ``None``
+        for all measurements).
+        """
+        if len(measurements) != len(self.kind):
+            raise ValueError(f'{len(measurements)} measurements for a layout of {len(self.kind)}')
+        z = np.asarray(measurements.value, dtype=np.float64).copy()
+        z[self._va] = np.deg2rad(z[self._va])
+        w = 1.0 / np.asarray(measurements.sigma, dtype=np.float64) ** 2
+        if v0 is None:
+            V = np.exp(1j * np.deg2rad(np.where(np.isnan(self.net.va), 0.0, self.net.va)))
+            V[self._angle] = 1.0
+        else:
+            V = np.array(v0, dtype=complex)
+
+        bad, normalized = [], []
+        while True:
+            V, converged, iterations, r, H, lu = self._solve(z, w, V, tol, max_iter)
+            objective = float(np.sum(w * r ** 2))
+            dof = int((w > 0).sum()) - self.n_state
+            limit = float(chi2.ppf(1.0 - alpha, dof)) if dof > 0 else np.inf
+            # With many measurements one gross error hardly moves J; the
+            # weighted residuals (a lower bound of the normalized ones) are
+            # tested too, against the 1 - alpha bound of their maximum
+            live = int((w > 0).sum())
+            peak = float(norm.isf(alpha / (2 * max(live, 1))))
+            flagged = objective > limit or (np.abs(r) * np.sqrt(w)).max(initial=0.0) > peak
+            if not bad_data or not flagged or len(bad) >= max_removals:
+                break
+            rn = self.normalized_residuals(H, lu, r, w, candidates)
+            if np.isnan(rn).all():
+                break
+            worst = int(np.nanargmax(rn))
+            if rn[worst] <= threshold:
+                break
+            bad.append(worst)
+            normalized.append(float(rn[worst]))
+            w[worst] = 0.0
+
+        r[self._va] = np.rad2deg(r[self._va])
+        return EstimationResult(self.net, V, converged, iterations, measurements, r, objective, limit,
+                                np.array(bad, dtype=np.intp), normalized)
+
+
+class TelemetryEstimator:
+    """Estimates of one telemetry stream's grid, one per scan.
+
+    Each :meth:`scan` averages the rows written to ``stream`` (a
+    :class:`~gridcontrol.telemetry.GridStream` with the buses of ``net`` in
+    order) since the previous scan into :func:`telemetry_measurements` and
+    estimates warm-started from the previous scan.
+    """
+
+    def __init__(self, net, stream, **sigma):
+        self.net = net
+        self.stream = stream
+        self.sigma = sigma
+        layout = telemetry_measurements(net, np.ones(net.n_bus), np.zeros(net.n_bus), **sigma)
+        self.estimator = StateEstimator(net, layout)
+        self.seq = stream.seq
+        self.last = None
+
+    def scan(self, **kw):
+        """Estimate from the new rows; returns the previous result if there are none."""
+        first, times, vm = self.stream.vm.since(self.seq)
+        if not len(times):
+            return self.last
+        p = self.stream.p.since(first)[2]
+        self.seq = first + len(times)
+        meas = telemetry_measurements(self.net, vm.mean(axis=0), p.mean(axis=0), **self.sigma)
+        self.last = self.estimator.estimate(meas, None if self.last is None else self.last.V, **kw)
+        return self.last
+
+
+def report(result, file=None, limit=10):
+    """Print the estimated voltages, the test statistic and removed bad data."""
+    out = lambda *a: print(*a, file=file)
+    net, meas = result.net, result.measurements
+    out(f'\n=== {net.title}: WLS state estimate ({len(meas)} measurements) ===')
+    out(f"{'Converged' if result.converged else 'Did NOT converge'} in {result.iterations} "
+        f'iterations; J = {result.objective:.1f} (chi-square limit {result.chi2_limit:.1f})')
+    out(f"{'Bus':<10} {'V (pu)':>8} {'Angle':>8}")
+    for name, vm, va in list(zip(net.bus_names, result.vm, result.va))[:limit]:
+        out(f'{name:<10} {vm:8.4f} {va:8.2f}')
+    if net.n_bus > limit:
+        out(f'... {net.n_bus - limit} more')
+    labels = meas.labels(net)
+    for i, rn in zip(result.bad, result.normalized):
+        out(f'bad data: {labels[i]} = {meas.value[i]:.4f} (normalized residual {rn:.1f})')
+
+
+def main(argv=None):
+    from .grids import load_case
+    from .live import load_flow_stream
+    from .telemetry import GridStream
+
+    parser = argparse.ArgumentParser(description='WLS state estimation on simulated measurements.')
+    parser.add_argument('grid', help='grid name or number')
+    parser.add_argument('--scans', type=int, default=5)
+    parser.add_argument('--bad', type=int, default=1, help='gross errors injected per scan')
+    parser.add_argument('--telemetry', action='store_true',
+                        help='feed bus voltages and injections through a telemetry stream')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    net = load_case(args.grid)
+    rng = np.random.default_rng(args.seed)
+    if args.telemetry:
+        stream = GridStream(net.name, net.bus_names, capacity=1000)
+        tracker = TelemetryEstimator(net, stream)
+    else:
+        estimator = None
+    previous = None
+    print(f"{'scan':>4} {'ms':>7} {'iter':>4} {'J':>8} {'limit':>8} {'max dV':>8}  bad data")
+    for scan, truth in enumerate(load_flow_stream(net, steps=args.scans, period=args.scans * 4)):
+        t0 = time.perf_counter()
+        if args.telemetry:
+            rows = 50
+            vm = truth.vm + DEFAULT_SIGMA['vm'] * rng.standard_normal((rows, net.n_bus))
+            p = (truth.sbus.real + DEFAULT_SIGMA['p'] * rng.standard_normal((rows, net.n_bus))
+                 ) * net.base_mva
+            if args.bad:
+                p[:, rng.choice(net.n_bus, args.bad, replace=False)] += 50.0
+            stream.write(scan + np.arange(rows) / rows, vm, p)
+            t0 = time.perf_counter()
+            result = tracker.scan()
+        else:
+            meas = synthetic_measurements(net, truth.V, seed=args.seed + scan)
+            if args.bad:
+                meas.value[rng.choice(len(meas), args.bad, replace=False)] += 20 * DEFAULT_SIGMA['p']
+            if estimator is None:
+                estimator = StateEstimator(net, meas)
+            t0 = time.perf_counter()
+            result = estimator.estimate(meas, None if previous is None else previous.V)
+            previous = result
+        elapsed = time.perf_counter() - t0
+        labels = result.measurements.labels(net)
+        print(f'{scan:4d} {elapsed * 1e3:7.2f} {result.iterations:4d} {result.objective:8.1f} '
+              f'{result.chi2_limit:8.1f} {np.abs(result.V - truth.V).max():8.5f}  '
+              + ', '.join(labels[i] for i in result.bad))
+    report(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""Direct reader for ETAP study result files.
+
+ETAP stores each study's report data as a small database next to the
+project (``ETAP_Files/gridN/Untitled.*``).  Load-flow (``.LF1S``) and
+short-circuit (``.SQ1S``) results are SQL Server Compact 4.0 databases;
+unbalanced/time-domain load flow (``.TU1S``) results are SQLite.  Both are
+read with plain ``SELECT`` statements, one query per table, and returned as
+columns of NumPy arrays, so a large project imports in a handful of queries
+instead of being transcribed from the PDF reports.
+
+SQLite files are opened with the standard library.  SQL Server Compact
+files need the SQL CE 4.0 OLE DB provider that ETAP installs and the
+``adodbapi`` package (pywin32), i.e. a Windows machine with ETAP.
+
+The tables used here are ``LFR`` (bus/branch load flow), ``LFSumLoss``
+(branch losses), ``SCLG``/``SCLL``/``SCLLG`` (fault results) and
+``tdbusinfo``/``tdbusresult``/``tdsysresult`` for ``.TU1S``.  Only the
+``.TU1S`` schema has been checked against the project files; the SQL CE
+table and column names (``LFR``, ``IDFrom``, ``LFMW``, ``SCLG``,
+``kASym3ph``, ...) follow ETAP's report layout and are untested::
+
+    lf = load_flow_results('ETAP_Files/grid5/Untitled.LF1S')
+    v0, missing = load_flow_voltages(net, lf)
+    solve(net, v0=v0)                   # ETAP voltages as the initial guess
+
+Run ``python -m gridcontrol.etap FILE`` to list the tables of a result file.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+
+import numpy as np
+
+ETAP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ETAP_Files')
+
+# Storage formats
+SQLITE = 'sqlite'
+SQLCE = 'sqlce'
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+# Engine signature at offset 16 of a SQL Server Compact 4.0 database
+_SQLCE4_MAGIC = bytes.fromhex('9d7b3500')
+
+SQLCE_PROVIDER = 'Microsoft.SQLSERVER.CE.OLEDB.4.0'
+
+FAULT_TABLES = ('SCLG', 'SCLL', 'SCLLG')
+
+# Declared column types read as numbers (SQLite affinity rules plus the SQL
+# Server Compact numeric types)
+_NUMERIC_TYPE = re.compile(r'int|real|floa|doub|num|dec|money', re.IGNORECASE)
+
+
+def study_file(grid, extension):
+    """Path of the ``Untitled.<extension>`` result file of a study grid."""
+    from .grids import grid_name
+
+    return os.path.join(ETAP_DIR, grid_name(grid), f'Untitled.{extension.lstrip(".")}')
+
+
+def file_format(path):
+    """:data:`SQLITE` or :data:`SQLCE`; ``ValueError`` for anything else."""
+    with open(path, 'rb') as fh:
+        header = fh.read(20)
+    if header.startswith(_SQLITE_MAGIC):
+        return SQLITE
+    if header[16:20] == _SQLCE4_MAGIC:
+        return SQLCE
+    raise ValueError(f'{path}: not an ETAP result database (SQLite or SQL Server Compact 4.0)')
+
+
+def _columnar(cursor, numeric=()):
+    """Fetch all rows of ``cursor`` as ``{column: ndarray}``.
+
+    Numeric columns become float arrays (``NULL`` as ``nan``), all others
+    string arrays (``NULL`` as ``''``).  Without rows the values say
+    nothing; then only the columns named in ``numeric`` are float arrays.
+    """
+    names = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+    columns = zip(*rows) if rows else ([] for _ in names)
+    out = {}
+    for name, values in zip(names, columns):
+        values = list(values)
+        if not values:
+            is_numeric = name in numeric
+        else:
+            is_numeric = all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+                             for v in values)
+        if is_numeric:
+            out[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            out[name] = np.array(['' if v is None else str(v).strip() for v in values], dtype=str)
+    return out
+
+
+class ResultFile:
+    """An open ETAP result database; usable as a context manager."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.format = file_format(self.path)
+        if self.format == SQLITE:
+            uri = 'file:' + os.path.abspath(self.path).replace('\\', '/') + '?mode=ro'
+            self._conn = sqlite3.connect(uri, uri=True)
+        else:
+            try:
+                import adodbapi
+            except ImportError:
+                raise ImportError(
+                    f'{self.path} is a SQL Server Compact database; reading it needs adodbapi '
+                    f'(pywin32) and the {SQLCE_PROVIDER} provider installed with ETAP') from None
+            self._conn = adodbapi.connect(
+                f'Provider={SQLCE_PROVIDER};Data Source={os.path.abspath(self.path)};Mode=Read')
+        self._tables = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def query(self, sql, params=(), numeric=()):
+        """Run ``sql`` and return the result as ``{column: ndarray}``.
+
+        ``numeric`` names the float columns of an empty result (see
+        :func:`_columnar`).
+        """
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return _columnar(cursor, numeric)
+        finally:
+            cursor.close()
+
+    def numeric_columns(self, name):
+        """Columns of table ``name`` whose declared type is numeric."""
+        if self.format == SQLITE:
+            info = self.query(f'PRAGMA table_info([{name}])')
+            columns, types = info.get('name', ()), info.get('type', ())
+        else:
+            info = self.query('SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS '
+                              'WHERE TABLE_NAME = ?', (name,))
+            columns, types = info.get('COLUMN_NAME', ()), info.get('DATA_TYPE', ())
+        return {c for c, t in zip(columns, types) if _NUMERIC_TYPE.search(t)}
+
+    def tables(self):
+        """Names of the user tables, in file order."""
+        if self._tables is None:
+            if self.format == SQLITE:
+                sql = "SELECT name FROM sqlite_master WHERE type = 'table'"
+            else:
+                sql = "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'TABLE'"
+            self._tables = list(next(iter(self.query(sql).values()), []))
+        return self._tables
+
+    def has_table(self, name):
+        return name.lower() in (t.lower() for t in self.tables())
+
+    def table(self, name, columns=None, order_by=None):
+        """All rows of table ``name`` (optionally only ``columns``) in one query."""
+        if not self.has_table(name):
+            raise KeyError(f'{self.path}: no table {name!r}')
+        cols = '*' if columns is None else ', '.join(f'[{c}]' for c in columns)
+        sql = f'SELECT {cols} FROM [{name}]'
+        if order_by:
+            sql += f' ORDER BY [{order_by}]'
+        return self.query(sql, numeric=self.numeric_columns(name))
+
+    def count(self, name):
+        return int(next(iter(self.query(f'SELECT COUNT(*) FROM [{name}]').values()))[0])
+
+
+@dataclass
+class LoadFlowResults:
+    """Bus voltages, branch flows and losses of one ETAP load-flow run."""
+
+    source: str
+    bus_names: np.ndarray
+    bus_kv: np.ndarray
+    vm: np.ndarray              # pu
+    va: np.ndarray              # degrees
+    branch_from: np.ndarray     # bus names
+    branch_to: np.ndarray
+    p: np.ndarray               # MW, measured at ``branch_from``
+    q: np.ndarray               # Mvar
+    losses: complex             # total MW + j Mvar
+
+    def bus(self, name):
+        """Row of bus ``name``."""
+        hits = np.flatnonzero(self.bus_names == name)
+        if not len(hits):
+            raise KeyError(f'{self.source}: no bus named {name!r}')
+        return int(hits[0])
+
+
+@dataclass
+class FaultResults:
+    """ETAP fault currents (kA) per faulted bus, in ``FAULT_TYPES`` order."""
+
+    source: str
+    bus_names: np.ndarray
+    bus_kv: np.ndarray
+    ka: np.ndarray              # (n_bus, 4); nan where a fault type was not run
+
+
+def _percent_to_pu(v):
+    # ETAP reports bus voltages in percent of nominal
+    return v / 100.0 if np.nanmax(v, initial=0.0) > 2.0 else v
+
+
+def _forward_fill(names):
+    """Repeat the last non-empty entry over the empty ones that follow it."""
+    idx = np.maximum.accumulate(np.where(names != '', np.arange(len(names)), 0))
+    return names[idx]
+
+
+def _lf1s_results(db):
+    # One LFR row per bus with its first outgoing flow; further flows of the
+    # same bus follow on rows with an empty IDFrom
+    order = 'SequenceOrder' if 'SequenceOrder' in db.query('SELECT * FROM [LFR] WHERE 1 = 0') else None
+    lfr = db.table('LFR', order_by=order)
+    from_bus = _forward_fill(lfr['IDFrom'])
+    names, first = np.unique(from_bus, return_index=True)
+    first = np.sort(first[names != ''])
+    flows = lfr['IDTo'] != ''
+    losses = 0j
+    if db.has_table('LFSumLoss'):
+        loss = db.table('LFSumLoss', ['LosskW', 'Losskvar'])
+        losses = complex(np.nansum(loss['LosskW']), np.nansum(loss['Losskvar'])) / 1000.0
+    return dict(bus_names=from_bus[first], bus_kv=lfr['kV'][first],
+                vm=_percent_to_pu(lfr['VoltMag'][first]), va=lfr['VoltAng'][first],
+                branch_from=from_bus[flows], branch_to=lfr['IDTo'][flows],
+                p=lfr['LFMW'][flows], q=lfr['LFMvar'][flows], losses=losses)
+
+
+def _tu1s_results(db):
+    # Unbalanced load flow: phase A voltages of the first time point
+    info = db.table('tdbusinfo', ['BusIID', 'BusName', 'NominalKV'])
+    res = db.query('SELECT [BusIID], [VPhA], [AngPhA] FROM [tdbusresult] '
+                   'WHERE [ResultID] = (SELECT MIN([ResultID]) FROM [tdbusresult])')
+    row = {iid: i for i, iid in enumerate(res['BusIID'].tolist())}
+    pick = np.array([row.get(iid, -1) for iid in info['BusIID'].tolist()], dtype=np.intp)
+    vm = np.where(pick >= 0, res['VPhA'][pick] if len(res['VPhA']) else np.nan, np.nan)
+    va = np.where(pick >= 0, res['AngPhA'][pick] if len(res['AngPhA']) else np.nan, np.nan)
+    sysres = db.table('tdsysresult', ['MWLossPhA', 'MWLossPhB', 'MWLossPhC',
+                                      'MvarLossPhA', 'MvarLossPhB', 'MvarLossPhC'])
+    losses = 0j
+    if len(sysres['MWLossPhA']):
+        losses = complex(sum(sysres[f'MWLossPh{p}'][0] for p in 'ABC'),
+                         sum(sysres[f'MvarLossPh{p}'][0] for p in 'ABC'))
+    empty = np.zeros(0)
+    return dict(bus_names=info['BusName'], bus_kv=info['NominalKV'], vm=_percent_to_pu(vm), va=va,
+                branch_from=empty.astype(str), branch_to=empty.astype(str), p=empty, q=empty,
+                losses=losses)
+
+
+def load_flow_results(path):
+    """Read the load-flow results of a ``.LF1S`` or ``.TU1S`` file."""
+    with ResultFile(path) as db:
+        if db.has_table('LFR'):
+            fields = _lf1s_results(db)
+        elif db.has_table('tdbusresult'):
+            fields = _tu1s_results(db)
+        else:
+            raise ValueError(f'{path}: no load-flow result tables')
+    return LoadFlowResults(os.fspath(path), **fields)
+
+
+def fault_results(path):
+    """Read the fault currents of a ``.SQ1S`` file.
+
+    The ``Total`` contribution rows of ``SCLG`` (three-phase and line-to-
+    ground), ``SCLL`` and ``SCLLG`` give one current per faulted bus.
+    """
+    from .shortcircuit import FAULT_TYPES
+
+    with ResultFile(path) as db:
+        tables = {t: db.table(t) for t in FAULT_TABLES if db.has_table(t)}
+    if not tables:
+        raise ValueError(f'{path}: no short-circuit result tables')
+    totals = {t: rows['ToBus'] == 'Total' for t, rows in tables.items()}
+    names = np.unique(np.concatenate([rows['FaultedBus'][totals[t]] for t, rows in tables.items()]))
+    ka = np.full((len(names), len(FAULT_TYPES)), np.nan)
+    kv = np.full(len(names), np.nan)
+    sources = (('SCLG', 'kASym3ph', '3ph'), ('SCLG', 'IaLG', 'lg'),
+               ('SCLL', 'IfLL', 'll'), ('SCLLG', 'IfLLG', 'llg'))
+    for table, column, fault in sources:
+        if table not in tables:
+            continue
+        rows, total = tables[table], totals[table]
+        at = np.searchsorted(names, rows['FaultedBus'][total])
+        ka[at, FAULT_TYPES.index(fault)] = rows[column][total]
+        kv[at] = rows['BusKV'][total]
+    return FaultResults(os.fspath(path), names, kv, ka)
+
+
+def match_buses(net, names):
+    """Indices into ``net`` of bus ``names`` (``-1`` where not found)."""
+    lookup = {b: i for i, b in enumerate(net.bus_names.tolist())}
+    return np.array([lookup.get(b, -1) for b in np.asarray(names).tolist()], dtype=np.intp)
+
+
+def load_flow_voltages(net, results):
+    """Complex bus voltages of ``net`` from ETAP results, for use as ``v0``.
+
+    Buses are matched by name; unmatched buses keep the network's own
+    initial voltage, and ``net`` is not modified (its ``vm`` holds the
+    PV/slack set-points).  Returns ``(V, names of result buses not in net)``.
+    """
+    from .powerflow import initial_voltage
+
+    V = initial_voltage(net)
+    idx = match_buses(net, results.bus_names)
+    found = (idx >= 0) & ~np.isnan(results.vm)
+    V[idx[found]] = results.vm[found] * np.exp(1j * np.deg2rad(results.va[found]))
+    return V, results.bus_names[idx < 0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List or dump the tables of an ETAP result file.')
+    parser.add_argument('path')
+    parser.add_argument('--table', help='print the rows of this table')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with ResultFile(args.path) as db:
+        if args.table is None:
+            print(f'{args.path} ({db.format})')
+            for name in db.tables():
+                print(f'  {name:<32} {db.count(name):8d}')
+            return
+        rows = db.table(args.table)
+    print('\t'.join(rows))
+    for values in list(zip(*rows.values()))[:args.limit]:
+        print('\t'.join(str(v) for v in values))
+
+
+if __name__ == '__main__':
+    main()
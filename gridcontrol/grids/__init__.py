@@ -0,0 +1,36 @@
+"""Grid definitions for the five ETAP study networks.
+
+Each ``gridN`` module holds the hand-entered topology from the SLD drawings
+and the bus/branch tables of its load-flow study.  :func:`load_grid` converts
+the drawing into an array-backed :class:`Network`; :func:`load_case` builds
+the electrical study network (same buses and positions, study branches).
+"""
+
+import importlib
+
+from ..network import Network
+
+GRIDS = ('grid1', 'grid2', 'grid3', 'grid4', 'grid5')
+
+
+def grid_name(grid):
+    """Normalise ``3``, ``'3'`` or ``'grid3'`` to ``'grid3'``."""
+    name = f'grid{grid}' if str(grid).isdigit() else str(grid)
+    if name not in GRIDS:
+        raise KeyError(f'unknown grid {grid!r}; expected one of {", ".join(GRIDS)}')
+    return name
+
+
+def definition(grid):
+    """Return the definition module for ``grid``."""
+    return importlib.import_module(f'{__name__}.{grid_name(grid)}')
+
+
+def load_grid(grid):
+    """Load ``grid`` (number or name) into a :class:`Network`."""
+    return Network.from_definition(definition(grid), name=grid_name(grid))
+
+
+def load_case(grid):
+    """Load the load-flow study network of ``grid`` (number or name)."""
+    return Network.from_definition(definition(grid), name=grid_name(grid), study=True)
@@ -0,0 +1,111 @@
+"""Grid1: IEEE 9 bus network (ETAP_Files/grid1)."""
+
+from ..network import LINE, PQ, PV, SLACK, TRANSFORMER
+
+TITLE = 'Grid1: IEEE 9 Bus Network'
+
+# Bus positions (improved layout for better visibility)
+BUS_POSITIONS = {
+    'Bus1': (0, 0, 0),
+    'Bus2': (3, 2, 0),
+    'Bus3': (6, 0, 0),
+    'Bus4': (9, 2, 0),
+    'Bus5': (12, 0, 0),
+    'Bus6': (15, 2, 0),
+    'Bus7': (9, -2, 0),
+    'Bus8': (6, -4, 0),
+    'Bus9': (3, -2, 0),
+}
+
+# Line connections based on the system topology
+CONNECTIONS = [
+    # Main transmission lines
+    ('Bus1', 'Bus2'),
+    ('Bus2', 'Bus3'),
+    ('Bus3', 'Bus4'),
+    ('Bus4', 'Bus5'),
+    ('Bus5', 'Bus6'),
+    ('Bus4', 'Bus7'),
+    ('Bus7', 'Bus8'),
+    ('Bus8', 'Bus9'),
+    ('Bus9', 'Bus2'),
+
+    # Additional connections for mesh topology
+    ('Bus1', 'Bus9'),
+    ('Bus3', 'Bus8'),
+    ('Bus5', 'Bus7'),
+
+    # Transformer connections (if any)
+    ('Bus1', 'Bus3'),  # Cable3 connection
+]
+
+# Components connected to buses with their ratings
+GENERATORS = {
+    'Gen1 (100 MW)': 'Bus1',
+    'Gen2 (80 MW)': 'Bus5',
+    'Gen4 (120 MW)': 'Bus6'
+}
+
+LOADS = {
+    'Wind Farm (1.5 MVA)': 'Bus2',
+    'Biscuit Factory (1.4 MVA)': 'Bus3',
+    'R_HOUSE1 (0.98 MVA)': 'Bus4',
+    'R_HOUSE2 (0.8 MVA)': 'Bus8',
+    'EV Charging (0.5 MVA)': 'Bus9',
+    'Bank (0.3 MVA)': 'Bus7',
+    'Airport (1.206 MVA)': 'Bus6',
+    'Global Tech Park (0.3 MVA)': 'Bus1',
+    'Power Plant (0.3 MVA)': 'Bus5'
+}
+
+TRANSFORMERS = {
+    'T1 (100 MVA)': ('Bus1', 'Bus2'),
+    'T1_LS2': ('Bus2', 'Bus3'),
+    'T1_HS2': ('Bus4', 'Bus5')
+}
+
+# Bus voltage levels in kV (from the PDF)
+BUS_VOLTAGES = {
+    'Bus1': 11.33,
+    'Bus2': 11.33,
+    'Bus3': 11.3,
+    'Bus4': 11.33,
+    'Bus5': 11.22,
+    'Bus6': 11.3,
+    'Bus7': 11.132,
+    'Bus8': 11.176,
+    'Bus9': 10.0
+}
+
+# Load-flow study data (Load Flow Analysis/grid1/LFA_Verification.m), MW and
+# Mvar on a 100 MVA base.  The script's bus_data columns 9-10 are voltage
+# limits, so no reactive limits are given here.
+# Bus: (type, |V| pu, angle deg, P_gen, Q_gen, P_load, Q_load, Q_min, Q_max)
+STUDY_BUSES = {
+    'Bus1': (SLACK, 1.000, 0.0, 0.0,  0.0, 0.0,   0.0,   None, None),
+    'Bus2': (PQ,    1.000, 0.0, 0.0,  0.0, 0.204, 0.126, None, None),
+    'Bus3': (PV,    1.000, 0.0, 25.0, 0.0, 0.340, 0.211, None, None),
+    'Bus4': (PQ,    1.000, 0.0, 0.0,  0.0, 0.204, 0.126, None, None),
+    'Bus5': (PQ,    1.000, 0.0, 0.0,  0.0, 0.820, 0.508, None, None),
+    'Bus6': (PQ,    1.000, 0.0, 0.0,  0.0, 0.204, 0.126, None, None),
+    'Bus7': (PQ,    1.000, 0.0, 0.0,  0.0, 0.544, 0.337, None, None),
+    'Bus8': (PQ,    1.000, 0.0, 0.0,  0.0, 0.666, 0.413, None, None),
+    'Bus9': (PV,    1.000, 0.0, 25.0, 0.0, 1.972, 1.222, None, None),
+}
+
+# Branch: (name, kind, from, to, R pu, X pu, total B pu, tap)
+STUDY_BRANCHES = [
+    ('Line4',        LINE,        'Bus1', 'Bus2', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line1',        LINE,        'Bus2', 'Bus3', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line6',        LINE,        'Bus1', 'Bus4', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line8',        LINE,        'Bus4', 'Bus7', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line10',       LINE,        'Bus7', 'Bus8', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line12',       LINE,        'Bus2', 'Bus5', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line14',       LINE,        'Bus3', 'Bus5', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Line16',       LINE,        'Bus3', 'Bus6', 0.2036, 0.6640, 0.0006382, 1.0),
+    ('Cable3',       LINE,        'Bus5', 'Bus8', 0.0047, 0.0065, 0.0,       1.0),
+    ('T1 (100 MVA)', TRANSFORMER, 'Bus6', 'Bus9', 0.0049, 0.0993, 0.0,       1.0),
+]
+
+# ETAP load-flow report totals (MW, Mvar)
+ETAP_LOSSES = (6.28, 20.90)
@@ -0,0 +1,106 @@
+"""Grid 2: IEEE 9 bus network (ETAP_Files/grid2)."""
+
+from ..network import LINE, PQ, PV, SLACK, TRANSFORMER
+
+TITLE = 'Grid 2: IEEE 9 bus Network'
+
+# Bus positions (improved layout for better visibility)
+BUS_POSITIONS = {
+    'Bus1': (0, 0, 0),
+    'Bus2': (3, 2, 0),
+    'Bus3': (6, 0, 0),
+    'Bus4': (9, 2, 0),
+    'Bus5': (12, 0, 0),
+    'Bus6': (15, 2, 0),
+    'Bus7': (9, -2, 0),
+    'Bus8': (6, -4, 0),
+    'Bus9': (3, -2, 0),
+}
+
+# Line connections based on the system topology
+CONNECTIONS = [
+    # Main transmission lines based on the circuit diagram
+    ('Bus1', 'Bus2'),
+    ('Bus2', 'Bus3'),
+    ('Bus3', 'Bus4'),
+    ('Bus4', 'Bus5'),
+    ('Bus5', 'Bus6'),
+    ('Bus4', 'Bus7'),
+    ('Bus7', 'Bus8'),
+    ('Bus8', 'Bus9'),
+    ('Bus9', 'Bus2'),
+
+    # Additional connections for mesh topology
+    ('Bus1', 'Bus9'),
+    ('Bus3', 'Bus8'),
+    ('Bus5', 'Bus7'),
+
+    # Cable connections from diagram
+    ('Bus2', 'Bus6'),  # Cable2-6
+    ('Bus4', 'Bus7'),  # Cable4-7
+    ('Bus7', 'Bus8'),  # Cable_7-8
+]
+
+# Components connected to buses with their ratings
+GENERATORS = {
+    'Gen1 (163.2 MW)': 'Bus1',
+    'Gen5 (108.8 MW)': 'Bus4',
+    'Gen9 (120 MW)': 'Bus9'
+}
+
+LOADS = {
+    'Solar Farm (10 MVA)': 'Bus2',
+    'Great Lakes Tech Park (10 MVA)': 'Bus3',
+    'Sewage Treatment (15 MVA)': 'Bus5',
+    'Hospital (17 MVA)': 'Bus6',
+    'Data Center (15 MVA)': 'Bus7',
+    'Water Treatment Plant (16 MVA)': 'Bus8'
+}
+
+TRANSFORMERS = {
+    'TR_1 (100 MVA)': ('Bus1', 'Bus2'),
+    'TR_2 (100 MVA)': ('Bus3', 'Bus4'),
+    'TR_3 (100 MVA)': ('Bus8', 'Bus9')
+}
+
+# Bus voltage levels in kV (from the updated network)
+BUS_VOLTAGES = {
+    'Bus1': 11.3,
+    'Bus2': 20.0,
+    'Bus3': 20.0,
+    'Bus4': 20.0,
+    'Bus5': 11.0,
+    'Bus6': 20.0,
+    'Bus7': 20.0,
+    'Bus8': 20.0,
+    'Bus9': 55.0
+}
+
+# Load-flow study data (Load Flow Analysis/grid2/LFA_Verification.m), MW and
+# Mvar on a 100 MVA base.  The script's bus_data columns 9-10 are voltage
+# limits, so no reactive limits are given here.
+# Bus: (type, |V| pu, angle deg, P_gen, Q_gen, P_load, Q_load, Q_min, Q_max)
+STUDY_BUSES = {
+    'Bus1': (SLACK, 1.130, 0.0, 0.0,  0.0, 0.0,   0.0,    None, None),
+    'Bus2': (PQ,    1.000, 0.0, 0.0,  0.0, 0.0,   0.0,    None, None),
+    'Bus3': (PQ,    1.000, 0.0, 0.0,  0.0, 6.8,   4.214,  None, None),
+    'Bus4': (PQ,    1.000, 0.0, 0.0,  0.0, 6.8,   4.214,  None, None),
+    'Bus5': (PV,    1.000, 0.0, 25.0, 0.0, 0.0,   0.0,    None, None),
+    'Bus6': (PQ,    1.000, 0.0, 0.0,  0.0, 10.88, 6.743,  None, None),
+    'Bus7': (PQ,    1.000, 0.0, 0.0,  0.0, 10.2,  6.321,  None, None),
+    'Bus8': (PQ,    1.000, 0.0, 0.0,  0.0, 21.76, 13.486, None, None),
+    'Bus9': (PV,    1.000, 0.0, 20.0, 0.0, 0.0,   0.0,    None, None),
+}
+
+# Branch: (name, kind, from, to, R pu, X pu, total B pu, tap)
+STUDY_BRANCHES = [
+    ('TR_1 (6.5 MVA)', TRANSFORMER, 'Bus1', 'Bus2', 0.0019, 0.0650, 0.0,    1.0),
+    ('TR_2 (6.5 MVA)', TRANSFORMER, 'Bus4', 'Bus5', 0.0019, 0.0650, 0.0,    1.0),
+    ('TR_3 (8.0 MVA)', TRANSFORMER, 'Bus8', 'Bus9', 0.0023, 0.0800, 0.0,    1.0),
+    ('Cable2-6',       LINE,        'Bus2', 'Bus6', 0.0041, 0.0155, 0.0,    1.0),
+    ('Cable4-7',       LINE,        'Bus4', 'Bus7', 0.0061, 0.0083, 0.0,    1.0),
+    ('Cable_7-8',      LINE,        'Bus7', 'Bus8', 0.0041, 0.0155, 0.0,    1.0),
+    ('Line2-3',        LINE,        'Bus2', 'Bus3', 0.1728, 0.2201, 0.0020, 1.0),
+    ('Line_3-4',       LINE,        'Bus3', 'Bus4', 0.1728, 0.2201, 0.0020, 1.0),
+    ('Line6-8',        LINE,        'Bus6', 'Bus8', 0.1728, 0.2201, 0.0020, 1.0),
+]
@@ -0,0 +1,105 @@
+"""Grid 3: IEEE 9 bus network with wind generation (ETAP_Files/grid3)."""
+
+from ..network import LINE, PQ, PV, SLACK, TRANSFORMER
+
+TITLE = 'Grid 3:IEEE 9 Bus network'
+
+# Bus positions (improved layout for better visibility)
+BUS_POSITIONS = {
+    'Bus1': (0, 0, 0),
+    'Bus2': (3, 2, 0),
+    'Bus3': (6, 0, 0),
+    'Bus4': (9, 2, 0),
+    'Bus_5': (12, 0, 0),
+    'Bus_6': (15, 2, 0),
+    'Bus_7': (9, -2, 0),
+    'Bus_8': (6, -4, 0),
+    'Bus_9': (3, -2, 0),
+}
+
+# Line connections based on the system topology
+CONNECTIONS = [
+    # Main transmission lines based on the circuit diagram
+    ('Bus1', 'Bus2'),
+    ('Bus2', 'Bus3'),
+    ('Bus3', 'Bus4'),
+    ('Bus4', 'Bus_5'),
+    ('Bus_5', 'Bus_6'),
+    ('Bus4', 'Bus_7'),
+    ('Bus_7', 'Bus_8'),
+    ('Bus_8', 'Bus_9'),
+    ('Bus_9', 'Bus2'),
+
+    # Additional connections for mesh topology
+    ('Bus1', 'Bus_9'),
+    ('Bus3', 'Bus_8'),
+    ('Bus_5', 'Bus_7'),
+
+    # Cable connections from diagram
+    ('Bus1', 'Bus3'),  # Cable1
+    ('Bus3', 'Bus_5'),  # Cable3
+]
+
+# Components connected to buses with their ratings
+GENERATORS = {
+    'Gen1 (12.75 MW)': 'Bus1',
+    'Gen3 (21.25 MW)': 'Bus3',
+    'Gen5 (25.5 MW)': 'Bus4',
+    'Wind Farm (30 MW)': 'Bus_5'
+}
+
+LOADS = {
+    'Residential Zone (3.2 MVA)': 'Bus2',
+    'Old Age Home (2.5 MVA)': 'Bus_6',
+    'Hospital (3 MVA)': 'Bus_6',
+    'Tech Park (4 MVA)': 'Bus_7',
+    'Commercial Zone (4 MVA)': 'Bus_8',
+    'Govt. University (3.6 MVA)': 'Bus_9'
+}
+
+TRANSFORMERS = {
+    'T3 (100 MVA)': ('Bus1', 'Bus2'),
+    'T6 (100 MVA)': ('Bus3', 'Bus4'),
+    'T7 (100 MVA)': ('Bus_5', 'Bus_6')
+}
+
+# Bus voltage levels in kV (from the updated network)
+BUS_VOLTAGES = {
+    'Bus1': 6.6,
+    'Bus2': 20.0,
+    'Bus3': 20.0,
+    'Bus4': 20.0,
+    'Bus_5': 6.6,
+    'Bus_6': 20.0,
+    'Bus_7': 20.0,
+    'Bus_8': 20.0,
+    'Bus_9': 6.6
+}
+
+# Load-flow study data (Load Flow Analysis/grid3/LFA_Verification.m),
+# converted from pu to MW and Mvar on a 100 MVA base.
+# Bus: (type, |V| pu, angle deg, P_gen, Q_gen, P_load, Q_load, Q_min, Q_max)
+STUDY_BUSES = {
+    'Bus1':  (SLACK, 1.0, 0.0, 0.0,  0.0, 0.0,  0.0,  None,  None),
+    'Bus2':  (PQ,    1.0, 0.0, 0.0,  0.0, 0.0,  0.0,  None,  None),
+    'Bus3':  (PQ,    1.0, 0.0, 0.0,  0.0, 2.54, 1.57, None,  None),
+    'Bus4':  (PQ,    1.0, 0.0, 0.0,  0.0, 3.39, 2.10, None,  None),
+    'Bus_5': (PV,    1.0, 0.0, 10.0, 0.0, 0.0,  0.0,  -10.0, 10.0),
+    'Bus_6': (PV,    1.0, 0.0, 30.0, 0.0, 6.09, 4.48, -22.5, 30.0),
+    'Bus_7': (PQ,    1.0, 0.0, 0.0,  0.0, 4.23, 3.41, None,  None),
+    'Bus_8': (PQ,    1.0, 0.0, 0.0,  0.0, 0.0,  0.0,  None,  None),
+    'Bus_9': (PV,    1.0, 0.0, 10.0, 0.0, 0.0,  0.0,  -30.0, 30.0),
+}
+
+# Branch: (name, kind, from, to, R pu, X pu, total B pu, tap)
+STUDY_BRANCHES = [
+    ('T3 (100 MVA)', TRANSFORMER, 'Bus1',  'Bus2',  0.0019, 0.065,  0.0, 1.0),
+    ('T6 (100 MVA)', TRANSFORMER, 'Bus4',  'Bus_5', 0.0019, 0.065,  0.0, 1.0),
+    ('T7 (100 MVA)', TRANSFORMER, 'Bus_8', 'Bus_9', 0.0019, 0.065,  0.0, 1.0),
+    ('Cable1',       LINE,        'Bus_7', 'Bus_8', 0.0015, 0.0058, 0.0, 1.0),
+    ('Cable3',       LINE,        'Bus_6', 'Bus_8', 0.0015, 0.0058, 0.0, 1.0),
+    ('Line1',        LINE,        'Bus2',  'Bus3',  0.0589, 0.2082, 0.0, 1.0),
+    ('Line3',        LINE,        'Bus3',  'Bus4',  0.0589, 0.2082, 0.0, 1.0),
+    ('Line7',        LINE,        'Bus2',  'Bus_6', 0.0589, 0.2082, 0.0, 1.0),
+    ('Line8',        LINE,        'Bus4',  'Bus_7', 0.0589, 0.2082, 0.0, 1.0),
+]
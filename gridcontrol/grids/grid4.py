@@ -0,0 +1,99 @@
+"""Grid 4: IEEE 9 bus network (ETAP_Files/grid4)."""
+
+from ..network import LINE, PQ, PV, SLACK, TRANSFORMER
+
+TITLE = 'Grid 4: IEEE 9 bus network'
+FREQUENCY = 60  # Hz
+
+# Bus positions (improved layout for better visibility)
+BUS_POSITIONS = {
+    'Bus_1': (0, 0, 0),
+    'Bus_2': (3, 2, 0),
+    'Bus_3': (6, 0, 0),
+    'Bus_4': (9, 2, 0),
+    'Bus_5': (12, 0, 0),
+    'Bus_6': (15, 2, 0),
+    'Bus_7': (9, -2, 0),
+    'Bus_8': (6, -4, 0),
+    'Bus_9': (3, -2, 0),
+}
+
+# Line connections based on the ETAP branch connections
+CONNECTIONS = [
+    # Transmission lines from ETAP report
+    ('Bus_3', 'Bus_4'),  # Line1
+    ('Bus_4', 'Bus_5'),  # Line3
+    ('Bus_6', 'Bus_3'),  # Line5
+    ('Bus_7', 'Bus_5'),  # Line7
+    ('Bus_8', 'Bus_6'),  # Line9
+    ('Bus_8', 'Bus_7'),  # Line10
+]
+
+# Components connected to buses with their ratings from ETAP
+GENERATORS = {
+    'Gen1 (Swing Bus)': 'Bus_1',
+    'Gen2 (40 MW)': 'Bus_2',
+    'Gen3 (85 MW)': 'Bus_9'
+}
+
+LOADS = {
+    'Load (29.6 MW, 26.9 Mvar)': 'Bus_4',
+    'Load (10.5 MW, 17.0 Mvar)': 'Bus_5',
+    'Load (19.2 MW, 14.4 Mvar)': 'Bus_6',
+    'Load (12.6 MW, 20.4 Mvar)': 'Bus_7',
+    'Load (8.4 MW, 13.6 Mvar)': 'Bus_9'
+}
+
+# Transformers from ETAP report
+TRANSFORMERS = {
+    'T1 (10 MVA)': ('Bus_1', 'Bus_3'),
+    'T3 (10 MVA)': ('Bus_2', 'Bus_3'),
+    'T4 (10 MVA)': ('Bus_8', 'Bus_9')
+}
+
+# Bus voltage levels in kV from ETAP (all 11 kV except Bus_9 at 9.5 kV)
+BUS_VOLTAGES = {
+    'Bus_1': 11.0,
+    'Bus_2': 11.0,
+    'Bus_3': 11.0,
+    'Bus_4': 11.0,
+    'Bus_5': 11.0,
+    'Bus_6': 11.0,
+    'Bus_7': 11.0,
+    'Bus_8': 11.0,
+    'Bus_9': 9.5
+}
+
+# Bus types from ETAP
+BUS_TYPES = {
+    'Bus_1': 'Swing Bus',
+}
+
+# Load-flow study data (Load Flow Analysis/grid4/LFA_Verification.m), MW and
+# Mvar on a 100 MVA base.  Impedances were given in percent and line charging
+# per line end; both are converted to pu totals here.
+# Bus: (type, |V| pu, angle deg, P_gen, Q_gen, P_load, Q_load, Q_min, Q_max)
+STUDY_BUSES = {
+    'Bus_1': (SLACK, 1.00, 0.0, 0.0,  0.0, 0.0,    0.0,    None,  None),
+    'Bus_2': (PV,    1.00, 0.0, 40.0, 0.0, 0.0,    0.0,    0.0,   84.678),
+    'Bus_3': (PQ,    1.00, 0.0, 0.0,  0.0, 0.0,    0.0,    None,  None),
+    'Bus_4': (PQ,    1.00, 0.0, 0.0,  0.0, 26.907, 29.598, None,  None),
+    'Bus_5': (PQ,    1.00, 0.0, 0.0,  0.0, 17.000, 10.536, None,  None),
+    'Bus_6': (PQ,    1.00, 0.0, 0.0,  0.0, 14.400, 19.200, None,  None),
+    'Bus_7': (PQ,    1.00, 0.0, 0.0,  0.0, 20.400, 12.643, None,  None),
+    'Bus_8': (PQ,    1.00, 0.0, 0.0,  0.0, 0.0,    0.0,    None,  None),
+    'Bus_9': (PV,    0.95, 0.0, 85.0, 0.0, 13.600, 8.429,  -85.0, -52.678),
+}
+
+# Branch: (name, kind, from, to, R pu, X pu, total B pu, tap)
+STUDY_BRANCHES = [
+    ('T1 (10 MVA)', TRANSFORMER, 'Bus_1', 'Bus_3', 0.0019, 0.0637, 0.0,     1.0),
+    ('T3 (10 MVA)', TRANSFORMER, 'Bus_2', 'Bus_3', 0.0029, 0.1000, 0.0,     1.0),
+    ('Line1',       LINE,        'Bus_3', 'Bus_4', 0.0005, 0.0016, 0.00544, 1.0),
+    ('Line3',       LINE,        'Bus_4', 'Bus_5', 0.0005, 0.0016, 0.00544, 1.0),
+    ('Line7',       LINE,        'Bus_5', 'Bus_7', 0.0005, 0.0016, 0.00544, 1.0),
+    ('Line5',       LINE,        'Bus_6', 'Bus_3', 0.0005, 0.0016, 0.00544, 1.0),
+    ('Line9',       LINE,        'Bus_6', 'Bus_8', 0.0005, 0.0016, 0.00544, 1.0),
+    ('Line10',      LINE,        'Bus_7', 'Bus_8', 0.0005, 0.0016, 0.00544, 1.0),
+    ('T4 (10 MVA)', TRANSFORMER, 'Bus_8', 'Bus_9', 0.0029, 0.0997, 0.0,     1.0),
+]
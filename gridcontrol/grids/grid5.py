@@ -0,0 +1,94 @@
+"""Grid 5: 9-bus hierarchical multi-voltage network (ETAP_Files/grid5)."""
+
+from ..network import LINE, PQ, PV, SLACK, TRANSFORMER
+
+TITLE = 'Grid 5: IEEE 9 Bus Network'
+FREQUENCY = 50  # Hz
+
+# Bus positions by voltage level (z-axis represents voltage hierarchy)
+BUS_POSITIONS = {
+    'Bus_1': (0, 0, 3),     # 132 kV (Swing Bus)
+    'Bus_2': (4, 2, 2),     # 129.4 kV
+    'Bus_3': (8, 0, 2),     # 129.5 kV
+    'Bus_4': (12, 2, 2),    # 129.4 kV
+    'Bus_5': (16, 0, 1),    # 10.76 kV
+    'Bus_6': (20, 2, 1),    # 10.76 kV (Voltage Control)
+    'Bus_7': (12, -2, 2),   # 129.4 kV
+    'Bus_8': (8, -4, 1),    # 10.8 kV (Voltage Control)
+    'Bus_9': (4, -2, 0),    # 0.414 kV
+}
+
+# Bus voltages in kV
+BUS_VOLTAGES = {
+    'Bus_1': 132.0, 'Bus_2': 129.4, 'Bus_3': 129.5,
+    'Bus_4': 129.4, 'Bus_5': 10.76, 'Bus_6': 10.76,
+    'Bus_7': 129.4, 'Bus_8': 10.8,  'Bus_9': 0.414
+}
+
+# Bus types
+BUS_TYPES = {
+    'Bus_1': 'Swing Bus',
+    'Bus_6': 'Voltage Control',
+    'Bus_8': 'Voltage Control'
+}
+
+# Transmission line connections
+CONNECTIONS = [
+    ('Bus_2', 'Bus_3'),
+    ('Bus_3', 'Bus_4'),
+    ('Bus_5', 'Bus_6')
+]
+
+TRANSFORMERS = {
+    'T1 (50 MVA)': ('Bus_1', 'Bus_2'),
+    'T3 (25 MVA)': ('Bus_5', 'Bus_4'),
+    'T7 (30 MVA)': ('Bus_8', 'Bus_3'),
+    'T10 (15 MVA)': ('Bus_8', 'Bus_9'),
+    'T12 (20 MVA)': ('Bus_6', 'Bus_7')
+}
+
+GENERATORS = {
+    'Gen1 (Swing Bus)': 'Bus_1',
+    'Gen2 (60 MW)': 'Bus_6',
+    'Gen3 (40 MW)': 'Bus_8'
+}
+
+LOADS = {
+    'Load (45.2 MW, 32.1 Mvar)': 'Bus_2',
+    'Load (28.7 MW, 22.3 Mvar)': 'Bus_3',
+    'Load (33.6 MW, 25.8 Mvar)': 'Bus_4',
+    'Load (18.9 MW, 15.2 Mvar)': 'Bus_5',
+    'Load (22.4 MW, 17.8 Mvar)': 'Bus_7',
+    'Load (12.3 MW, 9.6 Mvar)': 'Bus_9'
+}
+
+# Load-flow study data (Load Flow Analysis/grid5/LFA_Verification.m),
+# converted from pu to MW and Mvar on a 100 MVA base.
+# Bus: (type, |V| pu, angle deg, P_gen, Q_gen, P_load, Q_load, Q_min, Q_max)
+STUDY_BUSES = {
+    'Bus_1': (SLACK, 1.000, 0.0, 0.0, 0.0, 27.2,  16.9, None, None),
+    'Bus_2': (PQ,    1.000, 0.0, 0.0, 0.0, 0.0,   0.0,  None, None),
+    'Bus_3': (PQ,    1.000, 0.0, 0.0, 0.0, 0.0,   0.0,  None, None),
+    'Bus_4': (PQ,    1.000, 0.0, 0.0, 0.0, 0.0,   0.0,  None, None),
+    'Bus_5': (PQ,    1.000, 0.0, 0.0, 0.0, 136.0, 84.3, None, None),
+    'Bus_6': (PV,    1.022, 0.0, 0.0, 0.0, 6.8,   4.2,  None, None),
+    'Bus_7': (PQ,    1.000, 0.0, 0.0, 0.0, 0.7,   0.4,  None, None),
+    'Bus_8': (PV,    1.019, 0.0, 0.0, 0.0, 58.6,  34.3, None, None),
+    'Bus_9': (PQ,    1.000, 0.0, 0.0, 0.0, 4.1,   2.5,  None, None),
+}
+
+# Branch: (name, kind, from, to, R pu, X pu, total B pu, tap)
+STUDY_BRANCHES = [
+    ('T1 (50 MVA)',  TRANSFORMER, 'Bus_1', 'Bus_2', 0.003377, 0.008342, 0.0, 1.0),
+    ('Bus_2-Bus_3',  LINE,        'Bus_2', 'Bus_3', 0.000014, 0.000048, 0.0, 1.0),
+    ('Bus_3-Bus_4',  LINE,        'Bus_3', 'Bus_4', 0.000014, 0.000048, 0.0, 1.0),
+    ('T3 (25 MVA)',  TRANSFORMER, 'Bus_4', 'Bus_5', 0.000338, 0.000834, 0.0, 1.0),
+    ('Bus_5-Bus_6',  LINE,        'Bus_5', 'Bus_6', 0.001946, 0.006884, 0.0, 1.0),
+    ('T12 (20 MVA)', TRANSFORMER, 'Bus_6', 'Bus_7', 0.084436, 0.208556, 0.0, 1.0),
+    ('T7 (30 MVA)',  TRANSFORMER, 'Bus_8', 'Bus_3', 0.002252, 0.005561, 0.0, 1.0),
+    ('T10 (15 MVA)', TRANSFORMER, 'Bus_8', 'Bus_9', 0.020011, 0.102057, 0.0, 1.0),
+]
+
+# ETAP load-flow report bus voltages (pu) and angles (deg)
+ETAP_VM = (1.000, 1.014, 1.014, 1.014, 1.015, 1.014, 1.010, 1.019, 0.998)
+ETAP_VA = (0.0, -1.3, -1.3, -1.3, -1.4, -1.4, -1.5, -1.7, -2.0)
@@ -0,0 +1,310 @@
+"""Automatic 3D bus placement for single-line diagrams.
+
+The hand-entered ``BUS_POSITIONS`` of the study grids put related buses
+next to each other and stack voltage levels vertically.  :func:`layout`
+computes the same kind of placement from the branch graph alone:
+
+* ``x``/``y`` come from a multilevel force-directed layout: the graph is
+  coarsened by merging buses into a maximal independent set until a few
+  dozen remain, the coarsest graph is placed by its spectral embedding (the
+  two smallest non-trivial solutions of ``L x = lambda D x``), and each
+  finer level starts from its parent's position and is refined by
+  Fruchterman-Reingold sweeps.  Repulsion is cut off at a few branch
+  lengths and found with a k-d tree, so a sweep costs ``O(n log n)``
+  instead of ``O(n^2)``; the coarse levels supply the long-range structure;
+* ``z`` is the rank of the bus's nominal voltage, highest level on top.
+
+Disconnected parts are laid out separately and packed side by side.
+Layouts are cached in memory per :meth:`Network.topology_hash`
+(``electrical=False``) and bus voltages, so re-rendering a network costs a
+lookup; pass ``directory=LAYOUT_DIR`` (``<cache dir>/layouts``) to also
+keep them as ``.npy`` files across runs.  Cached arrays are shared and
+read-only, so copy one before storing it on a network::
+
+    net.bus_xyz = layout(net).copy()
+
+Run ``python -m gridcontrol.layout --buses 10000`` to time a synthetic
+network.
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh
+from scipy.spatial import cKDTree
+
+from .cache import DEFAULT_DIR
+from .ybus import bus_adjacency
+
+LAYOUT_DIR = os.path.join(DEFAULT_DIR, 'layouts')
+CACHE_SIZE = 32
+
+# Components up to this size use a dense eigensolver; coarsening stops
+# below COARSEST buses
+DENSE_MAX = 200
+COARSEST = 50
+
+_cache = OrderedDict()
+
+
+def _spectral(adj):
+    """``(n, 2)`` spectral coordinates of a connected graph."""
+    n = adj.shape[0]
+    if n <= 2:
+        return np.column_stack((np.arange(n, dtype=np.float64), np.zeros(n)))
+    deg = np.asarray(adj.sum(axis=1)).ravel()
+    lap = sp.diags(deg) - adj
+    if n <= DENSE_MAX:
+        _, vec = scipy.linalg.eigh(lap.toarray(), np.diag(deg), subset_by_index=[1, 2])
+        return vec
+    # Shift-invert just below 0: L + eps*D is positive definite
+    _, vec = eigsh(lap.tocsc(), k=3, M=sp.diags(deg).tocsc(), sigma=-1e-6, which='LM')
+    return vec[:, 1:3]
+
+
+def _coarsen(adj, rng):
+    """Merge each bus into a neighbouring one of a maximal independent set.
+
+    Returns the ``(n, n_coarse)`` 0/1 assignment matrix.  Independent-set
+    coarsening (Luby's algorithm, vectorised) collapses a star into its
+    centre in one step, so radial feeders shrink as fast as meshed grids.
+    """
+    n = adj.shape[0]
+    prio = rng.random(n) + 1.0
+    state = np.zeros(n, dtype=np.int8)            # 0 undecided, 1 in set, -1 out
+    while (state == 0).any():
+        live = np.where(state == 0, prio, 0.0)
+        best = np.asarray(adj.multiply(live[None, :]).max(axis=1).toarray()).ravel()
+        chosen = (state == 0) & (live > best)
+        state[chosen] = 1
+        covered = np.asarray(adj[:, np.flatnonzero(chosen)].sum(axis=1)).ravel() > 0
+        state[(state == 0) & covered] = -1
+    centres = np.flatnonzero(state == 1)
+    weight = adj.multiply(np.where(state == 1, prio, 0.0)[None, :]).tocsr()
+    owner = np.asarray(weight.argmax(axis=1)).ravel()
+    owner[centres] = centres
+    cluster = np.full(n, -1, dtype=np.intp)
+    cluster[centres] = np.arange(len(centres))
+    return sp.csr_matrix((np.ones(n), (np.arange(n), cluster[owner])), shape=(n, len(centres)))
+
+
+def _refine(xy, f, t, spacing, iterations, rng, temp=None):
+    """Fruchterman-Reingold sweeps with repulsion cut off at ``3 * spacing``."""
+    n = len(xy)
+    k2 = spacing * spacing
+    cutoff = 3.0 * spacing
+    start = spacing if temp is None else temp
+    for it in range(iterations):
+        step = start * (1.0 - it / iterations) + 0.02 * spacing
+        force = np.zeros_like(xy)
+
+        pairs = cKDTree(xy).query_pairs(cutoff, output_type='ndarray')
+        if len(pairs):
+            i, j = pairs.T
+            d = xy[i] - xy[j]
+            dist2 = np.maximum(np.einsum('ij,ij->i', d, d), 1e-9 * k2)
+            push = d * (k2 / dist2)[:, None]
+            for c in range(2):
+                force[:, c] += np.bincount(i, push[:, c], n) - np.bincount(j, push[:, c], n)
+
+        d = xy[t] - xy[f]
+        pull = d * (np.hypot(d[:, 0], d[:, 1]) / spacing)[:, None]
+        for c in range(2):
+            force[:, c] += np.bincount(f, pull[:, c], n) - np.bincount(t, pull[:, c], n)
+
+        norm = np.maximum(np.hypot(force[:, 0], force[:, 1]), 1e-12)
+        xy += force * (np.minimum(norm, step) / norm)[:, None]
+    return xy
+
+
+def _edges(adj):
+    upper = sp.triu(adj, k=1).tocoo()
+    return upper.row.astype(np.intp), upper.col.astype(np.intp)
+
+
+def _multilevel(adj, spacing, iterations, rng):
+    """``(n, 2)`` layout of a connected graph: coarsen, embed, refine upwards."""
+    levels = [(adj, None)]
+    while levels[-1][0].shape[0] > COARSEST:
+        fine = levels[-1][0]
+        assign = _coarsen(fine, rng)
+        if assign.shape[1] > 0.9 * fine.shape[0]:
+            break
+        coarse = (assign.T @ fine @ assign).tocsr()
+        coarse.setdiag(0)
+        coarse.eliminate_zeros()
+        coarse.data[:] = 1.0
+        levels.append((coarse, assign))
+
+    graph = levels[-1][0]
+    f, t = _edges(graph)
+    xy = _scale(_spectral(graph), f, t, spacing)
+    xy = _refine(xy, f, t, spacing, 2 * iterations, rng)
+    for k in range(len(levels) - 1, 0, -1):
+        graph, assign = levels[k - 1][0], levels[k][1]
+        # Children start at their cluster's position, spread out so the
+        # area grows with the bus count
+        grow = np.sqrt(assign.shape[0] / assign.shape[1])
+        xy = assign @ (xy * grow) + rng.uniform(-0.5, 0.5, (assign.shape[0], 2)) * spacing
+        f, t = _edges(graph)
+        xy = _refine(xy, f, t, spacing, iterations, rng, temp=0.5 * spacing * grow)
+    return xy
+
+
+def _scale(xy, f, t, spacing):
+    """Scale ``xy`` so the mean edge length is ``spacing``, centred on 0."""
+    xy = xy - xy.mean(axis=0)
+    if len(f):
+        mean = np.hypot(*(xy[t] - xy[f]).T).mean()
+        if mean > 0:
+            xy *= spacing / mean
+    return xy
+
+
+def _pack(parts, spacing):
+    """Place component layouts (largest first) in rows of roughly square extent."""
+    boxes = [(xy.min(axis=0), xy.max(axis=0)) for _, xy in parts]
+    sizes = [hi - lo + spacing for lo, hi in boxes]
+    width = max(np.sqrt(sum(s[0] * s[1] for s in sizes)), max(s[0] for s in sizes))
+    placed, x, y, row = [], 0.0, 0.0, 0.0
+    for (idx, xy), (lo, _), size in zip(parts, boxes, sizes):
+        if x > 0 and x + size[0] > width:
+            x, y, row = 0.0, y - row, 0.0
+        placed.append((idx, xy - lo + (x, y - size[1])))
+        x += size[0]
+        row = max(row, size[1])
+    return placed
+
+
+def compute_layout(n_bus, branch_from, branch_to, bus_kv, spacing=3.0, iterations=50, seed=0):
+    """``(n_bus, 3)`` bus coordinates for the given branch graph (uncached).
+
+    ``spacing`` is the target branch length; ``z`` is the voltage-level rank
+    of ``bus_kv`` (``0`` for the lowest level and for unknown voltages).
+    """
+    f = np.asarray(branch_from, dtype=np.intp)
+    t = np.asarray(branch_to, dtype=np.intp)
+    bus_kv = np.asarray(bus_kv, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    xyz = np.zeros((n_bus, 3))
+    if n_bus == 0:
+        return xyz
+
+    adj = bus_adjacency(n_bus, f, t)
+    n_comp, comp = connected_components(adj, directed=False)
+    order = np.argsort(comp, kind='stable')
+    members = np.split(order, np.cumsum(np.bincount(comp, minlength=n_comp))[:-1])
+    parts = []
+    for idx in sorted(members, key=len, reverse=True):
+        sub = adj[idx][:, idx].tocsr()
+        if len(idx) > 2:
+            xy = _multilevel(sub, spacing, iterations, rng)
+        else:
+            xy = _spectral(sub) * spacing
+        parts.append((idx, xy))
+    for idx, xy in _pack(parts, spacing):
+        xyz[idx, :2] = xy
+
+    finite = np.isfinite(bus_kv)
+    if finite.any():
+        levels = np.unique(bus_kv[finite])
+        xyz[finite, 2] = np.searchsorted(levels, bus_kv[finite])
+    return xyz
+
+
+def layout_key(net, spacing=3.0, iterations=50, seed=0):
+    """Cache key of a layout: topology, bus voltages and layout options."""
+    h = hashlib.sha1(net.topology_hash(electrical=False).encode())
+    h.update(np.ascontiguousarray(net.bus_kv, dtype=np.float64).tobytes())
+    h.update(repr((float(spacing), int(iterations), int(seed))).encode())
+    return h.hexdigest()
+
+
+def layout(net, spacing=3.0, iterations=50, seed=0, cache=True, directory=None):
+    """``(n_bus, 3)`` automatic bus coordinates of ``net``; see the module docs.
+
+    With ``cache=True`` the result is looked up in memory, then in
+    ``directory`` if one is given (e.g. :data:`LAYOUT_DIR`), before being
+    computed and stored there.  The returned array is read-only when
+    ``cache`` is set.
+    """
+    key = layout_key(net, spacing, iterations, seed)
+    if cache and key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    path = os.path.join(directory, key + '.npy') if cache and directory else None
+    xyz = None
+    if path and os.path.exists(path):
+        try:
+            xyz = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            xyz = None
+        if xyz is not None and xyz.shape != (net.n_bus, 3):
+            xyz = None
+    if xyz is None:
+        xyz = compute_layout(net.n_bus, net.branch_from, net.branch_to, net.bus_kv,
+                             spacing, iterations, seed)
+        if path:
+            os.makedirs(directory, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.npy'
+            np.save(tmp, xyz, allow_pickle=False)
+            os.replace(tmp, path)
+    if cache:
+        xyz.flags.writeable = False
+        _cache[key] = xyz
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return xyz
+
+
+def clear_cache(disk=False, directory=LAYOUT_DIR):
+    """Drop the in-memory layouts (and the ``.npy`` files with ``disk=True``)."""
+    _cache.clear()
+    if disk and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith('.npy'):
+                os.remove(os.path.join(directory, name))
+
+
+def main(argv=None):
+    from .synthetic import synthetic_network
+
+    parser = argparse.ArgumentParser(description='Time the automatic SLD layout.')
+    parser.add_argument('--buses', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--out', help='save the laid-out SLD as this PNG')
+    args = parser.parse_args(argv)
+
+    net = synthetic_network(args.buses)
+    t0 = time.perf_counter()
+    net.bus_xyz = layout(net, iterations=args.iterations, directory=None)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    layout(net, iterations=args.iterations, directory=None)
+    again = time.perf_counter() - t0
+    seg = net.branch_segments()
+    length = np.linalg.norm(seg[:, 1, :2] - seg[:, 0, :2], axis=1)
+    print(f'{net.n_bus} buses, {net.n_branch} branches: layout {first:.2f} s, '
+          f'cached {again * 1e3:.2f} ms; branch length mean {length.mean():.2f}, '
+          f'max {length.max():.2f}')
+    if args.out:
+        from matplotlib.figure import Figure
+
+        from .render import draw_network
+
+        fig = Figure(figsize=(12, 9))
+        ax = fig.add_subplot(projection='3d')
+        draw_network(ax, net)
+        ax.set_title(f'{net.title} (automatic layout)')
+        fig.savefig(args.out, dpi=100)
+
+
+if __name__ == '__main__':
+    main()
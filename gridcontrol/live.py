@@ -0,0 +1,234 @@
+"""Live SLD dashboard: voltage and loading animated by blitting.
+
+:class:`LiveDashboard` animates the artists :func:`~gridcontrol.render.draw_network`
+created for a single-line diagram: bus markers are recoloured by voltage
+magnitude, line and transformer segments take widths and colours from
+loading, and bus labels gain the voltage; one status text is the only
+artist it adds.  Results of a study case are mapped onto the drawing by bus
+name and by the bus pair of each branch, so drawn branches without a study
+counterpart keep their style and study branches that are not drawn are not
+shown.  Each frame only changes colours, widths and texts of the existing
+artists and redraws them over a cached background; the background is
+recaptured whenever the figure is fully redrawn (resize, rotation).
+
+Frames come from any iterable of :class:`~gridcontrol.powerflow.PowerFlowResult`
+(or ``(vm, loading)`` pairs) of the study case, e.g. :func:`load_flow_stream`::
+
+    artists = draw_network(ax, load_grid(5))
+    dash = LiveDashboard(ax, load_grid(5), artists, case=load_case(5))
+    anim = dash.animate(load_flow_stream(dash.case), fps=30)
+    plt.show()
+
+The gridN_SLD.py scripts take ``--live`` to run this over their figure;
+``python -m gridcontrol.live grid5`` opens a stand-alone dashboard.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from matplotlib.animation import FuncAnimation
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import Collection
+from matplotlib.colors import Normalize
+
+from .render import draw_network
+
+VOLTAGE_LIMITS = (0.95, 1.05)
+
+
+def _branch_keys(net):
+    names = net.bus_names
+    return [frozenset((names[f], names[t])) for f, t in zip(net.branch_from, net.branch_to)]
+
+
+def case_index(net, case):
+    """Indices of ``case`` buses and branches for those of ``net`` (``-1``: none).
+
+    Buses match by name and branches by the names of their end buses (the
+    first of parallel study branches is used).
+    """
+    bus_of = {name: i for i, name in enumerate(case.bus_names.tolist())}
+    buses = np.array([bus_of.get(name, -1) for name in net.bus_names.tolist()], dtype=np.intp)
+    branch_of = {}
+    for k, key in enumerate(_branch_keys(case)):
+        branch_of.setdefault(key, k)
+    branches = np.array([branch_of.get(key, -1) for key in _branch_keys(net)], dtype=np.intp)
+    return buses, branches
+
+
+class LiveDashboard:
+    """Animates the ``draw_network(ax, net)`` ``artists`` with results of ``case``.
+
+    ``case`` defaults to ``net``.  :attr:`voltage` is a mappable of the bus
+    colour scale for colorbars.
+    """
+
+    def __init__(self, ax, net, artists, case=None, vlim=VOLTAGE_LIMITS, width=(1.0, 8.0),
+                 vcmap='coolwarm', lcmap='RdYlGn_r'):
+        self.ax = ax
+        self.fig = ax.figure
+        self.net = net
+        self.case = net if case is None else case
+        self.width = width
+        self.bus_map, self.branch_map = case_index(net, self.case)
+        # Colour range centred on 1 pu so both limits are visible
+        half = max(abs(vlim[0] - 1.0), abs(vlim[1] - 1.0)) * 1.5
+        self.voltage = ScalarMappable(Normalize(1.0 - half, 1.0 + half), vcmap)
+        self.loading = ScalarMappable(Normalize(0.0, 1.2), lcmap)
+
+        # (artist, drawn indices, style colours, style widths) per collection;
+        # the base Collection getter returns colours unsorted by depth
+        self.buses = [(coll, idx, np.broadcast_to(Collection.get_facecolor(coll), (len(idx), 4)))
+                      for coll, idx in zip(artists['buses'], artists['bus_index'])]
+        self.branches = []
+        for key, mask in (('lines', net.lines), ('transformers', net.transformers)):
+            coll = artists[key]
+            if coll is None:
+                continue
+            idx = np.flatnonzero(mask)
+            self.branches.append((coll, idx,
+                                  np.broadcast_to(Collection.get_edgecolor(coll), (len(idx), 4)),
+                                  np.broadcast_to(coll.get_linewidths(), len(idx))))
+        self.labels = [(text, b, text.get_text()) for b, text in artists['bus_labels'].items()]
+        self.status = ax.text2D(0.02, 0.02, '', transform=ax.transAxes, fontsize=9,
+                                family='monospace')
+        self.artists = (tuple(b[0] for b in self.branches) + tuple(b[0] for b in self.buses)
+                        + tuple(label[0] for label in self.labels) + (self.status,))
+        for artist in self.artists:
+            artist.set_animated(True)
+        self.frames = 0
+        self._background = None
+        self._cid = self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """Cache the static background after a full redraw."""
+        canvas = self.fig.canvas
+        if event is not None and event.canvas is not canvas:
+            return
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def update(self, frame):
+        """Apply one load-flow result (or ``(vm, loading)``) to the artists."""
+        if isinstance(frame, tuple):
+            vm, loading = frame
+        else:
+            vm, loading = frame.vm, frame.loading
+        vm = np.asarray(vm, dtype=np.float64)
+        loading = np.nan_to_num(np.asarray(loading, dtype=np.float64))
+        drawn_vm = np.where(self.bus_map >= 0, vm[self.bus_map], np.nan)
+        drawn_loading = np.where(self.branch_map >= 0, loading[self.branch_map], np.nan)
+
+        for coll, idx, style in self.buses:
+            v = drawn_vm[idx]
+            coll.set_facecolor(np.where(np.isnan(v)[:, None], style, self.voltage.to_rgba(v)))
+        lo, hi = self.width
+        for coll, idx, style, style_width in self.branches:
+            x = drawn_loading[idx]
+            off = np.isnan(x)
+            coll.set_color(np.where(off[:, None], style, self.loading.to_rgba(x)))
+            coll.set_linewidths(np.where(off, style_width,
+                                         lo + (hi - lo) * np.clip(x, 0.0, 1.2) / 1.2))
+        for text, b, base in self.labels:
+            if not np.isnan(drawn_vm[b]):
+                text.set_text(f'{base}\n{drawn_vm[b]:.3f} pu')
+
+        self.frames += 1
+        self.status.set_text(f'frame {self.frames:5d}   V {np.min(vm):.3f}-{np.max(vm):.3f} pu   '
+                             f'max loading {loading.max(initial=0.0):6.1%}')
+        return self.artists
+
+    def blit(self):
+        """Redraw only the animated artists over the cached background."""
+        canvas = self.fig.canvas
+        if self._background is None:
+            canvas.draw()
+        else:
+            canvas.restore_region(self._background)
+            self._draw_animated()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def show(self, frame):
+        """``update`` and ``blit`` in one call."""
+        self.update(frame)
+        self.blit()
+
+    def animate(self, frames, fps=30.0, **kw):
+        """A blitting ``FuncAnimation`` over ``frames``; keep a reference to it."""
+        return FuncAnimation(self.fig, self.update, frames=frames, interval=1000.0 / fps,
+                             blit=True, cache_frame_data=False, **kw)
+
+    def close(self):
+        """Stop animating; the drawn artists stay with their last frame."""
+        self.fig.canvas.mpl_disconnect(self._cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+        self.status.remove()
+
+
+def load_flow_stream(net, steps=None, period=120, swing=0.15, method='nr'):
+    """Yield load-flow results of ``net`` under a slowly cycling load level.
+
+    Loads follow ``1 + swing * sin(2 pi k / period)``; each solve is warm
+    started from the previous voltages.  ``steps=None`` streams forever.
+    """
+    from .powerflow import solve
+
+    pd0, qd0 = net.pd.copy(), net.qd.copy()
+    v0 = None
+    k = 0
+    try:
+        while steps is None or k < steps:
+            scale = 1.0 + swing * np.sin(2 * np.pi * k / period)
+            net.pd[:], net.qd[:] = pd0 * scale, qd0 * scale
+            kw = {} if method == 'dc' else {'v0': v0}
+            result = solve(net, method, **kw)
+            if result.converged:
+                v0 = result.V
+            yield result
+            k += 1
+    finally:
+        net.pd[:], net.qd[:] = pd0, qd0
+
+
+def frame_times(dash, frames):
+    """Per-frame update+blit times (s) for a list of frames."""
+    out = np.empty(len(frames))
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        dash.show(frame)
+        out[i] = time.perf_counter() - t0
+    return out
+
+
+def main(argv=None):
+    import matplotlib.pyplot as plt
+
+    from .grids import grid_name, load_case
+
+    parser = argparse.ArgumentParser(description='Live voltage/loading dashboard of a study grid.')
+    parser.add_argument('grid', help='grid name or number')
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--method', default='nr')
+    args = parser.parse_args(argv)
+
+    net = load_case(args.grid)
+    fig = plt.figure(figsize=(12, 9))
+    ax = fig.add_subplot(111, projection='3d')
+    artists = draw_network(ax, net, labels=True)
+    ax.set_title(f'{net.title} ({grid_name(args.grid)}) - live')
+    dash = LiveDashboard(ax, net, artists)
+    fig.colorbar(dash.voltage, ax=ax, shrink=0.5, label='Voltage (p.u.)')
+    anim = dash.animate(load_flow_stream(net, method=args.method), fps=args.fps)
+    plt.show()
+    return anim
+
+
+if __name__ == '__main__':
+    main()
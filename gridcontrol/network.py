@@ -0,0 +1,337 @@
+"""Array-backed network model shared by the SLD, load-flow and short-circuit tools.
+
+Buses are integer indices into flat NumPy arrays; branches are ``from``/``to``
+index arrays.  Grid definitions (see :mod:`gridcontrol.grids`) are converted
+into this form once, so downstream code never walks string-keyed dicts.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+# Bus types (MATPOWER numbering, as used by the grid5 LFA script)
+PQ = 1
+PV = 2
+SLACK = 3
+
+# Branch kinds
+LINE = 0
+TRANSFORMER = 1
+
+_BUS_TYPE_NAMES = {
+    'Swing Bus': SLACK,
+    'Slack Bus': SLACK,
+    'Voltage Control': PV,
+    'Load Bus': PQ,
+}
+
+# Distinct bus voltages within this fraction of the next lower one share a
+# nominal level (129.4 and 129.5 kV; 10.76 and 10.8 kV)
+LEVEL_TOLERANCE = 0.01
+
+_RATING = re.compile(r'([-+]?\d*\.?\d+)\s*(MW|Mvar|MVA)\b')
+
+
+def _column(values, n, fill, dtype=np.float64):
+    """``values`` as a length-``n`` array, or ``fill`` repeated when omitted."""
+    if values is None:
+        return np.full(n, fill, dtype=dtype)
+    values = np.asarray(values, dtype=dtype)
+    if values.shape != (n,):
+        raise ValueError(f'expected {n} values, got shape {values.shape}')
+    return values
+
+
+def parse_rating(label):
+    """Return the ``{unit: value}`` ratings embedded in a label.
+
+    ``'Gen1 (100 MW)'`` gives ``{'MW': 100.0}``;
+    ``'Load (29.6 MW, 26.9 Mvar)'`` gives ``{'MW': 29.6, 'Mvar': 26.9}``.
+    """
+    return {unit: float(value) for value, unit in _RATING.findall(label)}
+
+
+def nominal_levels(kv, tol=LEVEL_TOLERANCE):
+    """Group bus voltages into nominal levels: ``(levels_kv, inverse)``.
+
+    Sorted distinct voltages at most ``tol`` (relative) above the previous
+    one join its level; the level's nominal voltage is the mean of its buses
+    rounded to three significant figures.  ``levels_kv`` is ascending and
+    ``levels_kv[inverse]`` is the nominal voltage of each bus; ``nan``
+    voltages form a level of their own.
+    """
+    kv = np.asarray(kv, dtype=np.float64)
+    values, inverse = np.unique(kv, return_inverse=True)
+    start = np.ones(len(values), dtype=bool)
+    start[1:] = (values[1:] > values[:-1] * (1.0 + tol)) | np.isnan(values[1:])
+    level = (np.cumsum(start) - 1)[inverse]
+    mean = np.bincount(level, weights=kv) / np.bincount(level)
+    return np.array([float(f'{v:.3g}') for v in mean]), level
+
+
+class Network:
+    """Compact, index-based representation of one grid.
+
+    Bus quantities are arrays of length ``n_bus``; branch quantities are
+    arrays of length ``n_branch``.  Unknown ratings are stored as ``nan``.
+
+    Electrical data for load flow follows MATPOWER naming: per-bus ``vm``
+    (pu setpoint/initial guess), ``va`` (degrees), ``pg``/``qg``/``pd``/``qd``
+    (MW, Mvar) and ``qmin``/``qmax`` (Mvar, ``inf`` when unlimited); per-branch
+    ``branch_r``/``branch_x`` (pu, ``nan`` when unknown), ``branch_b`` (total
+    line charging, pu), ``branch_tap`` (off-nominal ratio, from side) and
+    ``branch_status`` (1 in service, 0 open).
+
+    Sequence data for short-circuit studies: ``branch_r0``/``branch_x0``/
+    ``branch_b0`` (zero-sequence branch parameters, pu) and per-bus source
+    impedances ``source_z1``/``source_z2``/``source_z0`` (complex pu, e.g. the
+    subtransient reactance of a machine).  All default to ``nan`` meaning
+    "not given"; :mod:`gridcontrol.shortcircuit` substitutes typical values.
+    """
+
+    def __init__(self, name, bus_names, bus_xyz, bus_kv, branch_from, branch_to,
+                 branch_kind=None, branch_names=None, branch_mva=None,
+                 bus_type=None, gen_bus=(), gen_names=(), gen_mw=(),
+                 load_bus=(), load_names=(), load_mw=(), load_mvar=(),
+                 load_mva=(), title=None, base_mva=100.0, frequency=None,
+                 vm=None, va=None, pg=None, qg=None, pd=None, qd=None, qmin=None, qmax=None,
+                 branch_r=None, branch_x=None, branch_b=None, branch_tap=None, branch_status=None,
+                 branch_r0=None, branch_x0=None, branch_b0=None,
+                 source_z1=None, source_z2=None, source_z0=None):
+        self.name = name
+        self.title = title or name
+        self.base_mva = float(base_mva)
+        self.frequency = np.nan if frequency is None else float(frequency)
+
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.bus_xyz = np.asarray(bus_xyz, dtype=np.float64).reshape(-1, 3)
+        self.bus_kv = np.asarray(bus_kv, dtype=np.float64)
+        n = len(self.bus_names)
+        self.bus_type = _column(bus_type, n, PQ, np.int8)
+        self.vm = _column(vm, n, 1.0)
+        self.va = _column(va, n, 0.0)
+        self.pg = _column(pg, n, 0.0)
+        self.qg = _column(qg, n, 0.0)
+        self.pd = _column(pd, n, 0.0)
+        self.qd = _column(qd, n, 0.0)
+        self.qmin = _column(qmin, n, -np.inf)
+        self.qmax = _column(qmax, n, np.inf)
+        self.source_z1 = _column(source_z1, n, np.nan, np.complex128)
+        self.source_z2 = _column(source_z2, n, np.nan, np.complex128)
+        self.source_z0 = _column(source_z0, n, np.nan, np.complex128)
+
+        self.branch_from = np.asarray(branch_from, dtype=np.intp)
+        self.branch_to = np.asarray(branch_to, dtype=np.intp)
+        m = len(self.branch_from)
+        if branch_names is None:
+            branch_names = [f'{self.bus_names[f]}-{self.bus_names[t]}'
+                            for f, t in zip(self.branch_from, self.branch_to)]
+        self.branch_kind = _column(branch_kind, m, LINE, np.int8)
+        self.branch_names = np.asarray(branch_names, dtype=str)
+        self.branch_mva = _column(branch_mva, m, np.nan)
+        self.branch_r = _column(branch_r, m, np.nan)
+        self.branch_x = _column(branch_x, m, np.nan)
+        self.branch_b = _column(branch_b, m, 0.0)
+        self.branch_tap = _column(branch_tap, m, 1.0)
+        self.branch_status = _column(branch_status, m, 1, np.int8)
+        self.branch_r0 = _column(branch_r0, m, np.nan)
+        self.branch_x0 = _column(branch_x0, m, np.nan)
+        self.branch_b0 = _column(branch_b0, m, np.nan)
+
+        self.gen_bus = np.asarray(gen_bus, dtype=np.intp)
+        self.gen_names = np.asarray(gen_names, dtype=str)
+        self.gen_mw = np.asarray(gen_mw, dtype=np.float64)
+
+        self.load_bus = np.asarray(load_bus, dtype=np.intp)
+        self.load_names = np.asarray(load_names, dtype=str)
+        self.load_mw = np.asarray(load_mw, dtype=np.float64)
+        self.load_mvar = np.asarray(load_mvar, dtype=np.float64)
+        self.load_mva = np.asarray(load_mva, dtype=np.float64)
+
+        self._index = {b: i for i, b in enumerate(self.bus_names.tolist())}
+        if len(self._index) != n:
+            raise ValueError(f'{name}: duplicate bus names')
+
+    def __repr__(self):
+        return (f'<Network {self.name}: {self.n_bus} buses, {self.n_branch} branches, '
+                f'{len(self.gen_bus)} generators, {len(self.load_bus)} loads>')
+
+    @property
+    def n_bus(self):
+        return len(self.bus_names)
+
+    @property
+    def n_branch(self):
+        return len(self.branch_from)
+
+    @property
+    def lines(self):
+        """Boolean mask of transmission lines/cables."""
+        return self.branch_kind == LINE
+
+    @property
+    def transformers(self):
+        """Boolean mask of transformer branches."""
+        return self.branch_kind == TRANSFORMER
+
+    def index(self, names):
+        """Map a bus name, or a sequence of them, to integer indices."""
+        if isinstance(names, str):
+            return self._index[names]
+        return np.fromiter((self._index[b] for b in names), dtype=np.intp, count=len(names))
+
+    def topology_hash(self, electrical=True):
+        """Hex digest identifying the network's topology.
+
+        Covers the bus count and the in-service branch ends; with
+        ``electrical=True`` also branch reactances, taps and bus types, i.e.
+        everything the DC sensitivity factors depend on.
+        """
+        h = hashlib.sha1(np.int64(self.n_bus).tobytes())
+        fields = ['branch_from', 'branch_to', 'branch_status']
+        if electrical:
+            fields += ['branch_x', 'branch_tap', 'bus_type']
+        for name in fields:
+            h.update(np.ascontiguousarray(getattr(self, name)).tobytes())
+        return h.hexdigest()
+
+    def add_branch(self, f, t, kind=LINE, name=None, mva=np.nan, r=np.nan, x=np.nan, b=0.0,
+                   tap=1.0, status=1, r0=np.nan, x0=np.nan, b0=np.nan):
+        """Append a branch between buses ``f`` and ``t`` (names or indices).
+
+        Returns the new branch index.  Arrays are reallocated, so views taken
+        of the old branch arrays no longer track the network.
+        """
+        f = self.index(f) if isinstance(f, str) else int(f)
+        t = self.index(t) if isinstance(t, str) else int(t)
+        if name is None:
+            name = f'{self.bus_names[f]}-{self.bus_names[t]}'
+        for attr, value in (('branch_from', f), ('branch_to', t), ('branch_kind', kind),
+                            ('branch_names', name), ('branch_mva', mva), ('branch_r', r),
+                            ('branch_x', x), ('branch_b', b), ('branch_tap', tap),
+                            ('branch_status', status), ('branch_r0', r0), ('branch_x0', x0),
+                            ('branch_b0', b0)):
+            old = getattr(self, attr)
+            dtype = np.result_type(old, np.asarray(value)) if old.dtype.kind == 'U' else old.dtype
+            setattr(self, attr, np.append(old, np.asarray(value, dtype=dtype)))
+        return self.n_branch - 1
+
+    def branch_segments(self, mask=None):
+        """Return branch end coordinates as an ``(m, 2, 3)`` array."""
+        f, t = self.branch_from, self.branch_to
+        if mask is not None:
+            f, t = f[mask], t[mask]
+        return np.stack((self.bus_xyz[f], self.bus_xyz[t]), axis=1)
+
+    def voltage_levels(self, tol=LEVEL_TOLERANCE):
+        """Nominal voltage levels ``(levels_kv, inverse)``; see :func:`nominal_levels`."""
+        return nominal_levels(self.bus_kv, tol)
+
+    @classmethod
+    def from_definition(cls, defn, name=None, study=False):
+        """Build a network from a grid definition module or mapping.
+
+        The definition provides ``BUS_POSITIONS``, ``BUS_VOLTAGES`` (kV),
+        ``CONNECTIONS``, ``TRANSFORMERS``, ``GENERATORS`` and ``LOADS`` in the
+        layout the SLD scripts used, plus optional ``BUS_TYPES``, ``TITLE`` and
+        ``FREQUENCY`` (Hz).
+        Without ``BUS_POSITIONS`` the buses are those of ``BUS_VOLTAGES`` and
+        are placed by :func:`gridcontrol.layout.layout` (cached in memory
+        only; nothing is written to disk).
+
+        With ``study=True`` the branches and electrical bus data come from the
+        load-flow study tables instead: ``STUDY_BUSES`` maps a bus name to
+        ``(type, vm, va, pg, qg, pd, qd, qmin, qmax)`` (``None`` for no Q
+        limit) and ``STUDY_BRANCHES`` lists ``(name, kind, from, to, r, x, b,
+        tap)``.  Bus positions, voltages and components are shared.
+        """
+        if not isinstance(defn, dict):
+            defn = {k: getattr(defn, k) for k in dir(defn) if k.isupper()}
+
+        positions = defn.get('BUS_POSITIONS')
+        voltages = defn['BUS_VOLTAGES']
+        bus_names = list(voltages if positions is None else positions)
+        index = {b: i for i, b in enumerate(bus_names)}
+        bus_kv = [voltages.get(b, np.nan) for b in bus_names]
+        types = defn.get('BUS_TYPES', {})
+        bus_type = [_BUS_TYPE_NAMES.get(types.get(b, 'Load Bus'), PQ) for b in bus_names]
+
+        electrical = {}
+        if study:
+            rows = defn['STUDY_BUSES']
+            table = np.array([[np.nan if v is None else v for v in rows[b]] for b in bus_names],
+                             dtype=np.float64)
+            bus_type = table[:, 0]
+            for k, field in enumerate(('vm', 'va', 'pg', 'qg', 'pd', 'qd'), 1):
+                electrical[field] = table[:, k]
+            electrical['qmin'] = np.nan_to_num(table[:, 7], nan=-np.inf)
+            electrical['qmax'] = np.nan_to_num(table[:, 8], nan=np.inf)
+
+            branches = defn['STUDY_BRANCHES']
+            branch_names = [row[0] for row in branches]
+            branch_kind = [row[1] for row in branches]
+            branch_from = [index[row[2]] for row in branches]
+            branch_to = [index[row[3]] for row in branches]
+            r, x, b, tap = np.array([row[4:8] for row in branches], dtype=np.float64).reshape(-1, 4).T
+            electrical.update(branch_r=r, branch_x=x, branch_b=b, branch_tap=tap)
+            branch_mva = [parse_rating(n).get('MVA', np.nan) for n in branch_names]
+        else:
+            connections = list(defn.get('CONNECTIONS', ()))
+            transformers = dict(defn.get('TRANSFORMERS', {}))
+            ends = connections + list(transformers.values())
+            branch_from = [index[b1] for b1, _ in ends]
+            branch_to = [index[b2] for _, b2 in ends]
+            branch_kind = [LINE] * len(connections) + [TRANSFORMER] * len(transformers)
+            branch_names = [f'{b1}-{b2}' for b1, b2 in connections] + list(transformers)
+            branch_mva = [np.nan] * len(connections) + [
+                parse_rating(t).get('MVA', np.nan) for t in transformers]
+
+        generators = defn.get('GENERATORS', {})
+        gen_mw = [parse_rating(g).get('MW', np.nan) for g in generators]
+
+        loads = defn.get('LOADS', {})
+        load_mw, load_mvar, load_mva = [], [], []
+        for label in loads:
+            r = parse_rating(label)
+            if 'MVA' in r:
+                load_mva.append(r['MVA'])
+                load_mw.append(np.nan)
+                load_mvar.append(np.nan)
+            else:
+                p, q = r.get('MW', np.nan), r.get('Mvar', 0.0)
+                load_mw.append(p)
+                load_mvar.append(q)
+                load_mva.append(np.hypot(p, q))
+
+        net = cls(
+            name=name or defn.get('NAME', 'grid'),
+            title=defn.get('TITLE'),
+            frequency=defn.get('FREQUENCY'),
+            bus_names=bus_names,
+            bus_xyz=np.zeros((len(bus_names), 3)) if positions is None else
+            [positions[b] for b in bus_names],
+            bus_kv=bus_kv,
+            bus_type=bus_type,
+            branch_from=branch_from,
+            branch_to=branch_to,
+            branch_kind=branch_kind,
+            branch_names=branch_names,
+            branch_mva=branch_mva,
+            gen_bus=[index[b] for b in generators.values()],
+            gen_names=list(generators),
+            gen_mw=gen_mw,
+            load_bus=[index[b] for b in loads.values()],
+            load_names=list(loads),
+            load_mw=load_mw,
+            load_mvar=load_mvar,
+            load_mva=load_mva,
+            **electrical,
+        )
+        if positions is None:
+            # Place the drawing topology, so a study network shares its positions;
+            # the cached layout is shared and read-only, the network gets its own
+            from .layout import layout
+            drawn = cls.from_definition(defn, name, study=False) if study else net
+            net.bus_xyz = np.array(layout(drawn), copy=True)
+        return net
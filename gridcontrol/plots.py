@@ -0,0 +1,293 @@
+"""Headless export of the standard load-flow and short-circuit plots.
+
+Renders, without a display, the figures the MATLAB verification scripts
+draw (``LFA_Verification.m``, ``SCA_Verification.m``) plus the 3D SLD, and
+saves them as PNGs:
+
+========================  =============================================
+``voltage_profile``       bus voltage magnitudes
+``angle_profile``         bus voltage angles
+``active_power``          P generation / load per bus
+``reactive_power``        Q generation / load per bus
+``apparent_power``        apparent power injection per bus
+``line_p_flows``          active power flow per branch
+``line_q_flows``          reactive power flow per branch
+``mva_load``              MVA load per bus
+``convergence``           mismatch per iteration
+``losses``                total P/Q losses
+``fault_currents``        all fault types per bus (grouped)
+``fault_types``           one panel per fault type
+``sld``                   3D single-line diagram
+========================  =============================================
+
+Figures are ``matplotlib.figure.Figure`` objects rendered by Agg, never
+pyplot, so workers need no GUI.  Each worker keeps one
+:class:`FigureTemplate` per plot: axes, titles, labels and grid are set
+up once and only the data artists are replaced per grid.
+
+Run ``python -m gridcontrol.plots --out images`` to export every plot of
+every grid (specs as in :mod:`gridcontrol.batch`) over a process pool.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+COLORS = ('#0072BD', '#D95319', '#EDB120', '#7E2F8E', '#77AC30')
+FAULT_COLORS = ('#3399CC', '#CC3333', '#33CC33', '#CCCC33')
+
+
+class FigureTemplate:
+    """A figure whose static decoration is kept between renders.
+
+    ``setup(fig)`` creates the axes and decorations and returns the axes
+    list; :meth:`clear` removes everything added afterwards.
+    """
+
+    def __init__(self, setup, figsize=(10, 6)):
+        self.fig = Figure(figsize=figsize, layout='constrained')
+        self.axes = setup(self.fig)
+        self._static = {id(a) for ax in self.axes for a in self._data_artists(ax)}
+
+    @staticmethod
+    def _data_artists(ax):
+        return [*ax.lines, *ax.patches, *ax.collections, *ax.texts]
+
+    def clear(self):
+        for ax in self.axes:
+            for artist in self._data_artists(ax):
+                if id(artist) not in self._static:
+                    artist.remove()
+            ax.containers.clear()
+            if ax.get_legend() is not None:
+                ax.get_legend().remove()
+            ax.relim()
+            ax.autoscale_view()
+
+    def save(self, path, dpi=100):
+        self.fig.savefig(path, dpi=dpi)
+
+
+def _axes(title, xlabel, ylabel, log=False):
+    def setup(fig):
+        ax = fig.add_subplot()
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.grid(True, alpha=0.4)
+        if log:
+            ax.set_yscale('log')
+        return [ax]
+    return setup
+
+
+def _fault_panels(fig):
+    from .shortcircuit import FAULT_LABELS
+
+    axes = list(fig.subplots(2, 2).ravel())
+    for ax, label in zip(axes, FAULT_LABELS):
+        ax.set_title(f'{label} Fault Currents', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Current (kA)')
+        ax.grid(True, alpha=0.4)
+    fig.suptitle('Individual Fault Type Analysis for All Buses', fontsize=14, fontweight='bold')
+    return axes
+
+
+def _sld_axes(fig):
+    return [fig.add_subplot(projection='3d')]
+
+
+TEMPLATES = {
+    'voltage_profile': (_axes('Bus Voltage Magnitude Profile', 'Bus', 'Voltage (p.u.)'), (10, 6)),
+    'angle_profile': (_axes('Bus Voltage Angle Profile', 'Bus', 'Angle (deg)'), (10, 6)),
+    'active_power': (_axes('Active Power per Bus', 'Bus', 'Active Power (MW)'), (10, 6)),
+    'reactive_power': (_axes('Reactive Power per Bus', 'Bus', 'Reactive Power (Mvar)'), (10, 6)),
+    'apparent_power': (_axes('Apparent Power Injection per Bus', 'Bus', 'Apparent Power (MVA)'), (10, 6)),
+    'line_p_flows': (_axes('Active Power Flow in Lines', 'Branch', 'Power (MW)'), (12, 6)),
+    'line_q_flows': (_axes('Reactive Power Flow in Lines', 'Branch', 'Power (Mvar)'), (12, 6)),
+    'mva_load': (_axes('MVA Load per Bus', 'Bus', 'MVA'), (10, 6)),
+    'convergence': (_axes('Convergence History', 'Iteration', 'Max Mismatch (p.u.)', log=True), (8, 6)),
+    'losses': (_axes('Total System Losses', '', 'Power Loss'), (6, 6)),
+    'fault_currents': (_axes('Short Circuit Fault Currents at All Buses', 'Bus', 'Current (kA)'), (12, 6)),
+    'fault_types': (_fault_panels, (12, 9)),
+    'sld': (_sld_axes, (12, 9)),
+}
+LOAD_FLOW_PLOTS = ('voltage_profile', 'angle_profile', 'active_power', 'reactive_power',
+                   'apparent_power', 'line_p_flows', 'line_q_flows', 'mva_load', 'convergence',
+                   'losses')
+FAULT_PLOTS = ('fault_currents', 'fault_types')
+PLOTS = tuple(TEMPLATES)
+
+# Tick labels are dropped above this many categories
+MAX_TICK_LABELS = 40
+
+_templates = {}
+
+
+def template(kind):
+    """This process's cached, cleared template for plot ``kind``."""
+    if kind not in _templates:
+        setup, figsize = TEMPLATES[kind]
+        _templates[kind] = FigureTemplate(setup, figsize)
+    tpl = _templates[kind]
+    tpl.clear()
+    return tpl
+
+
+def _categories(ax, labels):
+    x = np.arange(len(labels))
+    if len(labels) <= MAX_TICK_LABELS:
+        ax.set_xticks(x, labels, rotation=45 if len(labels) > 10 else 0, ha='right' if len(labels) > 10 else 'center')
+    else:
+        ax.set_xticks([])
+    return x
+
+
+def _grouped(ax, labels, columns, names, colors):
+    x = _categories(ax, labels)
+    width = 0.8 / len(columns)
+    for k, (col, name, color) in enumerate(zip(columns, names, colors)):
+        ax.bar(x + (k - (len(columns) - 1) / 2) * width, col, width, label=name, color=color,
+               edgecolor='k' if len(labels) <= MAX_TICK_LABELS else 'none')
+    ax.legend()
+
+
+def draw_load_flow(kind, result):
+    """Render load-flow plot ``kind`` of ``result`` into its template."""
+    net = result.net
+    tpl = template(kind)
+    ax = tpl.axes[0]
+    names = net.bus_names
+    if kind == 'voltage_profile':
+        x = _categories(ax, names)
+        ax.plot(x, result.vm, '-o', color=COLORS[0], linewidth=2)
+    elif kind == 'angle_profile':
+        x = _categories(ax, names)
+        ax.plot(x, result.va, '-s', color=COLORS[1], linewidth=2)
+    elif kind == 'active_power':
+        _grouped(ax, names, (result.pg, net.pd), ('P generation', 'P load'), COLORS[:2])
+    elif kind == 'reactive_power':
+        _grouped(ax, names, (result.qg, net.qd), ('Q generation', 'Q load'), COLORS[2:4])
+    elif kind == 'apparent_power':
+        x = _categories(ax, names)
+        ax.bar(x, np.abs(result.sbus) * net.base_mva, color=COLORS[4], edgecolor='k')
+    elif kind in ('line_p_flows', 'line_q_flows'):
+        sf = result.branch_flows()[0]
+        labels = np.char.add(np.char.add(names[net.branch_from], '-'), names[net.branch_to])
+        x = _categories(ax, labels)
+        values, color = (sf.real, COLORS[0]) if kind == 'line_p_flows' else (sf.imag, COLORS[1])
+        ax.bar(x, values, color=color, edgecolor='k')
+    elif kind == 'mva_load':
+        x = _categories(ax, names)
+        ax.bar(x, np.hypot(net.pd, net.qd), color=COLORS[2], edgecolor='k')
+    elif kind == 'convergence':
+        mismatch = np.maximum(result.mismatch, np.finfo(float).tiny)
+        ax.plot(np.arange(len(mismatch)), mismatch, '-o', color=COLORS[3], linewidth=2)
+    elif kind == 'losses':
+        loss = result.losses
+        ax.bar([0, 1], [loss.real, loss.imag], color=COLORS[1], edgecolor='k')
+        ax.set_xticks([0, 1], ['P loss (MW)', 'Q loss (Mvar)'])
+    else:
+        raise KeyError(f'not a load-flow plot: {kind!r}')
+    return tpl
+
+
+def draw_faults(kind, result):
+    """Render short-circuit plot ``kind`` of a ``FaultCurrents`` result."""
+    from .shortcircuit import FAULT_LABELS
+
+    names = result.net.bus_names
+    ka = result.ka
+    tpl = template(kind)
+    if kind == 'fault_currents':
+        _grouped(tpl.axes[0], names, ka.T, FAULT_LABELS, FAULT_COLORS)
+    elif kind == 'fault_types':
+        for ax, col, color in zip(tpl.axes, ka.T, FAULT_COLORS):
+            x = _categories(ax, names)
+            ax.bar(x, col, color=color, edgecolor='k')
+    else:
+        raise KeyError(f'not a short-circuit plot: {kind!r}')
+    return tpl
+
+
+def draw_sld(net):
+    """Render the 3D single-line diagram of ``net``."""
+    from .render import draw_network
+
+    tpl = template('sld')
+    ax = tpl.axes[0]
+    ax.cla()        # 3D data limits are not recomputed by relim()
+    draw_network(ax, net)
+    ax.set_title(net.title)
+    return tpl
+
+
+def export_grid(spec, out, plots=PLOTS, dpi=100):
+    """Write the PNGs of one grid spec to ``out/<grid>/``; returns the paths."""
+    from .batch import load_networks, spec_name
+
+    grid, case = load_networks(spec)
+    directory = os.path.join(out, spec_name(spec))
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+
+    def save(tpl, kind):
+        path = os.path.join(directory, kind + '.png')
+        tpl.save(path, dpi=dpi)
+        paths.append(path)
+
+    if case is not None and any(k in LOAD_FLOW_PLOTS for k in plots):
+        from .powerflow import solve
+
+        result = solve(case)
+        for kind in plots:
+            if kind in LOAD_FLOW_PLOTS:
+                save(draw_load_flow(kind, result), kind)
+    if case is not None and any(k in FAULT_PLOTS for k in plots):
+        from .shortcircuit import fault_currents
+
+        faults = fault_currents(case)
+        for kind in plots:
+            if kind in FAULT_PLOTS:
+                save(draw_faults(kind, faults), kind)
+    if 'sld' in plots:
+        save(draw_sld(grid), 'sld')
+    return paths
+
+
+def _export_packed(task):
+    return export_grid(*task)
+
+
+def export_all(specs, out, plots=PLOTS, workers=None, dpi=100):
+    """Export ``plots`` for every spec over a process pool (one task per grid)."""
+    tasks = [(spec, out, tuple(plots), dpi) for spec in specs]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        return [p for t in tasks for p in _export_packed(t)]
+    with ProcessPoolExecutor(workers) as pool:
+        return [p for paths in pool.map(_export_packed, tasks) for p in paths]
+
+
+def main(argv=None):
+    from .batch import discover
+
+    parser = argparse.ArgumentParser(description='Export the LFA/SCA plots and SLDs as PNGs.')
+    parser.add_argument('specs', nargs='*', help='extra grid specs (see gridcontrol.batch)')
+    parser.add_argument('--out', default='images')
+    parser.add_argument('--plots', nargs='+', default=list(PLOTS), choices=PLOTS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    paths = export_all(discover(args.specs), args.out, args.plots, args.workers, args.dpi)
+    print(f'wrote {len(paths)} images to {args.out} in {time.perf_counter() - t0:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
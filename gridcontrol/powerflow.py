@@ -0,0 +1,750 @@
+"""Sparse load flow: Newton-Raphson, fast-decoupled and DC.
+
+Python counterpart of ``Load Flow Analysis/gridN/LFA_Verification.m``: the
+Ybus and Jacobian are assembled as scipy.sparse matrices, mismatches are
+evaluated with one sparse mat-vec, and each Newton step is a sparse LU solve.
+
+The fast-decoupled (``'fdxb'``/``'fdbx'``) and DC (``'dc'``) modes factorize
+their constant matrices once; the factors are returned on the result and can
+be passed back (``factors=``) to skip the factorization on repeated solves of
+the same topology.
+
+Run ``python -m gridcontrol.powerflow grid1`` to print the study results.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .network import PQ, PV, SLACK
+from .switching import WoodburySolver
+from .ybus import branch_admittances, branch_flows, csr_positions, make_b, make_bdc, make_ybus
+
+
+def bus_sets(bus_type):
+    """Return ``(ref, pv, pq)`` bus index arrays."""
+    return (np.flatnonzero(bus_type == SLACK), np.flatnonzero(bus_type == PV),
+            np.flatnonzero(bus_type == PQ))
+
+
+def bus_injections(net):
+    """Specified complex power injections ``(Pg - Pd) + j(Qg - Qd)`` in pu."""
+    return ((net.pg - net.pd) + 1j * (net.qg - net.qd)) / net.base_mva
+
+
+def initial_voltage(net):
+    """Flat/setpoint start: ``vm`` at its angle ``va`` (degrees)."""
+    return net.vm * np.exp(1j * np.deg2rad(net.va))
+
+
+class JacobianStructure:
+    """Precomputed sparsity layout of the reduced polar Jacobian.
+
+    The reduced Jacobian ``[[dP/dVa, dP/dVm], [dQ/dVa, dQ/dVm]]`` (rows
+    ``pvpq``/``pq``, columns ``pvpq``/``pq``) has a fixed pattern for a given
+    Ybus pattern and bus-type split.  This class works out, once, which Ybus
+    nonzero feeds each CSC slot of that matrix, so :meth:`assemble` is a
+    single gather with no symbolic work or sparse slicing per iteration.
+    """
+
+    def __init__(self, ybus, pvpq, pq):
+        n = ybus.shape[0]
+        self.ybus = ybus
+        self.pvpq = np.asarray(pvpq, dtype=np.intp)
+        self.pq = np.asarray(pq, dtype=np.intp)
+        n_a, n_m = len(self.pvpq), len(self.pq)
+        self.shape = (n_a + n_m, n_a + n_m)
+
+        coo = ybus.tocoo()
+        self.rows, self.cols = coo.row.astype(np.intp), coo.col.astype(np.intp)
+        nnz = len(self.rows)
+        self.diag = np.empty(n, dtype=np.intp)
+        on_diag = self.rows == self.cols
+        self.diag[self.rows[on_diag]] = np.flatnonzero(on_diag)
+
+        pos_a = np.full(n, -1, dtype=np.intp)
+        pos_a[self.pvpq] = np.arange(n_a)
+        pos_m = np.full(n, -1, dtype=np.intp)
+        pos_m[self.pq] = n_a + np.arange(n_m)
+
+        # Blocks: (row map, col map, component) with components
+        # 0 = Re dS/dVa, 1 = Re dS/dVm, 2 = Im dS/dVa, 3 = Im dS/dVm
+        out_r, out_c, comp, src = [], [], [], []
+        for rmap, cmap, c in ((pos_a, pos_a, 0), (pos_a, pos_m, 1), (pos_m, pos_a, 2), (pos_m, pos_m, 3)):
+            r, cc = rmap[self.rows], cmap[self.cols]
+            keep = np.flatnonzero((r >= 0) & (cc >= 0))
+            out_r.append(r[keep])
+            out_c.append(cc[keep])
+            comp.append(np.full(len(keep), c, dtype=np.intp))
+            src.append(keep)
+        out_r, out_c = np.concatenate(out_r), np.concatenate(out_c)
+        order = np.lexsort((out_r, out_c))
+        self._comp = np.concatenate(comp)[order]
+        self._src = np.concatenate(src)[order]
+        self._indices = out_r[order].astype(np.int32)
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(out_c, minlength=self.shape[1])))
+                                      ).astype(np.int32)
+        self._parts = np.empty((4, nnz))
+
+    def derivatives(self, V, ibus=None):
+        """Return ``(dS/dVa, dS/dVm)`` values on the Ybus pattern.
+
+        ``V`` may also be a ``(scenarios, n)`` stack; the values are then
+        ``(scenarios, nnz)``.
+        """
+        y = self.ybus.data
+        if ibus is None:
+            ibus = (self.ybus @ V.T).T
+        vn = V / np.abs(V)
+        v_row = V[..., self.rows]
+        ds_dva = -1j * v_row * np.conj(y * V[..., self.cols])
+        ds_dva[..., self.diag] += 1j * V * np.conj(ibus)
+        ds_dvm = v_row * np.conj(y * vn[..., self.cols])
+        ds_dvm[..., self.diag] += np.conj(ibus) * vn
+        return ds_dva, ds_dvm
+
+    def values(self, V, ibus=None):
+        """Jacobian nonzeros in CSC order (``indices``/``indptr``), stacked per scenario."""
+        ds_dva, ds_dvm = self.derivatives(V, ibus)
+        parts = np.stack((ds_dva.real, ds_dvm.real, ds_dva.imag, ds_dvm.imag), axis=-2)
+        return parts[..., self._comp, self._src]
+
+    @property
+    def indices(self):
+        return self._indices
+
+    @property
+    def indptr(self):
+        return self._indptr
+
+    def restrict(self, pq):
+        """Structure for the same ``pvpq`` with magnitude rows/columns only at ``pq``.
+
+        ``pq`` must be a subset of this structure's ``pq``; the result keeps
+        this structure's bus order (see its ``pq``).  Its CSC entries are
+        selected from these by a mask, with no sorting or Ybus work, so a
+        structure built with every ``pvpq`` bus in ``pq`` serves any PV/PQ
+        split of those buses.
+        """
+        n_a = len(self.pvpq)
+        keep_m = np.isin(self.pq, pq)
+        new = np.concatenate((np.arange(n_a), np.where(keep_m, n_a + np.cumsum(keep_m) - 1, -1)))
+        r = new[self._indices]
+        c = new[np.repeat(np.arange(self.shape[1]), np.diff(self._indptr))]
+        keep = (r >= 0) & (c >= 0)
+        out = object.__new__(JacobianStructure)
+        out.__dict__.update(self.__dict__)
+        out.pq = self.pq[keep_m]
+        out.shape = (n_a + len(out.pq),) * 2
+        out._comp, out._src = self._comp[keep], self._src[keep]
+        out._indices = r[keep].astype(np.int32)
+        out._indptr = np.concatenate(([0], np.cumsum(np.bincount(c[keep], minlength=out.shape[1])))
+                                     ).astype(np.int32)
+        return out
+
+    def assemble(self, V, ibus=None):
+        """Return the reduced Jacobian at ``V`` as a CSC matrix."""
+        ds_dva, ds_dvm = self.derivatives(V, ibus)
+        parts = self._parts
+        parts[0], parts[1] = ds_dva.real, ds_dvm.real
+        parts[2], parts[3] = ds_dva.imag, ds_dvm.imag
+        return sp.csc_matrix((parts[self._comp, self._src], self._indices, self._indptr),
+                             shape=self.shape)
+
+
+@dataclass
+class PowerFlowResult:
+    """Solved operating point of a network."""
+
+    net: object
+    V: np.ndarray
+    converged: bool
+    iterations: int
+    method: str
+    mismatch: list = field(default_factory=list)
+    ybus: object = None
+    factors: object = None
+    q_limited: np.ndarray = None    # PV buses held at a reactive limit
+    switches: int = 0               # PV/PQ type changes made
+
+    @property
+    def vm(self):
+        """Voltage magnitudes (pu)."""
+        return np.abs(self.V)
+
+    @property
+    def va(self):
+        """Voltage angles (degrees)."""
+        return np.rad2deg(np.angle(self.V))
+
+    @property
+    def sbus(self):
+        """Calculated complex bus injections (pu); reactive part is ``nan`` for DC."""
+        if self.method == 'dc':
+            return self.factors.bbus @ np.angle(self.V) + 1j * np.nan
+        return self.V * np.conj(self.ybus @ self.V)
+
+    @property
+    def pg(self):
+        """Generation needed at each bus to meet the solved injections (MW)."""
+        return self.sbus.real * self.net.base_mva + self.net.pd
+
+    @property
+    def qg(self):
+        """Reactive generation at each bus (Mvar)."""
+        return self.sbus.imag * self.net.base_mva + self.net.qd
+
+    def branch_flows(self):
+        """``(S_from, S_to)`` branch end flows in MVA (complex)."""
+        if self.method == 'dc':
+            sf = (self.factors.bf @ np.angle(self.V)).astype(complex)
+            return sf * self.net.base_mva, -sf * self.net.base_mva
+        sf, st = branch_flows(self.net, self.V)
+        return sf * self.net.base_mva, st * self.net.base_mva
+
+    @property
+    def loading(self):
+        """Branch loading as a fraction of ``branch_mva`` (``nan`` when unrated)."""
+        sf, st = self.branch_flows()
+        return np.maximum(np.abs(sf), np.abs(st)) / self.net.branch_mva
+
+    @property
+    def losses(self):
+        """Total complex branch losses (MW + j Mvar)."""
+        sf, st = self.branch_flows()
+        return (sf + st).sum()
+
+
+def _newton(ybus, jac, V, sbus, tol, max_iter):
+    """Newton-Raphson iterations on the bus split of ``jac``.
+
+    Returns ``(V, converged, iterations, mismatch history)``; a singular
+    Jacobian (islanded bus, voltage collapse) ends the iterations unconverged.
+    """
+    pvpq, pq = jac.pvpq, jac.pq
+    vm, va = np.abs(V), np.angle(V)
+    n_a = len(pvpq)
+    history = []
+    converged = False
+    iterations = 0
+    while True:
+        ibus = ybus @ V
+        mis = V * np.conj(ibus) - sbus
+        F = np.concatenate((mis.real[pvpq], mis.imag[pq]))
+        norm = np.abs(F).max() if len(F) else 0.0
+        history.append(norm)
+        if norm < tol:
+            converged = True
+            break
+        if iterations >= max_iter or not np.isfinite(norm):
+            break
+        try:
+            lu = splu(jac.assemble(V, ibus))
+        except RuntimeError:
+            break
+        iterations += 1
+        dx = lu.solve(-F)
+        va[pvpq] += dx[:n_a]
+        vm[pq] += dx[n_a:]
+        V = vm * np.exp(1j * va)
+    return V, converged, iterations, history
+
+
+def newton_raphson(net, tol=1e-6, max_iter=30, v0=None, ybus=None, jac=None, q_limits=False,
+                   max_rounds=10, v_tol=1e-4):
+    """Solve the AC load flow of ``net`` with a sparse Newton-Raphson.
+
+    ``v0`` warm-starts from a previous complex voltage solution (setpoints of
+    PV and slack buses are still enforced).  Convergence is declared when the
+    largest active/reactive mismatch drops below ``tol`` (pu).  ``jac`` is a
+    :class:`JacobianStructure` of ``ybus`` and the current bus-type split,
+    reused across solves that only change injections.
+
+    With ``q_limits`` the generator limits ``qmin``/``qmax`` of PV buses are
+    enforced: after each converged solve, PV buses outside their limits are
+    switched to PQ with Qg held at the limit, and held buses whose voltage
+    is more than ``v_tol`` (pu) past their set-point on the side the limit
+    was holding back are switched back, for at most ``max_rounds``
+    re-solves (warm-started).  The result is converged only when the last
+    solve needed no switch: every free PV bus within its limits and every
+    held bus at its limit with its voltage short of the set-point.  If the
+    rounds run out first it is returned unconverged, with ``q_limited``
+    the held buses of that last solve.  The Jacobian
+    structure is built once with every non-slack bus in ``pq`` and
+    :meth:`JacobianStructure.restrict` re-indexes it for each split; a
+    ``jac`` passed in must be such a structure.
+    """
+    if ybus is None:
+        ybus = make_ybus(net)
+    ref, pv, pq = bus_sets(net.bus_type)
+    pvpq = np.concatenate((pv, pq))
+    sbus = bus_injections(net)
+
+    V = initial_voltage(net) if v0 is None else np.array(v0, dtype=complex)
+    if v0 is not None:
+        fixed = np.concatenate((ref, pv))
+        V[fixed] = net.vm[fixed] * np.exp(1j * np.angle(V[fixed]))
+
+    if not q_limits:
+        if jac is None:
+            jac = JacobianStructure(ybus, pvpq, pq)
+        V, converged, iterations, history = _newton(ybus, jac, V, sbus, tol, max_iter)
+        return PowerFlowResult(net, V, converged, iterations, 'nr', history, ybus)
+
+    full = JacobianStructure(ybus, pvpq, pvpq) if jac is None else jac
+    qd, base = net.qd / net.base_mva, net.base_mva
+    qmin, qmax = net.qmin / base, net.qmax / base
+    held = np.zeros(net.n_bus, dtype=np.int8)      # -1 at qmin, +1 at qmax
+    jac = full.restrict(pq)
+    iterations, switches, history = 0, 0, []
+    for round_ in range(max_rounds + 1):
+        V, converged, its, mis = _newton(ybus, jac, V, sbus, tol, max_iter)
+        iterations += its
+        history += mis
+        if not converged:
+            break
+        qg = (V * np.conj(ybus @ V)).imag + qd
+        vm = np.abs(V)
+        free = pv[held[pv] == 0]
+        over, under = free[qg[free] > qmax[free] + tol], free[qg[free] < qmin[free] - tol]
+        limited = pv[held[pv] != 0]
+        back = limited[np.where(held[limited] > 0, vm[limited] > net.vm[limited] + v_tol,
+                                vm[limited] < net.vm[limited] - v_tol)]
+        if not (len(over) or len(under) or len(back)):
+            break
+        if round_ == max_rounds:
+            converged = False   # the switches below would need another solve
+            break
+        held[over], held[under], held[back] = 1, -1, 0
+        sbus.imag[over] = qmax[over] - qd[over]
+        sbus.imag[under] = qmin[under] - qd[under]
+        V[back] = net.vm[back] * np.exp(1j * np.angle(V[back]))
+        switches += len(over) + len(under) + len(back)
+        jac = full.restrict(np.concatenate((pq, pv[held[pv] != 0])))
+
+    return PowerFlowResult(net, V, converged, iterations, 'nr', history, ybus,
+                           q_limited=pv[held[pv] != 0], switches=switches)
+
+
+# Reduced Jacobians up to this order are solved as one dense batch; larger
+# ones as a single block-diagonal sparse system
+BATCH_DENSE_MAX = 120
+
+
+@dataclass
+class BatchPowerFlowResult:
+    """Operating points of one network under many injection scenarios.
+
+    ``V`` is ``(scenarios, n_bus)``; ``converged``, ``iterations`` and
+    ``mismatch`` (final largest mismatch, pu) have one entry per scenario.
+    """
+
+    net: object
+    V: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+    mismatch: np.ndarray
+    ybus: object = None
+
+    @property
+    def vm(self):
+        return np.abs(self.V)
+
+    @property
+    def va(self):
+        return np.rad2deg(np.angle(self.V))
+
+    @property
+    def sbus(self):
+        """Calculated complex bus injections (pu), one row per scenario."""
+        return self.V * np.conj((self.ybus @ self.V.T).T)
+
+    def branch_flows(self):
+        """``(S_from, S_to)`` in MVA, ``(scenarios, n_branch)`` each."""
+        f, t = self.net.branch_from, self.net.branch_to
+        yff, yft, ytf, ytt = branch_admittances(self.net)
+        vf, vt = self.V[:, f], self.V[:, t]
+        base = self.net.base_mva
+        return (vf * np.conj(yff * vf + yft * vt) * base,
+                vt * np.conj(ytf * vf + ytt * vt) * base)
+
+    @property
+    def losses(self):
+        """Total complex branch losses (MW + j Mvar) per scenario."""
+        sf, st = self.branch_flows()
+        return (sf + st).sum(axis=1)
+
+
+def batch_injections(net, pd=None, qd=None, pg=None, qg=None):
+    """``(scenarios, n_bus)`` complex injections (pu) from per-scenario MW/Mvar.
+
+    Each argument is ``(scenarios, n_bus)`` or ``(n_bus,)``; omitted ones
+    are the network's own values.
+    """
+    pick = lambda given, own: own if given is None else np.asarray(given, dtype=np.float64)
+    p = pick(pg, net.pg) - pick(pd, net.pd)
+    q = pick(qg, net.qg) - pick(qd, net.qd)
+    return np.atleast_2d((p + 1j * q) / net.base_mva)
+
+
+def _solve_stack(jac, data, F, dense_pos):
+    """Solve each scenario's Jacobian system; rows that fail come back ``nan``."""
+    k, n = F.shape
+    if dense_pos is not None:
+        J = np.zeros((k, n * n))
+        J[:, dense_pos] = data
+        J = J.reshape(k, n, n)
+        try:
+            return np.linalg.solve(J, -F[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            dx = np.full((k, n), np.nan)
+            for i in range(k):
+                try:
+                    dx[i] = np.linalg.solve(J[i], -F[i])
+                except np.linalg.LinAlgError:
+                    pass
+            return dx
+    nnz = data.shape[1]
+    offsets = np.arange(k)
+    indices = (jac.indices[None, :] + (offsets * n)[:, None]).ravel()
+    indptr = np.append((jac.indptr[:-1][None, :] + (offsets * nnz)[:, None]).ravel(), k * nnz)
+    block = sp.csc_matrix((data.ravel(), indices, indptr), shape=(k * n, k * n))
+    try:
+        return splu(block).solve(-F.ravel()).reshape(k, n)
+    except RuntimeError:
+        dx = np.full((k, n), np.nan)
+        for i in range(k):
+            try:
+                dx[i] = splu(block[i * n:(i + 1) * n, i * n:(i + 1) * n]).solve(-F[i])
+            except RuntimeError:
+                pass
+        return dx
+
+
+def newton_raphson_batch(net, sbus, tol=1e-6, max_iter=30, v0=None, ybus=None, jac=None,
+                         dense=None):
+    """Solve the AC load flow of ``net`` for every row of ``sbus`` at once.
+
+    ``sbus`` is a ``(scenarios, n_bus)`` matrix of specified injections in
+    pu (see :func:`batch_injections`); topology, bus types and setpoints are
+    shared.  Mismatches and Jacobian values of all scenarios are evaluated
+    as stacked arrays on one :class:`JacobianStructure`, so the sparsity
+    pattern is worked out once.  Converged scenarios drop out of later
+    iterations.  The update step is a batched dense solve for small
+    Jacobians (``dense=None`` decides by :data:`BATCH_DENSE_MAX`) and one
+    sparse LU of the block-diagonal system otherwise.  ``v0`` is one start
+    vector or one per scenario.
+    """
+    if ybus is None:
+        ybus = make_ybus(net)
+    ref, pv, pq = bus_sets(net.bus_type)
+    pvpq = np.concatenate((pv, pq))
+    sbus = np.atleast_2d(np.asarray(sbus, dtype=complex))
+    n_scen = len(sbus)
+
+    V = np.array(np.broadcast_to(initial_voltage(net) if v0 is None else v0, sbus.shape),
+                 dtype=complex)
+    if v0 is not None:
+        fixed = np.concatenate((ref, pv))
+        V[:, fixed] = net.vm[fixed] * np.exp(1j * np.angle(V[:, fixed]))
+    vm, va = np.abs(V), np.angle(V)
+
+    if jac is None:
+        jac = JacobianStructure(ybus, pvpq, pq)
+    n_a, n_j = len(pvpq), jac.shape[0]
+    if dense is None:
+        dense = n_j <= BATCH_DENSE_MAX
+    dense_pos = None
+    if dense:
+        cols = np.repeat(np.arange(n_j), np.diff(jac.indptr))
+        dense_pos = jac.indices.astype(np.intp) * n_j + cols
+
+    converged = np.zeros(n_scen, dtype=bool)
+    iterations = np.zeros(n_scen, dtype=np.intp)
+    mismatch = np.full(n_scen, np.inf)
+    active = np.arange(n_scen)
+    for it in range(max_iter + 1):
+        Va = V[active]
+        ibus = (ybus @ Va.T).T
+        mis = Va * np.conj(ibus) - sbus[active]
+        F = np.concatenate((mis.real[:, pvpq], mis.imag[:, pq]), axis=1)
+        norm = np.abs(F).max(axis=1, initial=0.0)
+        mismatch[active] = norm
+        done = norm < tol
+        converged[active[done]] = True
+        keep = ~done & np.isfinite(norm)
+        if it == max_iter or not keep.any():
+            break
+        active, Va, ibus, F = active[keep], Va[keep], ibus[keep], F[keep]
+        iterations[active] += 1
+        dx = _solve_stack(jac, jac.values(Va, ibus), F, dense_pos)
+        va[np.ix_(active, pvpq)] += dx[:, :n_a]
+        vm[np.ix_(active, pq)] += dx[:, n_a:]
+        V[active] = vm[active] * np.exp(1j * va[active])
+
+    return BatchPowerFlowResult(net, V, converged, iterations, mismatch, ybus)
+
+
+class DecoupledFactors:
+    """LU factors of the fast-decoupled ``B'`` and ``B''`` matrices."""
+
+    def __init__(self, net, alg='xb'):
+        self.alg = alg
+        ref, pv, pq = bus_sets(net.bus_type)
+        self.pvpq = np.concatenate((pv, pq))
+        self.pq = pq
+        bp, bpp = make_b(net, alg)
+        self.bp = splu(bp[self.pvpq][:, self.pvpq].tocsc())
+        self.bpp = splu(bpp[pq][:, pq].tocsc()) if len(pq) else None
+
+    def check(self, net, alg):
+        ref, pv, pq = bus_sets(net.bus_type)
+        if alg != self.alg or not (np.array_equal(pq, self.pq)
+                                   and np.array_equal(np.concatenate((pv, pq)), self.pvpq)):
+            raise ValueError('factors were computed for a different scheme or bus-type split')
+
+
+class DCFactors:
+    """``Bbus``/``Bf`` and the factorization of ``Bbus`` without the slack bus.
+
+    The factorization is a :class:`~gridcontrol.switching.WoodburySolver`, so
+    branch switching can be folded in with :meth:`apply` instead of
+    refactorizing.
+    """
+
+    def __init__(self, net):
+        ref, pv, pq = bus_sets(net.bus_type)
+        self.ref = ref
+        self.pvpq = np.concatenate((pv, pq))
+        self.bbus, self.bf = make_bdc(net)
+        self.lu = WoodburySolver(self.bbus[self.pvpq][:, self.pvpq])
+        self._reduced = np.full(net.n_bus, -1, dtype=np.intp)
+        self._reduced[self.pvpq] = np.arange(len(self.pvpq))
+
+    def check(self, net):
+        if not np.array_equal(bus_sets(net.bus_type)[0], self.ref):
+            raise ValueError('factors were computed for a different slack bus')
+        if self.bf.shape[0] != net.n_branch:
+            raise ValueError('factors are missing branches added to the network; '
+                             'apply() their BranchChange first')
+
+    def apply(self, change):
+        """Fold a :class:`~gridcontrol.switching.BranchChange` into the factors."""
+        f, t = change.buses
+        block = change.dc_block
+        pos = csr_positions(self.bbus, [f, f, t, t], [f, t, f, t])
+        if (pos < 0).any():
+            self.bbus = (self.bbus + sp.csr_matrix((block.ravel(), ([f, f, t, t], [f, t, f, t])),
+                                                   shape=self.bbus.shape)).tocsr()
+            self.bbus.sort_indices()
+        else:
+            self.bbus.data[pos] += block.ravel()
+        if change.branch >= self.bf.shape[0]:
+            row = sp.csr_matrix(([change.dc_delta, -change.dc_delta], ([0, 0], [f, t])),
+                                shape=(1, self.bf.shape[1]))
+            self.bf = sp.vstack((self.bf, row), format='csr')
+        else:
+            pos = csr_positions(self.bf, [change.branch] * 2, [f, t])
+            self.bf.data[pos] += [change.dc_delta, -change.dc_delta]
+        r = self._reduced[[f, t]]
+        keep = r >= 0
+        self.lu.update(r[keep], block[np.ix_(keep, keep)])
+
+
+def fast_decoupled(net, alg='xb', tol=1e-6, max_iter=30, v0=None, ybus=None, factors=None):
+    """Solve the AC load flow with the XB or BX fast-decoupled method.
+
+    Each iteration is one ``B'`` half-step on the angles and one ``B''``
+    half-step on the magnitudes, both against factors computed once.
+    """
+    if ybus is None:
+        ybus = make_ybus(net)
+    if factors is None:
+        factors = DecoupledFactors(net, alg)
+    else:
+        factors.check(net, alg)
+    pvpq, pq = factors.pvpq, factors.pq
+    sbus = bus_injections(net)
+
+    V = initial_voltage(net) if v0 is None else np.array(v0, dtype=complex)
+    if v0 is not None:
+        fixed = np.setdiff1d(np.arange(net.n_bus), pq)
+        V[fixed] = net.vm[fixed] * np.exp(1j * np.angle(V[fixed]))
+    vm, va = np.abs(V), np.angle(V)
+    history = []
+
+    def mismatch(V):
+        mis = (V * np.conj(ybus @ V) - sbus) / np.abs(V)
+        p, q = mis.real[pvpq], mis.imag[pq]
+        history.append(max(np.abs(p).max(initial=0.0), np.abs(q).max(initial=0.0)))
+        return p, q
+
+    iterations = 0
+    p, q = mismatch(V)
+    converged = history[-1] < tol
+    while not converged and iterations < max_iter:
+        iterations += 1
+        va[pvpq] -= factors.bp.solve(p)
+        V = vm * np.exp(1j * va)
+        p, q = mismatch(V)
+        if history[-1] < tol:
+            converged = True
+            break
+        if factors.bpp is not None:
+            vm[pq] -= factors.bpp.solve(q)
+            V = vm * np.exp(1j * va)
+        p, q = mismatch(V)
+        converged = history[-1] < tol
+
+    return PowerFlowResult(net, V, converged, iterations, 'fd' + alg, history, ybus, factors)
+
+
+def dc_power_flow(net, factors=None, **_):
+    """Linear DC load flow: lossless, flat magnitudes, angles from ``B theta = P``.
+
+    Voltage magnitudes are left at their setpoints; reactive quantities are
+    not modelled.
+    """
+    if factors is None:
+        factors = DCFactors(net)
+    else:
+        factors.check(net)
+    va = np.deg2rad(net.va)
+    va_ref = np.zeros(net.n_bus)
+    va_ref[factors.ref] = va[factors.ref]
+    p = (net.pg - net.pd) / net.base_mva
+    rhs = (p - factors.bbus @ va_ref)[factors.pvpq]
+    va[factors.pvpq] = factors.lu.solve(rhs)
+    V = net.vm * np.exp(1j * va)
+    return PowerFlowResult(net, V, True, 1, 'dc', [0.0], None, factors)
+
+
+METHODS = {
+    'nr': newton_raphson,
+    'fdxb': lambda net, **kw: fast_decoupled(net, 'xb', **kw),
+    'fdbx': lambda net, **kw: fast_decoupled(net, 'bx', **kw),
+    'dc': dc_power_flow,
+}
+
+
+def solve(net, method='nr', **kwargs):
+    """Run the load flow ``method`` (see :data:`METHODS`) on ``net``.
+
+    Keyword arguments go to the solver, e.g. ``tol``, ``max_iter``, ``v0`` or
+    the ``factors`` of an earlier fast-decoupled/DC result.
+    """
+    try:
+        solver = METHODS[method]
+    except KeyError:
+        raise ValueError(f'unknown load-flow method {method!r}; '
+                         f'expected one of {", ".join(METHODS)}') from None
+    return solver(net, **kwargs)
+
+
+def report(result, file=None):
+    """Print bus, branch and loss tables in the layout of LFA_Verification.m."""
+    net = result.net
+    out = lambda *a: print(*a, file=file)
+    state = 'Converged' if result.converged else 'Did NOT converge'
+    out(f'\n=== {net.title}: {result.method.upper()} load flow ===')
+    out(f'{state} in {result.iterations} iterations '
+        f'(final mismatch {result.mismatch[-1]:.3g} pu)')
+    if result.q_limited is not None:
+        held = ', '.join(net.bus_names[result.q_limited]) or 'none'
+        out(f'Q limits: {result.switches} PV/PQ switches; held at limit: {held}')
+
+    out('\nBus         Voltage   Angle     P_gen     Q_gen     P_load    Q_load')
+    out('            (p.u.)    (deg)     (MW)      (Mvar)    (MW)      (Mvar)')
+    out('-' * 72)
+    for row in zip(net.bus_names, result.vm, result.va, result.pg, result.qg, net.pd, net.qd):
+        out('{:<10}  {:7.4f}  {:7.2f}  {:8.2f}  {:8.2f}  {:8.2f}  {:8.2f}'.format(*row))
+
+    sf, st = result.branch_flows()
+    out('\nBranch          From      To        P_flow    Q_flow    S_flow    P_loss')
+    out('                                    (MW)      (Mvar)    (MVA)     (MW)')
+    out('-' * 78)
+    for name, f, t, s, loss in zip(net.branch_names, net.branch_from, net.branch_to, sf, sf + st):
+        out(f'{name:<14}  {net.bus_names[f]:<8}  {net.bus_names[t]:<8}  '
+            f'{s.real:8.2f}  {s.imag:8.2f}  {abs(s):8.2f}  {loss.real:8.4f}')
+
+    loss = result.losses
+    out(f'\nTotal Active Power Loss: {loss.real:.4f} MW')
+    out(f'Total Reactive Power Loss: {loss.imag:.4f} Mvar')
+
+
+def compare_etap(result, defn, file=None, etap=None):
+    """Print the ETAP reference values next to ``result``.
+
+    ``etap`` is a :class:`~gridcontrol.etap.LoadFlowResults` read from the
+    study's result file; without it the values transcribed into the grid
+    definition are used.
+    """
+    out = lambda *a: print(*a, file=file)
+    if etap is not None:
+        from .etap import match_buses
+
+        loss = result.losses
+        out(f'\n=== Comparison with ETAP Results ({etap.source}) ===')
+        out(f'ETAP Total Losses: {etap.losses.real:.2f} MW, {etap.losses.imag:.2f} Mvar')
+        out(f'Python Results: {loss.real:.2f} MW, {loss.imag:.2f} Mvar')
+        out('Bus         V (pu)   ETAP V   Angle    ETAP Ang  dV       dAng')
+        idx = match_buses(result.net, etap.bus_names)
+        for b, i, ev, ea in zip(etap.bus_names, idx, etap.vm, etap.va):
+            if i < 0:
+                continue
+            v, a = result.vm[i], result.va[i]
+            out(f'{b:<10}  {v:7.4f}  {ev:7.4f}  {a:7.3f}  {ea:7.3f}   {abs(v - ev):7.4f}  {abs(a - ea):6.3f}')
+        return
+    if hasattr(defn, 'ETAP_LOSSES'):
+        p, q = defn.ETAP_LOSSES
+        loss = result.losses
+        out('\n=== Comparison with ETAP Results ===')
+        out(f'ETAP Total Losses: {p:.2f} MW, {q:.2f} Mvar')
+        out(f'Python Results: {loss.real:.2f} MW, {loss.imag:.2f} Mvar')
+    if hasattr(defn, 'ETAP_VM'):
+        out('\n=== Comparison with ETAP Results ===')
+        out('Bus         V (pu)   ETAP V   Angle    ETAP Ang  dV       dAng')
+        for row in zip(result.net.bus_names, result.vm, defn.ETAP_VM, result.va, defn.ETAP_VA):
+            b, v, ev, a, ea = row
+            out(f'{b:<10}  {v:7.4f}  {ev:7.4f}  {a:7.3f}  {ea:7.3f}   {abs(v - ev):7.4f}  {abs(a - ea):6.3f}')
+
+
+def main(argv=None):
+    from .grids import GRIDS, definition, load_case
+
+    parser = argparse.ArgumentParser(description='Run the load flow of the study grids.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--method', default='nr', choices=sorted(METHODS))
+    parser.add_argument('--tol', type=float, default=1e-6)
+    parser.add_argument('--max-iter', type=int, default=30)
+    parser.add_argument('--q-limits', action='store_true',
+                        help='enforce generator Q limits (nr only)')
+    parser.add_argument('--etap', action='store_true',
+                        help='compare against the ETAP .LF1S result file instead of the stored values')
+    args = parser.parse_args(argv)
+    if args.q_limits and args.method != 'nr':
+        parser.error('--q-limits requires --method nr')
+    extra = {'q_limits': True} if args.q_limits else {}
+
+    for grid in args.grids:
+        result = solve(load_case(grid), args.method, tol=args.tol, max_iter=args.max_iter, **extra)
+        report(result)
+        etap = None
+        if args.etap:
+            from .cache import cached
+            from .etap import load_flow_results, study_file
+
+            try:
+                etap = cached(load_flow_results, study_file(grid, 'LF1S'))
+            except ImportError as exc:
+                # .LF1S files are SQL Server Compact: readable on Windows with ETAP only
+                print(f'{exc}; comparing with the stored ETAP values instead', file=sys.stderr)
+        compare_etap(result, definition(grid), etap=etap)
+
+
+if __name__ == '__main__':
+    main()
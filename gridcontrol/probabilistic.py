@@ -0,0 +1,314 @@
+"""Probabilistic load flow by Monte-Carlo sampling.
+
+Renewable sources are recognised by their labels (``'Wind Farm (30 MW)'``,
+``'Solar Farm (10 MVA)'``) among a network's generators and loads.  Each
+sample draws
+
+* wind output from a Weibull wind speed through a cubic power curve
+  (cut-in, rated and cut-out speeds);
+* solar output as a Beta-distributed fraction of the rating;
+* every bus demand scaled by an independent ``N(1, load_sigma)`` factor at
+  constant power factor.
+
+A renewable's sampled output replaces its study dispatch at its bus (the
+bus generation up to the rating for generators, nothing for sources listed
+among the loads).  Samples are solved in batches with
+:func:`~gridcontrol.powerflow.newton_raphson_batch`.
+
+Bus voltages, branch loadings and branch flows are accumulated in
+fixed-bin histogram sketches (:class:`QuantileSketch`): memory does not
+grow with the sample count, and sketches from different workers merge
+exactly.  Batch ``k`` always draws from child ``k`` of
+``SeedSequence(seed)``, so results do not depend on the number of
+workers::
+
+    plf = probabilistic_load_flow(load_case(3), samples=20000, workers=4)
+    plf.vm.quantile([0.05, 0.95])          # (2, n_bus)
+
+Run ``python -m gridcontrol.probabilistic grid3`` for a percentile report.
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .network import parse_rating
+from .powerflow import (JacobianStructure, batch_injections, bus_sets, newton_raphson,
+                        newton_raphson_batch)
+from .ybus import make_ybus
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+_KINDS = re.compile(r'\b(wind|solar|pv)\b', re.IGNORECASE)
+
+
+class QuantileSketch:
+    """Fixed-bin histograms of ``width`` variables over ``[lo, hi)``.
+
+    Values outside the range land in an under/overflow bin; quantiles are
+    interpolated within a bin and clipped to the observed min/max, so the
+    error is at most one bin width inside the range.  ``nan`` values are
+    ignored.
+    """
+
+    def __init__(self, lo, hi, width, bins=2000):
+        self.lo, self.hi, self.bins = float(lo), float(hi), int(bins)
+        self.counts = np.zeros((width, self.bins + 2), dtype=np.int64)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.total = np.zeros(width)
+
+    @property
+    def width(self):
+        return len(self.counts)
+
+    @property
+    def n(self):
+        """Number of finite values seen per variable."""
+        return self.counts.sum(axis=1)
+
+    @property
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total / self.n
+
+    def update(self, values):
+        """Add a ``(samples, width)`` block of observations."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.width)
+        ok = np.isfinite(values)
+        scaled = (values - self.lo) * (self.bins / (self.hi - self.lo))
+        idx = np.clip(np.floor(np.where(ok, scaled, 0.0)), -1, self.bins).astype(np.intp) + 1
+        cols = np.broadcast_to(np.arange(self.width), values.shape)
+        flat = (cols * (self.bins + 2) + idx)[ok]
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        masked = np.where(ok, values, np.nan)
+        with np.errstate(invalid='ignore'):
+            self.min = np.fmin(self.min, np.nanmin(np.where(ok, values, np.inf), axis=0))
+            self.max = np.fmax(self.max, np.nanmax(np.where(ok, values, -np.inf), axis=0))
+        self.total += np.nansum(masked, axis=0)
+        return self
+
+    def merge(self, other):
+        """Fold ``other`` (same range, bins and width) into this sketch."""
+        if (other.lo, other.hi, other.bins, other.width) != (self.lo, self.hi, self.bins, self.width):
+            raise ValueError('sketches have different bins')
+        self.counts += other.counts
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self.total += other.total
+        return self
+
+    def quantile(self, q):
+        """``(len(q), width)`` quantiles (``nan`` for variables never seen)."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        edges = self.lo + (self.hi - self.lo) * np.arange(self.bins + 1) / self.bins
+        out = np.full((len(q), self.width), np.nan)
+        cum = np.cumsum(self.counts, axis=1)
+        for j in np.flatnonzero(cum[:, -1]):
+            target = q * cum[j, -1]
+            k = np.minimum(np.searchsorted(cum[j], target, side='left'), self.bins + 1)
+            below = np.where(k > 0, cum[j, k - 1], 0)
+            frac = np.divide(target - below, self.counts[j, k],
+                             out=np.zeros(len(q)), where=self.counts[j, k] > 0)
+            # Bin k covers [edges[k-1], edges[k]); the under/overflow bins
+            # are bounded by the observed extremes
+            left = np.where(k == 0, self.min[j], edges[np.clip(k - 1, 0, self.bins)])
+            right = np.where(k == self.bins + 1, self.max[j], edges[np.clip(k, 0, self.bins)])
+            out[:, j] = np.clip(left + frac * (right - left), self.min[j], self.max[j])
+        return out
+
+    def cdf(self, x):
+        """Fraction of values below ``x`` per variable (to bin resolution)."""
+        k = int(np.clip(np.floor((x - self.lo) * self.bins / (self.hi - self.lo)), -1, self.bins)) + 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.counts[:, :k].sum(axis=1) / self.n
+
+
+@dataclass
+class Source:
+    """A renewable source: sampled output replaces ``base_mw`` at ``bus``."""
+
+    name: str
+    kind: str
+    bus: int
+    rating_mw: float
+    base_mw: float
+
+
+def renewable_sources(net):
+    """Wind and solar sources found among the generator and load labels."""
+    sources = []
+    for names, buses, is_gen in ((net.gen_names, net.gen_bus, True),
+                                 (net.load_names, net.load_bus, False)):
+        for name, bus in zip(names.tolist(), buses.tolist()):
+            match = _KINDS.search(name)
+            if not match:
+                continue
+            rating = parse_rating(name)
+            mw = rating.get('MW', rating.get('MVA', np.nan))
+            if not np.isfinite(mw):
+                continue
+            kind = 'wind' if match.group(1).lower() == 'wind' else 'solar'
+            base = min(max(net.pg[bus], 0.0), mw) if is_gen else 0.0
+            sources.append(Source(name, kind, bus, mw, base))
+    return sources
+
+
+def wind_output(rng, n, shape=2.0, scale=8.0, cut_in=3.0, rated=12.0, cut_out=25.0):
+    """Per-unit wind farm output for ``n`` Weibull wind speeds (m/s)."""
+    v = scale * rng.weibull(shape, n)
+    u = np.clip((v ** 3 - cut_in ** 3) / (rated ** 3 - cut_in ** 3), 0.0, 1.0)
+    u[v >= cut_out] = 0.0
+    return u
+
+
+def solar_output(rng, n, a=2.0, b=2.5):
+    """Per-unit solar output as a Beta(a, b) fraction of the rating."""
+    return rng.beta(a, b, n)
+
+
+_OUTPUT = {'wind': wind_output, 'solar': solar_output}
+
+
+def sample_injections(net, sources, n, rng, load_sigma=0.1):
+    """``(n, n_bus)`` complex injections (pu) of ``n`` random operating points."""
+    pg = np.tile(net.pg, (n, 1))
+    for src in sources:
+        pg[:, src.bus] += _OUTPUT[src.kind](rng, n) * src.rating_mw - src.base_mw
+    scale = np.maximum(rng.normal(1.0, load_sigma, (n, net.n_bus)), 0.0)
+    return batch_injections(net, pd=net.pd * scale, qd=net.qd * scale, pg=pg)
+
+
+def _sketches(net, flow_max, bins):
+    return dict(vm=QuantileSketch(0.8, 1.2, net.n_bus, bins),
+                loading=QuantileSketch(0.0, 2.0, net.n_branch, bins),
+                flow=QuantileSketch(0.0, flow_max, net.n_branch, bins))
+
+
+def _run_batches(net, batches, batch_size, seeds, flow_max, bins, load_sigma):
+    """Solve the listed batches; returns ``(sketches, samples, failed)``."""
+    sketches = _sketches(net, flow_max, bins)
+    sources = renewable_sources(net)
+    ybus = make_ybus(net)
+    _, pv, pq = bus_sets(net.bus_type)
+    jac = JacobianStructure(ybus, np.concatenate((pv, pq)), pq)
+    samples = failed = 0
+    for k, n in zip(batches, batch_size):
+        rng = np.random.default_rng(seeds[k])
+        result = newton_raphson_batch(net, sample_injections(net, sources, n, rng, load_sigma),
+                                      ybus=ybus, jac=jac)
+        ok = result.converged
+        sf, st = result.branch_flows()
+        flow = np.maximum(np.abs(sf), np.abs(st))[ok]
+        sketches['vm'].update(result.vm[ok])
+        sketches['flow'].update(flow)
+        sketches['loading'].update(flow / net.branch_mva)
+        samples += int(ok.sum())
+        failed += int((~ok).sum())
+    return sketches, samples, failed
+
+
+def _run_packed(task):
+    return _run_batches(*task)
+
+
+@dataclass
+class ProbabilisticResult:
+    """Merged sketches of a probabilistic load flow."""
+
+    net: object
+    samples: int
+    failed: int
+    sources: list
+    vm: QuantileSketch
+    loading: QuantileSketch
+    flow: QuantileSketch
+
+    def percentiles(self, q=QUANTILES):
+        """``{'vm': (len(q), n_bus), 'loading': ..., 'flow': ...}``."""
+        return {name: getattr(self, name).quantile(q) for name in ('vm', 'loading', 'flow')}
+
+
+def probabilistic_load_flow(net, samples=10000, batch=1000, workers=1, seed=0, load_sigma=0.1,
+                            bins=2000):
+    """Monte-Carlo load flow of ``net``; see the module docs.
+
+    ``samples`` are drawn in batches of ``batch``; batches are spread over
+    ``workers`` processes.  Non-converged samples are counted in
+    ``failed`` and left out of the sketches.
+    """
+    base = newton_raphson(net)
+    sf, st = base.branch_flows()
+    flow_max = 3.0 * max(np.abs(sf).max(initial=0.0), np.abs(st).max(initial=0.0),
+                         np.nan_to_num(net.branch_mva).max(initial=0.0), 1.0)
+    n_batches = -(-samples // batch)
+    sizes = [min(batch, samples - k * batch) for k in range(n_batches)]
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+
+    workers = max(1, min(workers or 1, n_batches))
+    groups = np.array_split(np.arange(n_batches), workers)
+    tasks = [(net, g.tolist(), [sizes[k] for k in g], seeds, flow_max, bins, load_sigma)
+             for g in groups if len(g)]
+    if workers == 1:
+        parts = [_run_packed(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_run_packed, tasks))
+
+    merged, solved, failed = parts[0]
+    for sketches, n_ok, n_bad in parts[1:]:
+        for name, sketch in sketches.items():
+            merged[name].merge(sketch)
+        solved += n_ok
+        failed += n_bad
+    return ProbabilisticResult(net, solved, failed, renewable_sources(net), **merged)
+
+
+def report(result, q=QUANTILES, vmin=0.95, vmax=1.05, file=None):
+    """Print voltage and branch-flow percentiles and limit-violation odds."""
+    out = lambda *a: print(*a, file=file)
+    net = result.net
+    pct = result.percentiles(q)
+    labels = ' '.join(f'{f"P{100 * x:g}":>8}' for x in q)
+    out(f'{net.title}: {result.samples} samples ({result.failed} not converged)')
+    for src in result.sources:
+        out(f'  {src.kind:<5} {src.name} at {net.bus_names[src.bus]}: {src.rating_mw:g} MW')
+    out(f"\n{'Bus':<10} {labels} {'mean':>8} {f'P(V<{vmin:g})':>10} {f'P(V>{vmax:g})':>10}")
+    low, high = result.vm.cdf(vmin), 1.0 - result.vm.cdf(vmax)
+    for b, name in enumerate(net.bus_names):
+        values = ' '.join(f'{v:8.4f}' for v in pct['vm'][:, b])
+        out(f'{name:<10} {values} {result.vm.mean[b]:8.4f} {low[b]:10.3f} {high[b]:10.3f}')
+    out(f"\n{'Branch':<24} {labels} (MVA) {'P(load>1)':>10}")
+    over = 1.0 - result.loading.cdf(1.0)
+    for k, name in enumerate(net.branch_names):
+        values = ' '.join(f'{v:8.2f}' for v in pct['flow'][:, k])
+        risk = f'{over[k]:10.3f}' if np.isfinite(net.branch_mva[k]) else f"{'-':>10}"
+        out(f'{name:<24} {values}       {risk}')
+
+
+def main(argv=None):
+    from .grids import load_case
+
+    parser = argparse.ArgumentParser(description='Monte-Carlo probabilistic load flow.')
+    parser.add_argument('grid', help='grid name or number')
+    parser.add_argument('--samples', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--load-sigma', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    result = probabilistic_load_flow(load_case(args.grid), args.samples, args.batch, args.workers,
+                                     args.seed, args.load_sigma)
+    elapsed = time.perf_counter() - t0
+    report(result)
+    print(f'\n{args.samples} samples in {elapsed:.2f} s ({args.samples / elapsed:.0f}/s)')
+
+
+if __name__ == '__main__':
+    main()
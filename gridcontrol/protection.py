@@ -0,0 +1,528 @@
+"""Overcurrent relay coordination over every fault location and type.
+
+A :class:`RelayTable` holds one inverse-time overcurrent element per
+breaker: the branch it trips, the bus it sits at (it looks into the
+branch), pickup current, time multiplier, curve and an optional
+instantaneous (50) element.  Curves follow IEC 60255 and IEEE C37.112::
+
+    t = TMS * (k / (M**alpha - 1) + c),    M = I / I_pickup  (M > 1)
+
+with ``M`` limited to :data:`MAX_MULTIPLE`.
+
+:func:`relay_currents` superposes the fault on the sequence networks of
+:mod:`gridcontrol.shortcircuit`: the Zbus columns of the faulted buses give,
+for a fault at every bus and of every type, the sequence currents in every
+relay's branch, and from them the largest phase current (or ``3 I0`` for
+ground elements).  :func:`trip_times` turns that ``(relays, faults, 4)``
+array into operating times in one vectorised expression; the coordination
+check only evaluates the curves at the (primary, backup, fault) cases.
+
+:func:`check_coordination` pairs each relay with the relays directly
+behind it (at the far end of a branch feeding its bus) and reports the
+margin ``t_backup - t_primary`` for every fault in front of the primary
+relay; margins below the coordination time interval are miscoordinations.
+:func:`grade` raises backup TMS settings until all margins meet it, as far
+as ``max_tms`` allows; :meth:`Coordination.unresolvable` lists the cases
+that cap leaves short::
+
+    relays = default_relays(net)
+    coord = check_coordination(net, grade(net, relays))
+
+Run ``python -m gridcontrol.protection grid3`` for the coordination report.
+"""
+
+import argparse
+import csv
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from .shortcircuit import (DEFAULT_SOURCE_Z, FAULT_LABELS, sequence_currents, sequence_ybus,
+                           zbus_columns, zero_sequence_admittances)
+from .ybus import branch_admittances, bus_adjacency
+
+# name -> (k, alpha, c)
+CURVES = {
+    'IEC SI': (0.14, 0.02, 0.0),
+    'IEC VI': (13.5, 1.0, 0.0),
+    'IEC EI': (80.0, 2.0, 0.0),
+    'IEC LTI': (120.0, 1.0, 0.0),
+    'IEEE MI': (0.0515, 0.02, 0.114),
+    'IEEE VI': (19.61, 2.0, 0.491),
+    'IEEE EI': (28.2, 2.0, 0.1217),
+}
+CURVE_NAMES = tuple(CURVES)
+_CURVE_TABLE = np.array(list(CURVES.values()))
+
+# Curves are flat beyond this multiple of pickup
+MAX_MULTIPLE = 20.0
+# Coordination time interval (s) and breaker opening time (s; the 83.3 ms
+# breaker clearing time of SCA_Verification.m)
+CTI = 0.3
+BREAKER_TIME = 0.0833
+# Margins this close to the CTI (s) count as met
+_TOLERANCE = 1e-9
+# Highest time multiplier grading may set
+MAX_TMS = 1.2
+
+_A = np.exp(2j * np.pi / 3)
+
+
+@dataclass
+class RelayTable:
+    """Settings of ``n`` relays as parallel arrays.
+
+    ``branch``/``bus`` are indices into the network; ``curve`` indexes
+    :data:`CURVE_NAMES`; currents are primary amperes and times seconds.
+    ``inst_pickup`` is ``nan`` where there is no instantaneous element.
+    """
+
+    names: np.ndarray
+    branch: np.ndarray
+    bus: np.ndarray
+    curve: np.ndarray
+    pickup: np.ndarray
+    tms: np.ndarray
+    inst_pickup: np.ndarray
+    inst_delay: np.ndarray
+    breaker_time: np.ndarray
+    ground: np.ndarray
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, net, records):
+        """Build from dicts with ``name``, ``branch``, ``bus``, ``pickup``, ``tms``.
+
+        ``branch`` and ``bus`` may be names or indices; optional keys are
+        ``curve`` (default ``'IEC SI'``), ``inst_pickup``, ``inst_delay``,
+        ``breaker_time`` and ``ground``.
+        """
+        branch_index = {b: i for i, b in enumerate(net.branch_names.tolist())}
+        get = lambda r, k, d: d if r.get(k) in (None, '') else r[k]
+        rows = []
+        for r in records:
+            branch = r['branch']
+            branch = branch_index[branch] if isinstance(branch, str) and not branch.isdigit() else int(branch)
+            bus = r['bus']
+            bus = net.index(bus) if isinstance(bus, str) and not bus.isdigit() else int(bus)
+            if bus not in (net.branch_from[branch], net.branch_to[branch]):
+                raise ValueError(f"relay {r['name']}: bus {net.bus_names[bus]} is not an end "
+                                 f'of branch {net.branch_names[branch]}')
+            ground = get(r, 'ground', False)
+            rows.append((r['name'], branch, bus, CURVE_NAMES.index(get(r, 'curve', 'IEC SI')),
+                         float(r['pickup']), float(r['tms']), float(get(r, 'inst_pickup', np.nan)),
+                         float(get(r, 'inst_delay', 0.0)),
+                         float(get(r, 'breaker_time', BREAKER_TIME)),
+                         str(ground).lower() in ('1', 'true', 'yes')))
+        cols = list(zip(*rows)) if rows else [()] * 10
+        dtypes = (str, np.intp, np.intp, np.intp, float, float, float, float, float, bool)
+        return cls(*(np.asarray(c, dtype=d) for c, d in zip(cols, dtypes)))
+
+    @classmethod
+    def from_csv(cls, net, path):
+        """Read settings from a CSV with the :meth:`from_records` keys as header."""
+        with open(path, newline='', encoding='utf-8') as fh:
+            return cls.from_records(net, list(csv.DictReader(fh)))
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+
+def _base_amps(net, bus):
+    return net.base_mva / (np.sqrt(3) * net.bus_kv[bus]) * 1e3
+
+
+def default_relays(net, curve='IEC SI', tms=0.1, pickup_factor=1.5, min_pickup=0.05):
+    """A phase relay at both ends of every in-service branch.
+
+    Pickup is ``pickup_factor`` times the larger of the branch rating and
+    the load-flow current, but at least ``min_pickup`` of the bus base
+    current.  All relays start at the same ``tms``; see :func:`grade`.
+    """
+    from .powerflow import solve
+
+    on = np.flatnonzero(net.branch_status != 0)
+    branch = np.concatenate((on, on))
+    bus = np.concatenate((net.branch_from[on], net.branch_to[on]))
+    sf, st = solve(net).branch_flows()
+    flow = np.concatenate((np.abs(sf[on]), np.abs(st[on])))
+    rated = np.nan_to_num(net.branch_mva[branch])
+    base = _base_amps(net, bus)
+    pickup = np.maximum(pickup_factor * np.maximum(flow, rated) / net.base_mva * base,
+                        min_pickup * base)
+    names = np.char.add(np.char.add('R_', net.branch_names[branch]),
+                        np.char.add('@', net.bus_names[bus]))
+    n = len(branch)
+    return RelayTable(names, branch, bus, np.full(n, CURVE_NAMES.index(curve)), pickup,
+                      np.full(n, float(tms)), np.full(n, np.nan), np.zeros(n),
+                      np.full(n, BREAKER_TIME), np.zeros(n, dtype=bool))
+
+
+def _largest_phase(i1, i2, i0):
+    """Largest of ``|Ia|``, ``|Ib|``, ``|Ic|`` for sequence currents ``i1, i2, i0``."""
+    m = np.abs(i1 + i2 + i0)
+    np.maximum(m, np.abs(_A * _A * i1 + _A * i2 + i0), out=m)
+    return np.maximum(m, np.abs(_A * i1 + _A * _A * i2 + i0), out=m)
+
+
+def relay_currents(net, relays, faults=None, zf=0.0, v_pre=1.0, source_z=DEFAULT_SOURCE_Z,
+                   block=16):
+    """Current (primary A) seen by each relay, ``(relays, faults, 4)``.
+
+    ``faults`` are the faulted bus indices (default: every bus); the last
+    axis follows :data:`~gridcontrol.shortcircuit.FAULT_TYPES`.  Phase
+    relays see the largest phase current, ground relays ``|3 I0|``.
+    Pre-fault load current is neglected.  Relays are processed ``block``
+    at a time to keep the temporaries in cache; the result itself is
+    ``relays * faults * 32`` bytes, so on large networks pass the faults of
+    interest.
+    """
+    faults = np.arange(net.n_bus) if faults is None else np.asarray(faults, dtype=np.intp)
+    br = relays.branch
+    at_from = relays.bus == net.branch_from[br]
+    far = np.where(at_from, net.branch_to[br], net.branch_from[br])
+
+    # Branch-end current = a * dV_near + b * dV_far in each sequence network.
+    # Zbus is symmetric, so the Zbus columns of the faulted buses hold the
+    # voltage change at every relay end per unit fault current.
+    y0 = zero_sequence_admittances(net)
+    y1 = branch_admittances(net)
+    coef = [(np.where(at_from, y[0][br], y[3][br]), np.where(at_from, y[1][br], y[2][br]))
+            for y in (y1, y0)]
+    ybus1, ybus2, ybus0 = sequence_ybus(net, source_z)
+    z1, z0 = zbus_columns(ybus1, faults), zbus_columns(ybus0, faults)
+    same = np.array_equal(ybus1.data, ybus2.data)
+    z2 = z1 if same else zbus_columns(ybus2, faults)
+    diag = np.arange(len(faults))
+    seq = sequence_currents(z1[faults, diag], z2[faults, diag], z0[faults, diag], zf, v_pre)
+
+    # With I1 the phase-a positive-sequence current of each fault type the
+    # sequence currents are I1 * (1, 0, 0) for 3ph, (1, 1, 1) for LG,
+    # (1, -1, 0) for LL and (1, c2, c0) for LLG, so |I1| factors out
+    i1 = seq[:, :, 0]
+    scale = np.abs(i1)
+    c2, c0 = seq[:, 3, 1] / i1[:, 3], seq[:, 3, 2] / i1[:, 3]
+    ground = 3 * np.abs(seq[:, :, 2])
+    amps = _base_amps(net, relays.bus)
+    out = np.empty((len(br), len(faults), 4))
+    for lo in range(0, len(br), block):
+        r = slice(lo, lo + block)
+        g1, g0 = [a[r, None] * z[relays.bus[r]] + b[r, None] * z[far[r]]
+                  for (a, b), z in zip(coef, (z1, z0))]
+        g2 = g1 if same else (coef[0][0][r, None] * z2[relays.bus[r]]
+                              + coef[0][1][r, None] * z2[far[r]])
+        o = out[r]
+        o[:, :, 0] = np.abs(g1)
+        if same:
+            # a + a^2 = -1 and a^2 - a = -j sqrt(3)
+            o[:, :, 1] = np.maximum(np.abs(2 * g1 + g0), np.abs(g0 - g1))
+            o[:, :, 2] = np.sqrt(3) * o[:, :, 0]
+        else:
+            o[:, :, 1] = _largest_phase(g1, g2, g0)
+            o[:, :, 2] = _largest_phase(g1, -g2, 0.0)
+        o[:, :, 3] = _largest_phase(g1, g2 * c2, g0 * c0)
+        o *= scale
+        gnd = relays.ground[r]
+        if gnd.any():
+            o[gnd] = np.abs(g0[gnd])[:, :, None] * ground
+        o *= amps[r, None, None]
+    return out
+
+
+def _curve_times(curve, pickup, tms, inst_pickup, inst_delay, currents):
+    k, alpha, c = np.moveaxis(_CURVE_TABLE[curve], -1, 0)
+    m = np.minimum(currents / pickup, MAX_MULTIPLE)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        t = tms * (k / (m ** alpha - 1.0) + c)
+    t = np.where(m > 1.0, t, np.inf)
+    return np.where(currents >= inst_pickup, np.minimum(t, inst_delay), t)
+
+
+def trip_times(relays, currents):
+    """Relay operating times (s) for ``currents`` (A), ``inf`` below pickup.
+
+    ``currents`` has the relays along its first axis.
+    """
+    shape = (-1,) + (1,) * (currents.ndim - 1)
+    return _curve_times(relays.curve.reshape(shape), relays.pickup.reshape(shape),
+                        relays.tms.reshape(shape), relays.inst_pickup.reshape(shape),
+                        relays.inst_delay.reshape(shape), currents)
+
+
+def _far_bus(net, relays):
+    br = relays.branch
+    return np.where(relays.bus == net.branch_from[br], net.branch_to[br], net.branch_from[br])
+
+
+def backup_pairs(net, relays):
+    """``(primary, backup)`` relay index arrays.
+
+    Relay ``B`` backs up relay ``P`` when ``B`` looks into a branch that
+    ends at ``P``'s bus and ``P`` protects a different branch.
+    """
+    far = _far_bus(net, relays)
+    order = np.argsort(relays.bus, kind='stable')
+    lo = np.searchsorted(relays.bus[order], far, 'left')
+    hi = np.searchsorted(relays.bus[order], far, 'right')
+    backup = np.repeat(np.arange(len(relays)), hi - lo)
+    primary = order[np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)] or [[]]).astype(np.intp)]
+    keep = relays.branch[primary] != relays.branch[backup]
+    return primary[keep], backup[keep]
+
+
+def forward_zone(net, relays, faults, depth=0):
+    """``(relay, fault)`` index arrays of the faults each relay is primary for.
+
+    ``fault`` indexes ``faults``.  A bus is in a relay's zone when it is at
+    most ``depth`` branches from the relay's far bus and closer to it than
+    to the relay's own bus; ``depth=0`` is the remote-end fault of the
+    protected branch.
+    """
+    far = _far_bus(net, relays)
+    position = np.full(net.n_bus, -1)
+    position[faults] = np.arange(len(faults))
+    if depth == 0:
+        relay = np.flatnonzero(position[far] >= 0)
+        return relay, position[far[relay]]
+    on = net.branch_status != 0
+    adj = bus_adjacency(net.n_bus, net.branch_from[on], net.branch_to[on])
+    ends, inverse = np.unique(np.concatenate((relays.bus, far)), return_inverse=True)
+    dist = dijkstra(adj, unweighted=True, indices=ends, limit=depth + 1)[:, faults]
+    d_near, d_far = dist[inverse[:len(relays)]], dist[inverse[len(relays):]]
+    return np.nonzero((d_far <= depth) & (d_far < d_near))
+
+
+def _cases(primary, zone, n_relays):
+    """Expand each (primary, backup) pair over the primary's zone faults."""
+    relay, fault = zone
+    order = np.argsort(relay, kind='stable')
+    fault = fault[order]
+    counts = np.bincount(relay, minlength=n_relays)
+    starts = np.cumsum(counts) - counts
+    n = counts[primary]
+    pair = np.repeat(np.arange(len(primary)), n)
+    within = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    return pair, fault[np.repeat(starts[primary], n) + within]
+
+
+def _case_times(relays, currents, relay, fault, tms=None):
+    """Operating times ``(cases, 4)`` of ``relay[i]`` for fault ``fault[i]``."""
+    tms = relays.tms if tms is None else tms
+    r = relay[:, None]
+    return _curve_times(relays.curve[r], relays.pickup[r], tms[r], relays.inst_pickup[r],
+                        relays.inst_delay[r], currents[relay, fault])
+
+
+@dataclass
+class Coordination:
+    """Result of :func:`check_coordination`.
+
+    Each coordination case is a ``(primary, backup)`` pair (index ``pair``
+    into ``primary``/``backup``) and a fault in the primary's zone (index
+    ``fault`` into ``faults``); ``margins`` is ``(cases, 4)``
+    ``t_backup - t_primary``, ``nan`` where the primary does not trip.
+    """
+
+    net: object
+    relays: RelayTable
+    faults: np.ndarray
+    currents: np.ndarray
+    primary: np.ndarray
+    backup: np.ndarray
+    pair: np.ndarray
+    fault: np.ndarray
+    margins: np.ndarray
+    cti: float
+
+    @property
+    def times(self):
+        """``(relays, faults, 4)`` relay operating times (s), computed on access."""
+        return trip_times(self.relays, self.currents)
+
+    @property
+    def fastest(self):
+        """Shortest operating time (s) of each relay over all faults and types."""
+        # Operating time never increases with current
+        return trip_times(self.relays, self.currents.max(axis=(1, 2)))
+
+    @property
+    def violations(self):
+        """``(case, type)`` index pairs with margin below the CTI."""
+        with np.errstate(invalid='ignore'):
+            return np.argwhere(self.margins < self.cti - _TOLERANCE)
+
+    def unresolvable(self, max_tms=MAX_TMS):
+        """The :attr:`violations` that :func:`grade` cannot fix.
+
+        Their backup would need a TMS above ``max_tms`` (or never trips for
+        the fault), or has an instantaneous element, which grading leaves
+        alone.
+        """
+        bad = self.violations
+        case, kind = bad.T
+        relays = self.relays
+        backup = self.backup[self.pair[case]]
+        p = self.primary[self.pair[case]]
+        fault = self.fault[case]
+        t_p = _case_times(relays, self.currents, p, fault)[np.arange(len(case)), kind]
+        unit = _curve_times(relays.curve[backup], relays.pickup[backup], 1.0, np.inf, 0.0,
+                            self.currents[backup, fault, kind])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            need = (t_p + self.cti) / unit
+        return bad[~(need <= max_tms * (1 + _TOLERANCE)) | np.isfinite(relays.inst_pickup[backup])]
+
+    @property
+    def unprotected(self):
+        """``(fault, type)`` index pairs that no relay clears."""
+        r = self.relays
+        trips = ((self.currents > r.pickup[:, None, None])
+                 | (self.currents >= r.inst_pickup[:, None, None]))
+        return np.argwhere(~trips.any(axis=0))
+
+    @property
+    def clearing_times(self):
+        """Fastest breaker clearing time (s) per fault and type."""
+        return (self.times + self.relays.breaker_time[:, None, None]).min(axis=0)
+
+
+def _margins(relays, currents, primary, backup, pair, fault):
+    tp = _case_times(relays, currents, primary[pair], fault)
+    tb = _case_times(relays, currents, backup[pair], fault)
+    with np.errstate(invalid='ignore'):
+        return np.where(np.isfinite(tp), tb - tp, np.nan)
+
+
+def check_coordination(net, relays, faults=None, cti=CTI, depth=0, currents=None, **fault_kw):
+    """Backup margins of every relay pair for the faults in the primary's zone.
+
+    ``depth`` sets the primary zones (see :func:`forward_zone`).
+    ``currents`` from an earlier :func:`relay_currents` call can be passed
+    to re-check new settings without recomputing the fault study.  The
+    curves are evaluated at the coordination cases only; the full
+    ``(relays, faults, 4)`` trip times are :attr:`Coordination.times`.
+    """
+    faults = np.arange(net.n_bus) if faults is None else np.asarray(faults, dtype=np.intp)
+    if currents is None:
+        currents = relay_currents(net, relays, faults, **fault_kw)
+    primary, backup = backup_pairs(net, relays)
+    pair, fault = _cases(primary, forward_zone(net, relays, faults, depth), len(relays))
+    return Coordination(net, relays, faults, currents, primary, backup, pair, fault,
+                        _margins(relays, currents, primary, backup, pair, fault), cti)
+
+
+def grade(net, relays, faults=None, cti=CTI, depth=0, max_tms=MAX_TMS, max_rounds=1000,
+          currents=None, **fault_kw):
+    """Raise backup TMS settings until every margin reaches ``cti``.
+
+    Each round computes, for every case, the TMS the backup needs and
+    raises each relay to its largest requirement (capped at ``max_tms``);
+    rounds repeat while settings change, since a raised relay may need its
+    own backups raised, so long feeders take as many rounds as they have
+    grading steps.  Relays with an instantaneous element are left alone.
+    Returns a new table; cases the cap leaves short are
+    :meth:`Coordination.unresolvable`.
+    """
+    faults = np.arange(net.n_bus) if faults is None else np.asarray(faults, dtype=np.intp)
+    if currents is None:
+        currents = relay_currents(net, relays, faults, **fault_kw)
+    primary, backup = backup_pairs(net, relays)
+    pair, fault = _cases(primary, forward_zone(net, relays, faults, depth), len(relays))
+    fixed = np.isfinite(relays.inst_pickup)
+    # Only the currents of the cases matter: evaluate the curves there once.
+    # The inverse-time part scales with TMS, so each round is
+    # min(tms * unit, instantaneous delay)
+    p, b = primary[pair], backup[pair]
+    unit_p, unit = (_curve_times(relays.curve[r, None], relays.pickup[r, None], 1.0, np.inf, 0.0,
+                                 currents[r, fault]) for r in (p, b))
+    inst_p, inst_b = (np.where(currents[r, fault] >= relays.inst_pickup[r, None],
+                               relays.inst_delay[r, None], np.inf) for r in (p, b))
+    p, b = p[:, None], b[:, None]
+    tms = relays.tms.copy()
+    for _ in range(max_rounds):
+        t_p = np.minimum(tms[p] * unit_p, inst_p)
+        t_b = np.minimum(tms[b] * unit, inst_b)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            short = np.isfinite(t_p) & (t_b - t_p < cti - _TOLERANCE)
+            need = np.where(short, (t_p + cti) / unit, 0.0)
+        need = np.where(np.isfinite(need), need, 0.0).max(axis=1, initial=0.0)
+        new = tms.copy()
+        np.maximum.at(new, backup[pair], np.minimum(need, max_tms))
+        new[fixed] = tms[fixed]
+        if np.array_equal(new, tms):
+            break
+        tms = new
+    return relays.replace(tms=tms)
+
+
+def report(coord, file=None, limit=20, max_tms=MAX_TMS):
+    """Print the relay settings, worst margins and unprotected faults.
+
+    Miscoordinations that grading up to ``max_tms`` cannot fix are counted
+    separately.
+    """
+    out = lambda *a: print(*a, file=file)
+    net, relays = coord.net, coord.relays
+    out(f'\n=== {net.title}: relay coordination ({len(relays)} relays, '
+        f'{len(coord.faults)} fault locations, CTI {coord.cti * 1e3:.0f} ms) ===')
+    out(f"{'Relay':<32} {'Curve':<8} {'Pickup A':>9} {'TMS':>6} {'fastest ms':>10}")
+    fastest = coord.fastest
+    for r in range(min(len(relays), limit)):
+        out(f'{relays.names[r]:<32} {CURVE_NAMES[relays.curve[r]]:<8} {relays.pickup[r]:9.1f} '
+            f'{relays.tms[r]:6.3f} {fastest[r] * 1e3:10.1f}')
+    if len(relays) > limit:
+        out(f'... {len(relays) - limit} more')
+
+    bad = coord.violations
+    out(f'\n{len(bad)} of {coord.margins.size} (pair, fault, type) cases miscoordinated, '
+        f'{len(coord.unresolvable(max_tms))} unresolvable by grading (backup TMS above '
+        f'{max_tms:g} or fixed instantaneous setting)')
+    if len(bad):
+        order = np.argsort(coord.margins[tuple(bad.T)])[:limit]
+        out(f"{'Primary':<32} {'Backup':<32} {'Fault':<8} {'Type':<8} {'margin ms':>9}")
+        for case, k in bad[order]:
+            p = coord.pair[case]
+            out(f'{relays.names[coord.primary[p]]:<32} {relays.names[coord.backup[p]]:<32} '
+                f'{net.bus_names[coord.faults[coord.fault[case]]]:<8} {FAULT_LABELS[k]:<8} '
+                f'{coord.margins[case, k] * 1e3:9.1f}')
+    missing = coord.unprotected
+    out(f'{len(missing)} fault cases not cleared by any relay')
+    for f, k in missing[:limit]:
+        out(f'  {net.bus_names[coord.faults[f]]} {FAULT_LABELS[k]}')
+
+
+def main(argv=None):
+    from .grids import load_case
+
+    parser = argparse.ArgumentParser(description='Overcurrent relay coordination check.')
+    parser.add_argument('grid', help='grid name or number')
+    parser.add_argument('--relays', help='CSV of relay settings (default: a relay at both ends '
+                                         'of every branch)')
+    parser.add_argument('--curve', default='IEC SI', choices=CURVE_NAMES)
+    parser.add_argument('--cti', type=float, default=CTI, help='coordination time interval (s)')
+    parser.add_argument('--depth', type=int, default=0,
+                        help='primary zone depth in branches beyond the remote bus')
+    parser.add_argument('--grade', action='store_true', help='grade the TMS settings first')
+    parser.add_argument('--max-tms', type=float, default=MAX_TMS, help='TMS cap for grading')
+    parser.add_argument('--limit', type=int, default=20, help='rows per report table')
+    args = parser.parse_args(argv)
+
+    net = load_case(args.grid)
+    relays = (RelayTable.from_csv(net, args.relays) if args.relays
+              else default_relays(net, curve=args.curve))
+    t0 = time.perf_counter()
+    currents = relay_currents(net, relays)
+    if args.grade:
+        relays = grade(net, relays, cti=args.cti, depth=args.depth, max_tms=args.max_tms,
+                       currents=currents)
+    coord = check_coordination(net, relays, cti=args.cti, depth=args.depth, currents=currents)
+    elapsed = time.perf_counter() - t0
+    report(coord, limit=args.limit, max_tms=args.max_tms)
+    print(f'\nchecked in {elapsed * 1e3:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
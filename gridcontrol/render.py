@@ -0,0 +1,178 @@
+"""Batched 3D single-line-diagram rendering.
+
+:func:`draw_network` draws a whole :class:`~gridcontrol.network.Network`
+with a constant number of artists: one ``Path3DCollection`` for the buses (or
+one per bus-type marker), one ``Line3DCollection`` per branch class and one
+scatter per component symbol.  Text labels are the only per-element artists
+and are culled by level of detail on large networks.
+"""
+
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+DEFAULT_STYLE = {
+    # Buses.  ``bus_color`` may be one colour or one per bus; ``bus_markers``
+    # optionally maps a bus type to ``(marker, size)``.
+    'bus_color': 'blue',
+    'bus_size': 150,
+    'bus_marker': 'o',
+    'bus_markers': None,
+    'bus_alpha': 0.8,
+    'bus_label': '{name}\n{kv:g} kV',
+    'bus_label_dz': 0.5,
+    'bus_label_kw': {'color': 'black', 'fontsize': 8, 'ha': 'center'},
+
+    'line_color': 'gray',
+    'line_width': 2,
+    'line_alpha': 0.7,
+
+    'xfmr_color': 'orange',
+    'xfmr_width': 3,
+    'xfmr_alpha': 0.8,
+    'xfmr_label_dz': 0.3,
+
+    'gen_color': 'green',
+    'gen_height': 1.0,
+    'gen_alpha': 0.7,
+    'gen_label_dx': 0.5,
+    'gen_label_dz': 0.2,
+
+    'load_color': 'red',
+    'load_drop': 1.0,
+    'load_step': 0.2,  # extra drop per earlier load on the same bus
+    'load_alpha': 0.7,
+    'load_label_dx': -0.5,
+    'load_label_dz': -0.2,
+
+    'symbol_alpha': 0.8,
+}
+
+BUS_TYPE_LABELS = np.array(['', 'Load Bus', 'Voltage Control', 'Swing Bus'])
+
+# Above this many buses, ``labels='auto'`` keeps only the most important
+# bus labels and drops component labels altogether.
+MAX_LABELS = 60
+
+
+def _add_segments(ax, segments, **kw):
+    coll = Line3DCollection(segments, **kw)
+    ax.add_collection3d(coll)
+    return coll
+
+
+def _stubs(base, top):
+    """Vertical connector segments from ``base`` points to ``top`` points."""
+    return np.stack((base, top), axis=1)
+
+
+def label_priority(net):
+    """Bus indices ordered from most to least worth labelling.
+
+    Higher-voltage buses come first, ties broken by branch degree.
+    """
+    degree = np.bincount(np.concatenate((net.branch_from, net.branch_to)),
+                         minlength=net.n_bus)
+    return np.lexsort((-degree, -net.bus_kv))
+
+
+def draw_network(ax, net, style=None, labels='auto', max_labels=MAX_LABELS):
+    """Draw ``net`` on a 3D axes and return the created artists.
+
+    ``labels`` is ``True`` (label everything), ``False`` (no text) or
+    ``'auto'`` (everything on small networks, otherwise the ``max_labels``
+    highest-priority buses only).  The returned dict maps ``'buses'``,
+    ``'lines'``, ``'transformers'``, ``'transformer_points'``,
+    ``'generators'``, ``'generator_points'``, ``'loads'``, ``'load_points'``
+    and ``'labels'`` to their artists (``None`` when the class is empty).
+    ``'buses'`` is a list of scatters whose bus indices are given by the
+    matching ``'bus_index'`` arrays, and ``'bus_labels'`` maps bus indices to
+    their label texts; line and transformer segments follow branch order
+    within ``net.lines`` and ``net.transformers``.
+    """
+    s = dict(DEFAULT_STYLE, **(style or {}))
+    pos = net.bus_xyz
+    artists = dict.fromkeys(('lines', 'transformers', 'transformer_points', 'generators',
+                             'generator_points', 'loads', 'load_points'))
+
+    # Buses: one collection, or one per marker when markers depend on type
+    bus_color = s['bus_color']
+    per_bus_color = not isinstance(bus_color, str) and len(bus_color) == net.n_bus
+    if s['bus_markers']:
+        groups = [(net.bus_type == t, marker, size) for t, (marker, size) in s['bus_markers'].items()]
+    else:
+        groups = [(slice(None), s['bus_marker'], s['bus_size'])]
+    artists['buses'], artists['bus_index'] = [], []
+    for sel, marker, size in groups:
+        xyz = pos[sel]
+        if not len(xyz):
+            continue
+        artists['bus_index'].append(np.arange(net.n_bus)[sel])
+        color = np.asarray(bus_color, dtype=object)[sel].tolist() if per_bus_color else bus_color
+        artists['buses'].append(ax.scatter(xyz[:, 0], xyz[:, 1], xyz[:, 2], c=color, s=size,
+                                           marker=marker, alpha=s['bus_alpha'], edgecolor='black'))
+
+    # Branches: one Line3DCollection per class
+    lines = net.lines
+    if lines.any():
+        artists['lines'] = _add_segments(
+            ax, net.branch_segments(lines), colors=s['line_color'],
+            linewidths=s['line_width'], alpha=s['line_alpha'])
+    xfmr = net.transformers
+    if xfmr.any():
+        seg = net.branch_segments(xfmr)
+        artists['transformers'] = _add_segments(
+            ax, seg, colors=s['xfmr_color'], linewidths=s['xfmr_width'], alpha=s['xfmr_alpha'])
+        mid = seg.mean(axis=1)
+        artists['transformer_points'] = ax.scatter(mid[:, 0], mid[:, 1], mid[:, 2], c=s['xfmr_color'],
+                                                   marker='s', s=100)
+
+    # Generator and load connectors
+    gen_base = pos[net.gen_bus]
+    gen_top = gen_base + [0.0, 0.0, s['gen_height']]
+    if len(gen_base):
+        artists['generators'] = _add_segments(
+            ax, _stubs(gen_base, gen_top), colors=s['gen_color'], linewidths=2, alpha=s['gen_alpha'])
+        artists['generator_points'] = ax.scatter(gen_top[:, 0], gen_top[:, 1], gen_top[:, 2],
+                                                 c=s['gen_color'], marker='^', s=120,
+                                                 alpha=s['symbol_alpha'])
+    load_base = pos[net.load_bus]
+    load_top = load_base.copy()
+    order = np.argsort(net.load_bus, kind='stable')
+    first = np.searchsorted(net.load_bus[order], net.load_bus[order])
+    rank = np.empty(len(order))
+    rank[order] = np.arange(len(order)) - first  # stagger only loads sharing a bus
+    load_top[:, 2] -= s['load_drop'] + s['load_step'] * rank
+    if len(load_base):
+        artists['loads'] = _add_segments(
+            ax, _stubs(load_base, load_top), colors=s['load_color'], linewidths=2, alpha=s['load_alpha'])
+        artists['load_points'] = ax.scatter(load_top[:, 0], load_top[:, 1], load_top[:, 2],
+                                            c=s['load_color'], marker='v', s=100,
+                                            alpha=s['symbol_alpha'])
+
+    # Labels (level-of-detail culled)
+    texts = []
+    artists['bus_labels'] = {}
+    if labels:
+        small = labels is True or net.n_bus <= max_labels
+        shown = np.arange(net.n_bus) if small else label_priority(net)[:max_labels]
+        type_names = BUS_TYPE_LABELS[net.bus_type]
+        for b in shown:
+            x, y, z = pos[b]
+            texts.append(ax.text(x, y, z + s['bus_label_dz'],
+                                 s['bus_label'].format(name=net.bus_names[b], kv=net.bus_kv[b],
+                                                       type=type_names[b]),
+                                 **s['bus_label_kw']))
+            artists['bus_labels'][int(b)] = texts[-1]
+        if small:
+            if xfmr.any():
+                for name, (x, y, z) in zip(net.branch_names[xfmr], mid):
+                    texts.append(ax.text(x, y, z + s['xfmr_label_dz'], name, color=s['xfmr_color'],
+                                         fontsize=7, ha='center'))
+            for name, (x, y, z) in zip(net.gen_names, gen_top):
+                texts.append(ax.text(x + s['gen_label_dx'], y, z + s['gen_label_dz'], name,
+                                     color=s['gen_color'], fontsize=8))
+            for name, (x, y, z) in zip(net.load_names, load_top):
+                texts.append(ax.text(x + s['load_label_dx'], y, z + s['load_label_dz'], name,
+                                     color=s['load_color'], fontsize=7))
+    artists['labels'] = texts
+    return artists
@@ -0,0 +1,185 @@
+"""System summaries derived from the network arrays.
+
+:func:`summarize` computes the aggregates the SLD scripts used to hardcode
+(generation, load and transformer capacity, generation/load ratio, voltage
+range) plus per-voltage-level groupings, using ``np.unique`` and
+``np.bincount`` group-bys instead of loops over components.  Capacities
+given as ``nan`` (e.g. a swing generator without a rating) are left out of
+the sums.
+
+:func:`write_reports` formats many networks as text, JSON and CSV in one
+pass::
+
+    write_reports([load_grid(g) for g in GRIDS], 'reports')
+
+Run ``python -m gridcontrol.report`` to print the summaries of the study
+grids, or ``--out DIR`` to write the three files.
+"""
+
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+SYSTEM_FIELDS = ('grid', 'title', 'buses', 'generators', 'loads', 'lines', 'transformers',
+                 'gen_mw', 'load_mw', 'load_mvar', 'load_mva', 'gen_load_ratio',
+                 'transformer_mva', 'kv_min', 'kv_max', 'levels')
+LEVEL_FIELDS = ('grid', 'kv', 'kv_min', 'kv_max', 'buses', 'generators', 'gen_mw', 'loads',
+                'load_mw', 'load_mva', 'bus_names')
+
+
+def _group_sum(groups, weights, n):
+    """Per-group sums of ``weights`` (``nan`` entries count as 0)."""
+    return np.bincount(groups, weights=np.nan_to_num(weights), minlength=n)
+
+
+def summarize(net):
+    """Aggregate figures of ``net`` as a JSON-ready dict.
+
+    ``system`` holds the totals (see :data:`SYSTEM_FIELDS`); ``levels`` one
+    record per nominal voltage level (see :data:`LEVEL_FIELDS` and
+    :meth:`Network.voltage_levels`), highest first, with the range of its
+    bus voltages; ``gen_load_ratio`` divides by the active demand, taking a
+    load's MVA rating where no MW figure is given;
+    ``transformers`` the rating and end voltages of each transformer;
+    ``loads_by_bus`` the MW/Mvar/MVA connected at each load bus.
+    """
+    levels, level_of_bus = net.voltage_levels()
+    n_level = len(levels)
+    gen_level = level_of_bus[net.gen_bus]
+    load_level = level_of_bus[net.load_bus]
+
+    gen_mw = float(np.nansum(net.gen_mw))
+    load_mva = float(np.nansum(net.load_mva))
+    demand = float(np.nansum(np.where(np.isnan(net.load_mw), net.load_mva, net.load_mw)))
+    xfmr = np.flatnonzero(net.transformers)
+    system = dict(
+        grid=net.name, title=net.title, buses=net.n_bus, generators=len(net.gen_bus),
+        loads=len(net.load_bus), lines=int(np.count_nonzero(net.lines)), transformers=len(xfmr),
+        gen_mw=gen_mw, load_mw=float(np.nansum(net.load_mw)),
+        load_mvar=float(np.nansum(net.load_mvar)), load_mva=load_mva,
+        gen_load_ratio=gen_mw / demand if demand else np.nan,
+        transformer_mva=float(np.nansum(net.branch_mva[xfmr])),
+        kv_min=float(np.nanmin(net.bus_kv)) if n_level else np.nan,
+        kv_max=float(np.nanmax(net.bus_kv)) if n_level else np.nan,
+        levels=n_level)
+
+    bus_count = np.bincount(level_of_bus, minlength=n_level)
+    gen_count = np.bincount(gen_level, minlength=n_level)
+    load_count = np.bincount(load_level, minlength=n_level)
+    level_gen = _group_sum(gen_level, net.gen_mw, n_level)
+    level_mw = _group_sum(load_level, net.load_mw, n_level)
+    level_mva = _group_sum(load_level, net.load_mva, n_level)
+    kv = np.nan_to_num(net.bus_kv, nan=np.inf)
+    kv_lo = np.full(n_level, np.inf)
+    kv_hi = np.full(n_level, -np.inf)
+    np.minimum.at(kv_lo, level_of_bus, kv)
+    np.maximum.at(kv_hi, level_of_bus, np.where(np.isinf(kv), -np.inf, kv))
+    order = np.argsort(level_of_bus, kind='stable')
+    names_by_level = np.split(net.bus_names[order], np.cumsum(bus_count)[:-1])
+    level_rows = [
+        dict(grid=net.name, kv=float(levels[k]), kv_min=float(kv_lo[k]), kv_max=float(kv_hi[k]),
+             buses=int(bus_count[k]),
+             generators=int(gen_count[k]), gen_mw=float(level_gen[k]), loads=int(load_count[k]),
+             load_mw=float(level_mw[k]), load_mva=float(level_mva[k]),
+             bus_names=names_by_level[k].tolist())
+        for k in range(n_level - 1, -1, -1)]
+
+    f, t = net.branch_from[xfmr], net.branch_to[xfmr]
+    transformers = [dict(name=str(name), mva=float(mva), from_kv=float(kf), to_kv=float(kt))
+                    for name, mva, kf, kt in zip(net.branch_names[xfmr], net.branch_mva[xfmr],
+                                                 net.bus_kv[f], net.bus_kv[t])]
+
+    load_buses, inverse = np.unique(net.load_bus, return_inverse=True)
+    n_lb = len(load_buses)
+    loads_by_bus = [
+        dict(bus=str(net.bus_names[b]), kv=float(net.bus_kv[b]), mw=float(mw), mvar=float(mvar),
+             mva=float(mva))
+        for b, mw, mvar, mva in zip(load_buses, _group_sum(inverse, net.load_mw, n_lb),
+                                    _group_sum(inverse, net.load_mvar, n_lb),
+                                    _group_sum(inverse, net.load_mva, n_lb))]
+    return dict(system=system, levels=level_rows, transformers=transformers,
+                loads_by_bus=loads_by_bus)
+
+
+def format_text(summary):
+    """The summary as the text block printed by the SLD scripts."""
+    s = summary['system']
+    lines = [
+        f"{s['title']} ({s['grid']})",
+        f"├── Buses: {s['buses']}, Generators: {s['generators']}, Loads: {s['loads']}",
+        f"├── Lines: {s['lines']}, Transformers: {s['transformers']}",
+        f"├── Generation Capacity: {s['gen_mw']:g} MW",
+        f"├── Load: {s['load_mw']:g} MW, {s['load_mvar']:g} Mvar ({s['load_mva']:.1f} MVA)",
+        f"├── Generation-Load Ratio: {s['gen_load_ratio']:.2f}",
+        f"├── Transformer Capacity: {s['transformer_mva']:g} MVA",
+        f"└── Voltage Range: {s['kv_min']:g} kV to {s['kv_max']:g} kV ({s['levels']} levels)",
+        '',
+        'Level      Buses  Gen MW   Load MW  Load MVA  Buses',
+    ]
+    for row in summary['levels']:
+        lines.append(f"{row['kv']:7g} kV  {row['buses']:5d}  {row['gen_mw']:7.1f}  {row['load_mw']:7.1f}  "
+                     f"{row['load_mva']:8.1f}  {', '.join(row['bus_names'])}")
+    return '\n'.join(lines)
+
+
+def json_safe(obj):
+    """``obj`` with non-finite floats replaced by ``None`` (JSON ``null``)."""
+    if isinstance(obj, dict):
+        return {k: json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [json_safe(v) for v in obj]
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def write_reports(nets, directory, basename='summary'):
+    """Write ``<basename>.txt``, ``.json``, ``_systems.csv`` and ``_levels.csv``.
+
+    All four files are written in a single pass over ``nets`` (an iterable
+    of networks); returns the list of summaries.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = lambda suffix: os.path.join(directory, basename + suffix)
+    summaries = []
+    with open(path('.txt'), 'w', encoding='utf-8') as txt, \
+            open(path('_systems.csv'), 'w', newline='') as fs, \
+            open(path('_levels.csv'), 'w', newline='') as fl:
+        systems = csv.DictWriter(fs, SYSTEM_FIELDS)
+        levels = csv.DictWriter(fl, LEVEL_FIELDS)
+        systems.writeheader()
+        levels.writeheader()
+        for net in nets:
+            summary = summarize(net)
+            summaries.append(summary)
+            txt.write(format_text(summary) + '\n\n')
+            systems.writerow(summary['system'])
+            levels.writerows(dict(row, bus_names=' '.join(row['bus_names']))
+                             for row in summary['levels'])
+    with open(path('.json'), 'w') as fh:
+        json.dump(json_safe(summaries), fh, indent=1)
+    return summaries
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_grid
+
+    parser = argparse.ArgumentParser(description='System summaries of the study grids.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--out', help='write text/JSON/CSV reports to this directory')
+    args = parser.parse_args(argv)
+
+    nets = [load_grid(g) for g in args.grids]
+    if args.out:
+        write_reports(nets, args.out)
+        print(f'wrote {len(nets)} summaries to {args.out}')
+        return
+    for net in nets:
+        print(format_text(summarize(net)) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""DC sensitivity factors: PTDF and LODF, with a per-topology cache.
+
+All factors derive from the DC load-flow matrices of
+:class:`~gridcontrol.powerflow.DCFactors`, so a factorization computed for a
+DC solve is reused here.
+
+``PTDF[l, b]`` is the change of the flow on branch ``l`` per unit injected at
+bus ``b`` and withdrawn at the slack.  ``LODF[l, k]`` is the change of the flow
+on branch ``l`` per unit of pre-outage flow on branch ``k`` when ``k`` trips;
+columns of outages that island the network are ``nan``.
+
+Factors are built a block of columns at a time.  ``dtype=np.float32`` halves
+their size and ``threshold > 0`` drops entries below it and returns a
+``scipy.sparse`` CSC matrix, so the dense matrix is never held in memory.
+
+:func:`sensitivity_factors` caches both matrices per
+:meth:`Network.topology_hash`, so what-if queries are matrix-vector
+products and a changed branch automatically gets fresh factors::
+
+    sens = sensitivity_factors(net, dtype=np.float32)
+    dflow = sens.delta_flows({'Bus_5': 10.0})      # MW on every branch
+    dflow[sens.branch('Line7')]
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+from .powerflow import DCFactors
+
+CACHE_SIZE = 8
+
+_cache = OrderedDict()
+
+
+def _factors(net, factors):
+    if factors is None:
+        return DCFactors(net)
+    factors.check(net)
+    return factors
+
+
+def _solve_full(factors, rhs):
+    """``inv(Bbus)`` applied to bus-indexed ``rhs``, slack angles fixed at 0."""
+    x = np.zeros_like(rhs, dtype=np.float64)
+    x[factors.pvpq] = factors.lu.solve(np.ascontiguousarray(rhs[factors.pvpq]))
+    return x
+
+
+def _compact(columns, n_cols, block, dtype, threshold):
+    """Assemble column blocks from ``columns(start, stop)`` into one matrix.
+
+    Returns an ndarray, or a CSC matrix with entries ``|v| < threshold``
+    dropped when ``threshold > 0``.
+    """
+    parts = []
+    for start in range(0, n_cols, block):
+        part = columns(start, min(n_cols, start + block)).astype(dtype, copy=False)
+        if threshold > 0:
+            part[np.abs(part) < threshold] = 0
+            part = sp.csc_matrix(part)
+        parts.append(part)
+    if threshold > 0:
+        return sp.hstack(parts, format='csc') if parts else sp.csc_matrix((0, 0), dtype=dtype)
+    return np.hstack(parts) if parts else np.zeros((0, 0), dtype=dtype)
+
+
+def _transfer_block(net, factors, branches):
+    k = len(branches)
+    cols = np.arange(k)
+    rhs = np.zeros((net.n_bus, k))
+    rhs[net.branch_from[branches], cols] += 1.0
+    rhs[net.branch_to[branches], cols] -= 1.0
+    return factors.bf @ _solve_full(factors, rhs)
+
+
+def ptdf(net, buses=None, factors=None, dtype=np.float64, threshold=0.0, block=512):
+    """Bus-injection PTDF, ``(n_branch, len(buses))`` (all buses by default)."""
+    factors = _factors(net, factors)
+    buses = np.arange(net.n_bus) if buses is None else np.asarray(buses)
+
+    def columns(start, stop):
+        rhs = np.zeros((net.n_bus, stop - start))
+        rhs[buses[start:stop], np.arange(stop - start)] = 1.0
+        return factors.bf @ _solve_full(factors, rhs)
+
+    return _compact(columns, len(buses), block, dtype, threshold)
+
+
+def transfer_ptdf(net, branches=None, factors=None, dtype=np.float64, threshold=0.0, block=512):
+    """PTDF of a unit transfer from ``branch_from[k]`` to ``branch_to[k]``.
+
+    Returns ``(n_branch, len(branches))``; column ``j`` is the flow response of
+    every branch to the transfer across the terminals of ``branches[j]``.
+    """
+    factors = _factors(net, factors)
+    branches = np.arange(net.n_branch) if branches is None else np.asarray(branches)
+    return _compact(lambda a, b: _transfer_block(net, factors, branches[a:b]),
+                    len(branches), block, dtype, threshold)
+
+
+def lodf(net, branches=None, factors=None, dtype=np.float64, threshold=0.0, block=512, tol=1e-8):
+    """Line-outage distribution factors for outages of ``branches``.
+
+    Returns ``(n_branch, len(branches))`` with ``-1`` on the outaged branch
+    itself; outages with ``1 - PTDF_kk < tol`` island the network and get a
+    ``nan`` column.
+    """
+    factors = _factors(net, factors)
+    branches = np.arange(net.n_branch) if branches is None else np.asarray(branches)
+
+    def columns(start, stop):
+        ks = branches[start:stop]
+        cols = np.arange(len(ks))
+        tp = _transfer_block(net, factors, ks)
+        denom = 1.0 - tp[ks, cols]
+        islanding = np.abs(denom) < tol
+        out = tp / np.where(islanding, 1.0, denom)
+        out[ks, cols] = -1.0
+        out[:, islanding] = np.nan
+        return out
+
+    return _compact(columns, len(branches), block, dtype, threshold)
+
+
+@dataclass
+class SensitivityFactors:
+    """PTDF/LODF of one topology plus name lookups for queries."""
+
+    key: str
+    base_mva: float
+    bus_names: np.ndarray
+    branch_names: np.ndarray
+    ptdf: object
+    lodf: object = None
+
+    @property
+    def nbytes(self):
+        """Memory held by the factor matrices."""
+        total = 0
+        for m in (self.ptdf, self.lodf):
+            if m is None:
+                continue
+            total += m.nbytes if isinstance(m, np.ndarray) else (
+                m.data.nbytes + m.indices.nbytes + m.indptr.nbytes)
+        return total
+
+    def bus(self, b):
+        return int(np.flatnonzero(self.bus_names == b)[0]) if isinstance(b, str) else int(b)
+
+    def branch(self, k):
+        return int(np.flatnonzero(self.branch_names == k)[0]) if isinstance(k, str) else int(k)
+
+    def delta_flows(self, injections):
+        """Branch flow changes (MW) for bus injection changes (MW).
+
+        ``injections`` is a full per-bus vector or a ``{bus: MW}`` mapping
+        (names or indices); the slack bus absorbs the balance.
+        """
+        if isinstance(injections, dict):
+            # Only the touched PTDF columns are read
+            buses = np.array([self.bus(b) for b in injections], dtype=np.intp)
+            cols, dp = self.ptdf[:, buses], np.fromiter(injections.values(), np.float64)
+        else:
+            cols, dp = self.ptdf, np.asarray(injections, dtype=np.float64)
+        return np.asarray(cols @ dp.astype(cols.dtype), dtype=np.float64).ravel()
+
+    def transfer(self, source, sink, mw):
+        """Branch flow changes (MW) for ``mw`` moved from ``source`` to ``sink``."""
+        if self.bus(source) == self.bus(sink):
+            return np.zeros(len(self.branch_names))
+        return self.delta_flows({source: mw, sink: -mw})
+
+    def outage_flows(self, flows, outages):
+        """Post-outage active flows (MW) given pre-outage ``flows``.
+
+        Several simultaneous ``outages`` are combined exactly, not summed.
+        """
+        if self.lodf is None:
+            raise ValueError('factors were built without LODF (with_lodf=False)')
+        flows = np.asarray(flows, dtype=np.float64)
+        ks = np.atleast_1d([self.branch(k) for k in np.atleast_1d(outages)])
+        cols = self.lodf[:, ks]
+        cols = np.asarray(cols.toarray() if sp.issparse(cols) else cols, dtype=np.float64)
+        if np.isnan(cols).any():
+            raise ValueError('outage islands the network')
+        shift = np.linalg.solve(-cols[ks], flows[ks])
+        post = flows + cols @ shift
+        post[ks] = 0.0
+        return post
+
+
+def sensitivity_factors(net, dtype=np.float64, threshold=0.0, with_lodf=True, cache=True):
+    """PTDF (and LODF) of ``net``, cached per topology hash and storage options."""
+    key = net.topology_hash()
+    cache_key = (key, np.dtype(dtype).str, float(threshold), bool(with_lodf))
+    if cache and cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+
+    factors = DCFactors(net)
+    sens = SensitivityFactors(
+        key, net.base_mva, net.bus_names.copy(), net.branch_names.copy(),
+        ptdf(net, factors=factors, dtype=dtype, threshold=threshold),
+        lodf(net, factors=factors, dtype=dtype, threshold=threshold) if with_lodf else None)
+    if cache:
+        _cache[cache_key] = sens
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return sens
+
+
+def clear_cache():
+    """Drop all cached sensitivity factors."""
+    _cache.clear()
@@ -0,0 +1,212 @@
+"""Incremental switching: in-place Ybus patches and low-rank re-solves.
+
+A breaker operation or tap move changes one branch, i.e. a 2x2 block of the
+Ybus.  :class:`IncrementalYbus` applies such changes to the network arrays
+and patches the stored Ybus values in place (the sparsity pattern, and with
+it any :class:`~gridcontrol.powerflow.JacobianStructure`, stays valid).
+:class:`WoodburySolver` keeps an existing sparse factorization usable after
+such changes by applying the Sherman-Morrison-Woodbury identity over the
+touched buses, refactorizing only once the correction grows too large.
+
+Example: open a line and re-run the DC flow without refactorizing::
+
+    sw = IncrementalYbus(net)
+    dc = solve(net, 'dc')
+    change = sw.open('Line6')
+    dc.factors.apply(change)
+    dc = solve(net, 'dc', factors=dc.factors)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .ybus import branch_admittances, csr_positions, dc_susceptance, make_ybus
+
+
+@dataclass
+class BranchChange:
+    """Effect of one branch modification on the bus matrices."""
+
+    branch: int
+    buses: np.ndarray       # (from, to) bus indices
+    delta: np.ndarray       # 2x2 complex change of the Ybus block at ``buses``
+    dc_delta: float         # change of the DC susceptance ``1 / (x * tap)``
+    pattern_changed: bool = False
+
+    @property
+    def dc_block(self):
+        """2x2 change of the DC ``Bbus`` block at ``buses``."""
+        return self.dc_delta * np.array([[1.0, -1.0], [-1.0, 1.0]])
+
+
+class IncrementalYbus:
+    """A network's Ybus kept current under branch switching and retuning."""
+
+    _FIELDS = {'r': 'branch_r', 'x': 'branch_x', 'b': 'branch_b', 'tap': 'branch_tap',
+               'status': 'branch_status'}
+
+    def __init__(self, net, ybus=None):
+        self.net = net
+        self.ybus = make_ybus(net) if ybus is None else ybus
+        self._reindex()
+
+    def _reindex(self):
+        net = self.net
+        f, t = net.branch_from, net.branch_to
+        self._pos = csr_positions(self.ybus, np.column_stack((f, f, t, t)),
+                                  np.column_stack((f, t, f, t)))
+        self._y = np.column_stack(branch_admittances(net))
+
+    def branch(self, k):
+        """Branch index of ``k`` (an index or a branch name)."""
+        if isinstance(k, str):
+            hits = np.flatnonzero(self.net.branch_names == k)
+            if not len(hits):
+                raise KeyError(f'{self.net.name}: no branch named {k!r}')
+            return int(hits[0])
+        return int(k)
+
+    def update(self, k, **changes):
+        """Set ``r``, ``x``, ``b``, ``tap`` and/or ``status`` of branch ``k``.
+
+        Returns the :class:`BranchChange` for propagating to factorizations.
+        """
+        k = self.branch(k)
+        net = self.net
+        unknown = set(changes) - set(self._FIELDS)
+        if unknown:
+            raise TypeError(f'unknown branch fields: {", ".join(sorted(unknown))}')
+        dc_old = dc_susceptance(net, k)
+        for name, value in changes.items():
+            getattr(net, self._FIELDS[name])[k] = value
+        new = np.array([y for y in branch_admittances(net, k)])
+        delta = new - self._y[k]
+        self._y[k] = new
+        self.ybus.data[self._pos[k]] += delta
+        return BranchChange(k, np.array([net.branch_from[k], net.branch_to[k]]),
+                            delta.reshape(2, 2), dc_susceptance(net, k) - dc_old)
+
+    def open(self, k):
+        """Take branch ``k`` out of service."""
+        return self.update(k, status=0)
+
+    def close(self, k):
+        """Return branch ``k`` to service."""
+        return self.update(k, status=1)
+
+    def set_tap(self, k, tap):
+        """Move the off-nominal tap of branch ``k``."""
+        return self.update(k, tap=tap)
+
+    def add_branch(self, f, t, **kw):
+        """Add a branch (see :meth:`Network.add_branch`) and patch the Ybus.
+
+        If the two buses were not yet connected the Ybus gains new nonzeros:
+        it is rebuilt and the change is flagged ``pattern_changed``.
+        """
+        net = self.net
+        k = net.add_branch(f, t, **kw)
+        y = np.array([v for v in branch_admittances(net, k)])
+        f, t = net.branch_from[k], net.branch_to[k]
+        pos = csr_positions(self.ybus, [f, f, t, t], [f, t, f, t])
+        change = BranchChange(k, np.array([f, t]), y.reshape(2, 2), dc_susceptance(net, k))
+        if (pos < 0).any():
+            self.ybus = make_ybus(net)
+            change.pattern_changed = True
+            self._reindex()
+        else:
+            self.ybus.data[pos] += y
+            self._pos = np.vstack((self._pos, pos))
+            self._y = np.vstack((self._y, y))
+        return change
+
+
+class WoodburySolver:
+    """Solve ``(A + sum of updates) x = b`` reusing the factorization of ``A``.
+
+    Updates are dense blocks on small bus sets.  With ``E`` selecting the
+    union of touched rows and ``C`` the accumulated block,
+    ``inv(A + E C E') = inv(A) - W C inv(I + E' W C) E' inv(A)`` with
+    ``W = inv(A) E``, so each update costs one solve per newly touched row
+    and each solve one sparse back-substitution plus a rank-``k`` correction.
+    Once more than ``max_rank`` rows are touched, the matrix is refactorized.
+    """
+
+    def __init__(self, matrix, max_rank=64):
+        self.matrix = sp.csc_matrix(matrix)
+        self.max_rank = max_rank
+        self.refactorizations = 0
+        self._factor()
+
+    def _factor(self):
+        self.lu = splu(self.matrix)
+        self.n = self.matrix.shape[0]
+        self._dtype = self.matrix.dtype
+        self._slot = {}
+        self._idx = np.zeros(0, dtype=np.intp)
+        self._C = np.zeros((0, 0), dtype=self._dtype)
+        self._W = np.zeros((self.n, 0), dtype=self._dtype)
+        self._H = None
+
+    @property
+    def rank(self):
+        """Number of rows carried by the low-rank correction."""
+        return len(self._idx)
+
+    def update(self, idx, delta):
+        """Add the dense block ``delta`` at rows/columns ``idx`` of the matrix."""
+        idx = np.asarray(idx, dtype=np.intp)
+        delta = np.asarray(delta)
+        if np.result_type(delta, self._dtype) != self._dtype:
+            raise TypeError(f'{delta.dtype} update on a {self._dtype} matrix')
+        new = [i for i in dict.fromkeys(idx.tolist()) if i not in self._slot]
+        if self.rank + len(new) > self.max_rank:
+            self._refactor()
+            self.matrix = self.matrix + sp.csc_matrix(
+                (delta.ravel(), (np.repeat(idx, len(idx)), np.tile(idx, len(idx)))),
+                shape=self.matrix.shape)
+            self.refactorizations += 1
+            self._factor()
+            return
+        if new:
+            for i in new:
+                self._slot[i] = len(self._slot)
+            e = np.zeros((self.n, len(new)), dtype=self._dtype)
+            e[new, np.arange(len(new))] = 1.0
+            self._W = np.hstack((self._W, self.lu.solve(e)))
+            self._idx = np.concatenate((self._idx, new))
+            C = np.zeros((self.rank, self.rank), dtype=self._dtype)
+            C[:self._C.shape[0], :self._C.shape[1]] = self._C
+            self._C = C
+        slots = np.array([self._slot[i] for i in idx.tolist()])
+        self._C[np.ix_(slots, slots)] += delta
+        self._H = la.lu_factor(np.eye(self.rank) + self._W[self._idx] @ self._C)
+
+    def _refactor(self):
+        """Fold the pending correction into ``matrix``."""
+        if self.rank:
+            i, j = np.meshgrid(self._idx, self._idx, indexing='ij')
+            self.matrix = self.matrix + sp.csc_matrix(
+                (self._C.ravel(), (i.ravel(), j.ravel())), shape=self.matrix.shape)
+
+    def solve(self, b):
+        """Solve the updated system for ``b`` (vector or ``(n, k)`` array)."""
+        x = self.lu.solve(b)
+        if not self.rank:
+            return x
+        return x - self._W @ (self._C @ la.lu_solve(self._H, x[self._idx]))
+
+    def inverse_diagonal(self, base):
+        """Diagonal of the updated inverse given ``base = diag(inv(A))``.
+
+        Valid for (complex-)symmetric ``A``, e.g. a Ybus without phase
+        shifters, where ``E' inv(A) = W'``.
+        """
+        if not self.rank:
+            return base
+        M = self._C @ la.lu_solve(self._H, np.eye(self.rank))
+        return base - np.einsum('ik,kl,il->i', self._W, M, self._W)
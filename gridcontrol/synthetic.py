@@ -0,0 +1,106 @@
+"""Synthetic networks for benchmarks and scaling studies.
+
+The five study grids have nine buses each; these generators produce
+connected, multi-voltage networks of arbitrary size with the same structure
+(lines within a voltage level, transformers between levels, generators and
+loads hanging off buses).
+"""
+
+import numpy as np
+
+from .network import LINE, PQ, PV, SLACK, TRANSFORMER, Network
+
+# Voltage levels in kV, highest first; the z coordinate follows the level
+# like the grid5 SLD (highest voltage on top).
+LEVELS_KV = (132.0, 33.0, 11.0)
+
+
+def synthetic_network(n_bus, seed=0, levels_kv=LEVELS_KV, mesh=0.3, gen_fraction=0.05,
+                      load_fraction=0.6):
+    """Return a connected lattice-like :class:`Network` with ``n_bus`` buses.
+
+    Buses sit on a jittered ``rows x cols`` lattice split into horizontal
+    voltage bands.  Every row is chained left to right and the first column
+    top to bottom (a spanning tree); a fraction ``mesh`` of the remaining
+    vertical lattice edges is added on top.  Edges between bands become
+    transformers.
+
+    The network also carries load-flow data so it can be solved directly:
+    generator buses are PV (bus 0 is the slack), loads are PQ injections and
+    branches get short-line / transformer impedances on the 100 MVA base and
+    thermal ratings (MVA).
+    """
+    rng = np.random.default_rng(seed)
+    cols = max(1, int(np.ceil(np.sqrt(n_bus))))
+    idx = np.arange(n_bus)
+    row, col = np.divmod(idx, cols)
+    rows = row[-1] + 1
+
+    band = np.minimum(row * len(levels_kv) // max(rows, 1), len(levels_kv) - 1)
+    kv = np.asarray(levels_kv, dtype=np.float64)[band]
+    xyz = np.column_stack((
+        col * 3.0 + rng.uniform(-0.8, 0.8, n_bus),
+        row * -3.0 + rng.uniform(-0.8, 0.8, n_bus),
+        (len(levels_kv) - 1 - band).astype(np.float64),
+    ))
+
+    horiz = idx[(col < cols - 1) & (idx + 1 < n_bus)]
+    first_col = idx[(col == 0) & (idx + cols < n_bus)]
+    vert = idx[(col > 0) & (idx + cols < n_bus)]
+    vert = vert[rng.random(len(vert)) < mesh]
+    f = np.concatenate((horiz, first_col, vert))
+    t = np.concatenate((horiz + 1, first_col + cols, vert + cols))
+    kind = np.where(band[f] == band[t], LINE, TRANSFORMER)
+
+    m = len(f)
+    is_line = kind == LINE
+    branch_x = np.where(is_line, rng.uniform(0.005, 0.015, m), rng.uniform(0.04, 0.08, m))
+    branch_r = branch_x * np.where(is_line, rng.uniform(0.1, 0.3, m), 0.05)
+    branch_b = np.where(is_line, rng.uniform(0.0, 0.01, m), 0.0)
+
+    gen_bus = np.union1d([0], rng.choice(n_bus, max(1, int(gen_fraction * n_bus)), replace=False))
+    load_bus = np.sort(rng.choice(n_bus, int(load_fraction * n_bus), replace=False))
+    load_mw = rng.uniform(0.5, 5.0, len(load_bus)).round(2)
+    load_mvar = (load_mw * rng.uniform(0.2, 0.6, len(load_bus))).round(2)
+    gen_mw = np.full(len(gen_bus), load_mw.sum() / len(gen_bus)).round(2)
+
+    bus_type = np.full(n_bus, PQ)
+    bus_type[gen_bus] = PV
+    bus_type[0] = SLACK
+    vm = np.ones(n_bus)
+    vm[gen_bus] = 1.02
+    pg = np.zeros(n_bus)
+    pg[gen_bus] = gen_mw
+    pd = np.zeros(n_bus)
+    pd[load_bus] = load_mw
+    qd = np.zeros(n_bus)
+    qd[load_bus] = load_mvar
+    branch_mva = np.where(is_line, rng.uniform(60.0, 120.0, m), 100.0).round()
+
+    return Network(
+        name=f'synthetic{n_bus}',
+        title=f'Synthetic {n_bus}-bus network',
+        bus_names=[f'Bus_{i + 1}' for i in idx],
+        bus_xyz=xyz,
+        bus_kv=kv,
+        bus_type=bus_type,
+        branch_from=f,
+        branch_to=t,
+        branch_kind=kind,
+        branch_mva=branch_mva,
+        gen_bus=gen_bus,
+        gen_names=[f'Gen{i + 1}' for i in range(len(gen_bus))],
+        gen_mw=gen_mw,
+        load_bus=load_bus,
+        load_names=[f'Load{i + 1}' for i in range(len(load_bus))],
+        load_mw=load_mw,
+        load_mvar=load_mvar,
+        load_mva=np.hypot(load_mw, load_mvar),
+        vm=vm,
+        pg=pg,
+        pd=pd,
+        qd=qd,
+        branch_r=branch_r,
+        branch_x=branch_x,
+        branch_b=branch_b,
+    )
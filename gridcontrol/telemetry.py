@@ -0,0 +1,282 @@
+"""Streaming telemetry: per-grid ring buffers with delta push to subscribers.
+
+Python counterpart of the ``updateRealTimeData`` timer in
+``GridControl_GUI.m``.  Instead of growing and re-slicing arrays on every
+tick, each grid owns a :class:`RingBuffer` of bus voltages and power
+injections (and optionally of branch loadings) that is allocated once.
+Samples arrive in blocks (a source at kHz rate writes many rows per
+wakeup) and are copied in with at most two slice assignments.
+
+Subscribers do not get a queue of their own: each keeps a sequence number
+and, when woken, receives only the rows written since (a :class:`Delta`).
+Memory therefore stays bounded by the buffer capacity no matter how many
+subscribers there are or how slow they are; a subscriber that falls more
+than a full buffer behind skips ahead and the skipped row count is
+reported in ``Delta.dropped``.
+
+:class:`SimulatedSource` stands in for field devices::
+
+    hub = TelemetryHub()
+    hub.add_grid('grid5', net.bus_names)
+    source = SimulatedSource(net, rate=1000.0)
+    async for delta in hub.subscribe('grid5'):
+        ...
+
+Run ``python -m gridcontrol.telemetry`` for a short simulated session.
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of timestamped rows of ``width`` values."""
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        self.capacity = int(capacity)
+        self.width = int(width)
+        self.times = np.zeros(self.capacity)
+        self.data = np.zeros((self.capacity, self.width), dtype=dtype)
+        self.seq = 0            # rows written since creation
+
+    def __len__(self):
+        return min(self.seq, self.capacity)
+
+    @property
+    def first(self):
+        """Sequence number of the oldest retained row."""
+        return max(0, self.seq - self.capacity)
+
+    def write(self, times, rows):
+        """Append ``rows`` (``(k, width)``) stamped with ``times`` (``(k,)``)."""
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        rows = np.asarray(rows).reshape(len(times), self.width)
+        if len(times) > self.capacity:
+            # Only the newest rows survive; skip writing the rest
+            self.seq += len(times) - self.capacity
+            times, rows = times[-self.capacity:], rows[-self.capacity:]
+        k = len(times)
+        start = self.seq % self.capacity
+        head = min(k, self.capacity - start)
+        self.times[start:start + head] = times[:head]
+        self.data[start:start + head] = rows[:head]
+        if head < k:
+            self.times[:k - head] = times[head:]
+            self.data[:k - head] = rows[head:]
+        self.seq += k
+
+    def since(self, seq):
+        """``(first_seq, times, rows)`` written after sequence number ``seq``.
+
+        Rows older than the buffer holds are gone; ``first_seq`` tells where
+        the returned rows start.  The arrays are copies.
+        """
+        seq = max(seq, self.first)
+        n = self.seq - seq
+        idx = (seq + np.arange(n)) % self.capacity
+        return seq, self.times[idx], self.data[idx]
+
+    def window(self, n=None):
+        """Last ``n`` rows (all retained rows by default), oldest first."""
+        n = len(self) if n is None else min(n, len(self))
+        return self.since(self.seq - n)[1:]
+
+
+@dataclass
+class Delta:
+    """Rows of one grid written since the subscriber's previous delta."""
+
+    grid: str
+    seq: int                # sequence number of the first row
+    times: np.ndarray
+    vm: np.ndarray          # (k, n_bus) pu
+    p: np.ndarray           # (k, n_bus) MW
+    dropped: int = 0        # rows overwritten before the subscriber read them
+    loading: np.ndarray = None  # (k, n_branch) fraction of rating, if streamed
+
+
+class GridStream:
+    """Voltage and power ring buffers of one grid, written in lockstep.
+
+    With ``branch_names`` the stream also carries branch loadings
+    (``loading``); otherwise ``loading`` is ``None``.
+    """
+
+    def __init__(self, name, bus_names, capacity, branch_names=None):
+        self.name = name
+        self.bus_names = np.asarray(bus_names)
+        n = len(self.bus_names)
+        self.vm = RingBuffer(capacity, n)
+        self.p = RingBuffer(capacity, n)
+        self.branch_names = None if branch_names is None else np.asarray(branch_names)
+        self.loading = None if branch_names is None else RingBuffer(capacity, len(self.branch_names))
+
+    @property
+    def seq(self):
+        return self.vm.seq
+
+    def write(self, times, vm, p, loading=None):
+        if (loading is None) != (self.loading is None):
+            raise ValueError(f'grid {self.name!r} ' + ('needs branch loadings' if self.loading is not None
+                                                       else 'has no branch loading channel'))
+        self.vm.write(times, vm)
+        self.p.write(times, p)
+        if self.loading is not None:
+            self.loading.write(times, loading)
+
+    def delta(self, seq):
+        first, times, vm = self.vm.since(seq)
+        p = self.p.since(first)[2]
+        loading = None if self.loading is None else self.loading.since(first)[2]
+        return Delta(self.name, first, times, vm, p, dropped=first - seq, loading=loading)
+
+
+class TelemetryHub:
+    """Named grid streams plus change notification for subscribers."""
+
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.streams = {}
+        self._changed = asyncio.Condition()
+        self._closed = False
+
+    def add_grid(self, name, bus_names, capacity=None, branch_names=None):
+        stream = GridStream(name, bus_names, capacity or self.capacity, branch_names)
+        self.streams[name] = stream
+        return stream
+
+    async def publish(self, grid, times, vm, p, loading=None):
+        """Store a block of samples of ``grid`` and wake its subscribers."""
+        self.streams[grid].write(times, vm, p, loading)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def close(self):
+        """End all subscriptions after their pending deltas."""
+        self._closed = True
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def subscribe(self, grid, since=None, max_rows=None):
+        """Yield a :class:`Delta` of ``grid`` whenever new rows arrive.
+
+        ``since`` is the first sequence number wanted (default: only rows
+        published from now on); ``max_rows`` caps the rows per delta.
+        """
+        stream = self.streams[grid]
+        seq = stream.seq if since is None else since
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: stream.seq > seq or self._closed)
+            if stream.seq <= seq:
+                return
+            delta = stream.delta(seq)
+            if max_rows is not None and len(delta.times) > max_rows:
+                keep = slice(0, max_rows)
+                delta = Delta(grid, delta.seq, delta.times[keep], delta.vm[keep], delta.p[keep],
+                              delta.dropped,
+                              None if delta.loading is None else delta.loading[keep])
+            seq = delta.seq + len(delta.times)
+            yield delta
+
+
+class SimulatedSource:
+    """Synthetic bus voltages and injections of one network.
+
+    Each bus oscillates about its load-flow setpoint like the MATLAB GUI's
+    demo data: ``vm + 0.02 sin(0.1 t + phase) + noise`` and
+    ``P (1 + 0.15 sin(0.15 t + phase)) + noise``, with per-bus phases.
+    With ``branches=True`` branch loadings swing the same way about their
+    load-flow values.  Samples are produced ``block`` at a time at ``rate``
+    samples/s.
+    """
+
+    def __init__(self, net, rate=1000.0, block=None, seed=0, branches=False):
+        self.net = net
+        self.rate = float(rate)
+        self.block = block or max(1, int(self.rate / 50))
+        self.rng = np.random.default_rng(seed)
+        n = net.n_bus
+        self.vm0 = np.where(np.isnan(net.vm), 1.0, net.vm)
+        self.p0 = np.nan_to_num(net.pg - net.pd)
+        self.phase = self.rng.uniform(0, 2 * np.pi, n)
+        self.loading0 = None
+        if branches:
+            from .powerflow import solve
+
+            self.loading0 = np.nan_to_num(solve(net).loading)
+            self.branch_phase = self.rng.uniform(0, 2 * np.pi, net.n_branch)
+        self.t = 0.0
+
+    def sample(self, k):
+        """Next ``k`` samples: ``(times, vm, p)``, plus ``loading`` with branches."""
+        times = self.t + np.arange(k) / self.rate
+        self.t = times[-1] + 1.0 / self.rate
+        arg = times[:, None]
+        vm = (self.vm0 + 0.02 * np.sin(0.1 * arg + self.phase)
+              + 0.002 * self.rng.standard_normal((k, self.net.n_bus)))
+        p = (self.p0 * (1.0 + 0.15 * np.sin(0.15 * arg + self.phase))
+             + 0.5 * self.rng.standard_normal((k, self.net.n_bus)))
+        if self.loading0 is None:
+            return times, vm, p
+        loading = (self.loading0 * (1.0 + 0.15 * np.sin(0.15 * arg + self.branch_phase))
+                   + 0.005 * self.rng.standard_normal((k, self.net.n_branch)))
+        return times, vm, p, loading
+
+    async def run(self, hub, grid, duration):
+        """Publish ``duration`` seconds of samples in real time."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        total = int(round(duration * self.rate))
+        sent = 0
+        while sent < total:
+            k = min(self.block, total - sent)
+            await hub.publish(grid, *self.sample(k))
+            sent += k
+            # Sleep until the wall-clock time of the next block (no drift)
+            await asyncio.sleep(max(0.0, start + sent / self.rate - loop.time()))
+
+
+async def _session(nets, rate, duration):
+    hub = TelemetryHub(capacity=int(rate * 30))
+    for net in nets:
+        hub.add_grid(net.name, net.bus_names)
+    received = {net.name: [0, 0] for net in nets}
+
+    async def consume(name):
+        async for delta in hub.subscribe(name, since=0):
+            received[name][0] += len(delta.times)
+            received[name][1] += delta.dropped
+
+    consumers = [asyncio.create_task(consume(net.name)) for net in nets]
+    await asyncio.gather(*(SimulatedSource(net, rate).run(hub, net.name, duration) for net in nets))
+    await hub.close()
+    await asyncio.gather(*consumers)
+    return hub, received
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_case
+
+    parser = argparse.ArgumentParser(description='Stream simulated telemetry of the study grids.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--rate', type=float, default=1000.0, help='samples per second per grid')
+    parser.add_argument('--duration', type=float, default=2.0, help='seconds')
+    args = parser.parse_args(argv)
+
+    nets = [load_case(g) for g in args.grids]
+    hub, received = asyncio.run(_session(nets, args.rate, args.duration))
+    print(f"{'grid':<8} {'buses':>5} {'samples':>8} {'received':>8} {'dropped':>7}  last Vmin/Vmax (pu)")
+    for net in nets:
+        stream = hub.streams[net.name]
+        _, vm = stream.vm.window(1)
+        got, dropped = received[net.name]
+        print(f'{net.name:<8} {net.n_bus:5d} {stream.seq:8d} {got:8d} {dropped:7d}  '
+              f'{vm.min():.4f} / {vm.max():.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+"""Transient stability: classical generator models under scripted faults.
+
+Python counterpart of the ETAP transient-stability study of ``grid3``
+(``Untitled.TS1S``).  Every generator of a network (its ``GENERATORS``
+labels, e.g. ``'Gen1 (12.75 MW)'`` or ``'Wind Farm (30 MW)'``, plus the
+slack/PV buses without one) is a classical machine: a constant EMF behind
+its transient reactance, swinging by
+
+    d(delta)/dt = w_s (w - 1)
+    M dw/dt     = Pm - Pe - D (w - 1)
+    T_g dPm/dt  = Pm0 - (w - 1) / R - Pm        (droop governor)
+
+on the system base, with loads turned into constant admittances at the
+load-flow operating point.  Each network state (pre-fault, fault-on,
+post-fault) is reduced to the machine internal nodes with one sparse LU of
+the augmented Ybus, so ``Pe`` is a small dense product.
+
+A :class:`Disturbance` scripts a study: a fault at a bus at ``t_fault``,
+cleared at ``t_clear`` by tripping branches.  :meth:`StabilityModel.simulate`
+integrates all machines of a batch of disturbances as one state array with
+the trapezoidal rule.  Each step is solved by Newton iterations whose
+Jacobian reduces to one ``(machines, machines)`` system per disturbance.
+:func:`run_study` fans batches out over a process pool::
+
+    result = run_study(load_case(3), default_disturbances(load_case(3)))
+    result.stable, result.f_min
+
+Run ``python -m gridcontrol.transient grid3`` for a report.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from .network import PV, SLACK, parse_rating
+from .powerflow import newton_raphson
+from .switching import IncrementalYbus
+
+# Nominal frequency (Hz; SCA_Verification.m)
+F_NOMINAL = 50.0
+# Machine defaults on the machine base: inertia (s), transient reactance
+# (pu), damping (pu) and governor droop (pu) and time constant (s)
+H = 4.0
+XD = 0.25
+DAMPING = 1.0
+DROOP = 0.05
+T_GOV = 0.5
+# A machine more than this far (degrees) from another has lost synchronism
+UNSTABLE_ANGLE = 180.0
+
+
+@dataclass
+class MachineTable:
+    """Classical machine data of ``n`` generators as parallel arrays.
+
+    ``rating`` is in MVA; ``h``, ``xd``, ``damping`` and ``droop`` are on
+    the machine base.  ``droop`` is ``inf`` for machines without a governor.
+    """
+
+    names: np.ndarray
+    bus: np.ndarray
+    rating: np.ndarray
+    h: np.ndarray
+    xd: np.ndarray
+    damping: np.ndarray
+    droop: np.ndarray
+    t_gov: np.ndarray
+
+    def __len__(self):
+        return len(self.names)
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+
+def default_machines(net, h=H, xd=XD, damping=DAMPING, droop=DROOP, t_gov=T_GOV):
+    """One machine per generator label, plus one per unlabelled slack/PV bus.
+
+    Ratings come from the labels; where a label has none (``'Gen1 (Swing
+    Bus)'``) or there is no label, the load-flow generation at the bus is
+    used, but at least the system base.
+    """
+    base = newton_raphson(net)
+    sg = np.abs(base.pg + 1j * base.qg)
+    names = net.gen_names.tolist()
+    bus = net.gen_bus.tolist()
+    rating = [parse_rating(g).get('MW', parse_rating(g).get('MVA', np.nan)) for g in names]
+    sources = np.flatnonzero((net.bus_type == SLACK) | (net.bus_type == PV))
+    for b in sources[~np.isin(sources, net.gen_bus)].tolist():
+        names.append(f'{net.bus_names[b]} (source)')
+        bus.append(b)
+        rating.append(np.nan)
+    bus = np.asarray(bus, dtype=np.intp)
+    rating = np.asarray(rating, dtype=np.float64)
+    rating = np.where(np.isfinite(rating), rating, np.maximum(sg[bus], net.base_mva))
+    full = lambda v: np.full(len(bus), v, dtype=np.float64)
+    return MachineTable(np.asarray(names, dtype=str), bus, rating, full(h), full(xd),
+                        full(damping), full(droop), full(t_gov))
+
+
+@dataclass
+class Disturbance:
+    """A scripted fault: applied at ``bus`` at ``t_fault`` through ``zf``
+    (pu; 0 is a bolted fault), cleared at ``t_clear`` by opening ``trip``.
+
+    ``bus=None`` with ``trip`` is a plain switching event at ``t_clear``.
+    """
+
+    name: str
+    bus: int = None
+    t_fault: float = 0.05
+    t_clear: float = 0.15
+    trip: tuple = ()
+    zf: complex = 0j
+
+
+def default_disturbances(net, branches=None, clearing=0.1, t_fault=0.05):
+    """A bolted fault at the from-end of each branch, cleared after ``clearing``
+    seconds by opening the branch.
+
+    ``branches`` defaults to every in-service branch.  Where opening the
+    branch would island the network the fault clears without a trip.
+    """
+    on = np.flatnonzero(net.branch_status != 0)
+    out = []
+    for k in (on if branches is None else np.asarray(branches)).tolist():
+        trip = () if _islands(net, on[on != k]) else (int(k),)
+        label = net.branch_names[k] if trip else f'{net.branch_names[k]} (no trip)'
+        out.append(Disturbance(f'{net.bus_names[net.branch_from[k]]} / {label}',
+                               int(net.branch_from[k]), t_fault, t_fault + clearing, trip))
+    return out
+
+
+def _islands(net, branches):
+    graph = sp.coo_matrix((np.ones(len(branches)), (net.branch_from[branches], net.branch_to[branches])),
+                          shape=(net.n_bus, net.n_bus))
+    return connected_components(graph, directed=False)[0] > 1
+
+
+@dataclass
+class TransientResult:
+    """Trajectories of a batch of disturbances.
+
+    ``delta`` (degrees, relative to the centre of inertia) and ``omega``
+    (pu speed) are ``(disturbances, steps + 1, machines)``.
+    """
+
+    net: object
+    machines: MachineTable
+    disturbances: list
+    t: np.ndarray
+    delta: np.ndarray
+    omega: np.ndarray
+    f0: float
+    converged: np.ndarray = field(default=None)
+
+    @property
+    def frequency(self):
+        """Machine frequencies in Hz."""
+        return self.f0 * self.omega
+
+    @property
+    def separation(self):
+        """Largest rotor-angle difference between machines (degrees), per step."""
+        return self.delta.max(axis=-1) - self.delta.min(axis=-1)
+
+    @property
+    def stable(self):
+        return self.separation.max(axis=1) <= UNSTABLE_ANGLE
+
+    @property
+    def t_unstable(self):
+        """First time the separation exceeds :data:`UNSTABLE_ANGLE` (``nan`` if stable)."""
+        over = self.separation > UNSTABLE_ANGLE
+        return np.where(over.any(axis=1), self.t[over.argmax(axis=1)], np.nan)
+
+    @property
+    def f_min(self):
+        return self.frequency.min(axis=(1, 2))
+
+    @property
+    def f_max(self):
+        return self.frequency.max(axis=(1, 2))
+
+
+class StabilityModel:
+    """Classical machines of ``net`` initialised from its load flow."""
+
+    def __init__(self, net, machines=None, f0=F_NOMINAL):
+        self.net = net
+        self.machines = default_machines(net) if machines is None else machines
+        self.f0 = f0
+        base = newton_raphson(net, tol=1e-10)
+        if not base.converged:
+            raise RuntimeError(f'{net.name}: load flow did not converge')
+        self.sw = IncrementalYbus(net, base.ybus.copy())
+
+        mc, sb = self.machines, net.base_mva
+        bus = mc.bus
+        scale = mc.rating / sb
+        self.M = 2 * mc.h * scale
+        self.D = mc.damping * scale
+        self.inv_r = scale / mc.droop
+        self.inv_t = 1.0 / mc.t_gov
+        self.y_m = 1.0 / (1j * mc.xd / scale)
+
+        V = base.V
+        s_load = (net.pd + 1j * net.qd) / sb
+        s_gen = base.sbus + s_load
+        share = mc.rating / np.bincount(bus, mc.rating, net.n_bus)[bus]
+        s_m = s_gen[bus] * share
+        # Everything not produced by a machine becomes a constant admittance
+        s_other = base.sbus.copy()
+        s_other[np.unique(bus)] = -s_load[np.unique(bus)]
+        self.y_load = -np.conj(s_other) / np.abs(V) ** 2
+        E = V[bus] + np.conj(s_m / V[bus]) / self.y_m
+        self.e = np.abs(E)
+        self.delta0 = np.angle(E)
+        self.pm0 = self.power(self.reduce(), self.delta0)[0]
+
+    def reduce(self, bus=None, zf=0j, trip=()):
+        """Admittance matrix ``(machines, machines)`` between internal nodes.
+
+        The network has a fault at ``bus`` through ``zf`` and the branches
+        ``trip`` open.
+        """
+        net, sw, y_m, gen = self.net, self.sw, self.y_m, self.machines.bus
+        n = net.n_bus
+        shunt = self.y_load + np.bincount(gen, y_m.real, n) + 1j * np.bincount(gen, y_m.imag, n)
+        opened = [k for k in trip if net.branch_status[k] != 0]
+        for k in opened:
+            sw.open(k)
+        try:
+            Y = (sw.ybus + sp.diags(shunt)).tocsc()
+        finally:
+            for k in opened:
+                sw.close(k)
+        if bus is not None:
+            if zf == 0:
+                keep = np.ones(n)
+                keep[bus] = 0.0
+                Y = (sp.diags(keep) @ Y @ sp.diags(keep) + sp.diags(1.0 - keep)).tocsc()
+            else:
+                Y = (Y + sp.csc_matrix(([1.0 / zf], ([bus], [bus])), shape=(n, n))).tocsc()
+        B = np.zeros((n, len(gen)), dtype=complex)
+        B[gen, np.arange(len(gen))] = y_m
+        if bus is not None and zf == 0:
+            B[bus] = 0.0                # grounded: the bus row reads V = 0
+        try:
+            Z = splu(Y).solve(B)
+        except RuntimeError:
+            raise ValueError(f'{net.name}: network singular after switching {list(trip)} '
+                             f'(an island without load or generation)') from None
+        return np.diag(y_m) - y_m[:, None] * Z[gen]
+
+    def power(self, Y, delta):
+        """``(Pe, Qe, E)`` at rotor angles ``delta`` (``(..., machines)``)."""
+        E = self.e * np.exp(1j * delta)
+        s = E * np.conj(np.einsum('...ij,...j->...i', Y, E))
+        return s.real, s.imag, E
+
+    def _f(self, Y, delta, omega, pm):
+        pe = self.power(Y, delta)[0]
+        ws = 2 * np.pi * self.f0
+        return (ws * (omega - 1),
+                (pm - pe - self.D * (omega - 1)) / self.M,
+                self.inv_t * (self.pm0 - self.inv_r * (omega - 1) - pm))
+
+    def simulate(self, disturbances, t_end=2.0, step=0.005, tol=1e-8, max_iter=6):
+        """Integrate ``disturbances`` together; return a :class:`TransientResult`."""
+        m, S = len(self.machines), len(disturbances)
+        steps = int(round(t_end / step))
+        Ys = np.empty((S, 3, m, m), dtype=complex)
+        Ys[:, 0] = self.reduce()
+        events = np.empty((S, 2), dtype=np.intp)
+        for s, d in enumerate(disturbances):
+            Ys[s, 1] = Ys[s, 0] if d.bus is None else self.reduce(d.bus, d.zf)
+            Ys[s, 2] = self.reduce(trip=d.trip) if len(d.trip) else Ys[s, 0]
+            events[s] = round(d.t_fault / step), round(d.t_clear / step)
+        rows = np.arange(S)
+
+        a, ws = step / 2, 2 * np.pi * self.f0
+        c = a * self.inv_t * self.inv_r / (1 + a * self.inv_t)
+        beta = 1 + a * (self.D + c) / self.M
+        gamma = a * a * ws / (beta * self.M)
+        eye = np.eye(m)
+
+        delta = np.tile(self.delta0, (S, 1))
+        omega = np.ones((S, m))
+        pm = np.tile(self.pm0, (S, 1))
+        out_d = np.empty((S, steps + 1, m))
+        out_w = np.empty((S, steps + 1, m))
+        out_d[:, 0], out_w[:, 0] = delta, omega
+        converged = np.ones(S, dtype=bool)
+        for n in range(steps):
+            seg = (n >= events[:, 0]).astype(np.intp) + (n >= events[:, 1])
+            Y = Ys[rows, seg]
+            f0 = self._f(Y, delta, omega, pm)
+            d1, w1, p1 = delta + step * f0[0], omega + step * f0[1], pm + step * f0[2]
+            for _ in range(max_iter):
+                f1 = self._f(Y, d1, w1, p1)
+                gd = d1 - delta - a * (f0[0] + f1[0])
+                gw = w1 - omega - a * (f0[1] + f1[1])
+                gp = p1 - pm - a * (f0[2] + f1[2])
+                if max(np.abs(gd).max(), np.abs(gw).max(), np.abs(gp).max()) < tol:
+                    break
+                # Newton step: omega and Pm rows are diagonal, leaving a
+                # (machines, machines) system in the angles
+                _, qe, E = self.power(Y, d1)
+                K = (E[:, :, None] * np.conj(Y * E[:, None, :])).imag
+                K[:, np.arange(m), np.arange(m)] -= qe
+                gp = gp / (1 + a * self.inv_t)
+                rhs = -gd - (a * ws / beta) * (gw + a * gp / self.M)
+                dd = np.linalg.solve(eye + gamma[:, None] * K, rhs[..., None])[..., 0]
+                dw = (-gw - a * gp / self.M - (a / self.M) * np.einsum('sij,sj->si', K, dd)) / beta
+                d1, w1, p1 = d1 + dd, w1 + dw, p1 - gp - c * dw
+            else:
+                converged &= np.maximum(np.abs(gd).max(axis=1), np.abs(gw).max(axis=1)) < tol * 1e3
+            delta, omega, pm = d1, w1, p1
+            out_d[:, n + 1], out_w[:, n + 1] = delta, omega
+
+        coi = (out_d * self.M).sum(axis=-1, keepdims=True) / self.M.sum()
+        return TransientResult(self.net, self.machines, list(disturbances),
+                               np.arange(steps + 1) * step, np.degrees(out_d - coi), out_w,
+                               self.f0, converged)
+
+
+def _concat(results):
+    first = results[0]
+    return TransientResult(first.net, first.machines, [d for r in results for d in r.disturbances],
+                           first.t, np.concatenate([r.delta for r in results]),
+                           np.concatenate([r.omega for r in results]), first.f0,
+                           np.concatenate([r.converged for r in results]))
+
+
+_state = {}
+
+
+def _init_worker(net, machines, f0, options):
+    _state.update(model=StabilityModel(net, machines, f0), options=options)
+
+
+def _simulate(disturbances):
+    return _state['model'].simulate(disturbances, **_state['options'])
+
+
+def run_study(net, disturbances=None, machines=None, workers=None, batch=16, f0=F_NOMINAL,
+              **options):
+    """Simulate ``disturbances`` (default :func:`default_disturbances`).
+
+    Batches of ``batch`` disturbances are integrated together; ``workers``
+    defaults to the CPU count, ``1`` runs in-process.  ``options`` go to
+    :meth:`StabilityModel.simulate`.
+    """
+    if disturbances is None:
+        disturbances = default_disturbances(net)
+    if not len(disturbances):
+        raise ValueError(f'{net.name}: no disturbances to simulate')
+    if machines is None:
+        machines = default_machines(net)
+    batches = [disturbances[i:i + batch] for i in range(0, len(disturbances), batch)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+    if workers == 1:
+        _init_worker(net, machines, f0, options)
+        return _concat(list(map(_simulate, batches)))
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(net, machines, f0, options)) as pool:
+        return _concat(list(pool.map(_simulate, batches)))
+
+
+def critical_clearing_time(model, disturbance, t_max=1.0, points=16, rounds=2, **options):
+    """Longest stable clearing time of ``disturbance`` (``inf`` if stable at ``t_max``).
+
+    Each round simulates ``points`` clearing times across the current
+    bracket in one batch, so the result is within
+    ``(t_max - t_fault) / points ** rounds``.
+    """
+    lo, hi = disturbance.t_fault, disturbance.t_fault + t_max
+    options.setdefault('t_end', hi + 1.0)
+    for _ in range(rounds):
+        times = np.linspace(lo, hi, points + 1)[1:]
+        trials = [replace(disturbance, t_clear=float(t)) for t in times]
+        ok = model.simulate(trials, **options).stable
+        if ok.all():
+            if hi == disturbance.t_fault + t_max:
+                return np.inf
+            lo = times[-1]
+            break
+        first = int(np.argmin(ok))
+        lo, hi = (times[first - 1] if first else lo), times[first]
+    return lo - disturbance.t_fault
+
+
+def report(result, cct=None, file=None):
+    """Print the machine table and one line per disturbance."""
+    net, mc = result.net, result.machines
+    out = lambda *a: print(*a, file=file)
+    out(f'\n=== {net.title}: transient stability ({len(mc)} machines, '
+        f'{len(result.disturbances)} disturbances, {result.t[-1]:.2f} s) ===')
+    out('Machine                   Bus         MVA      H (s)   Xd\' (pu)')
+    out('-' * 66)
+    for name, b, s, h, x in zip(mc.names, mc.bus, mc.rating, mc.h, mc.xd):
+        out(f'{name:<24}  {net.bus_names[b]:<10}  {s:7.1f}  {h:6.2f}  {x:8.3f}')
+    out('\nDisturbance                    Clear (s)  Stable  Max sep (deg)  f min (Hz)  f max (Hz)'
+        + ('  CCT (s)' if cct is not None else ''))
+    out('-' * (88 + (9 if cct is not None else 0)))
+    sep = result.separation.max(axis=1)
+    for i, d in enumerate(result.disturbances):
+        line = (f'{d.name:<30}  {d.t_clear - d.t_fault:8.3f}  {"yes" if result.stable[i] else "NO":>6}  '
+                f'{sep[i]:13.1f}  {result.f_min[i]:10.3f}  {result.f_max[i]:10.3f}')
+        if cct is not None:
+            line += f'  {cct[i]:7.3f}'
+        out(line)
+    unstable = int((~result.stable).sum())
+    out(f'\n{unstable} unstable; largest frequency deviation '
+        f'{np.abs(result.frequency - result.f0).max():.3f} Hz')
+
+
+def main(argv=None):
+    from .grids import GRIDS, load_case
+
+    parser = argparse.ArgumentParser(description='Transient stability of the study grids.')
+    parser.add_argument('grids', nargs='*', default=list(GRIDS), help='grid names or numbers')
+    parser.add_argument('--clear', type=float, default=0.1, help='fault clearing time (s)')
+    parser.add_argument('--t-end', type=float, default=2.0)
+    parser.add_argument('--step', type=float, default=0.005)
+    parser.add_argument('--no-governor', action='store_true')
+    parser.add_argument('--cct', action='store_true', help='also find critical clearing times')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    for grid in args.grids:
+        net = load_case(grid)
+        t0 = time.perf_counter()
+        machines = default_machines(net, droop=np.inf if args.no_governor else DROOP)
+        disturbances = default_disturbances(net, clearing=args.clear)
+        result = run_study(net, disturbances, machines, workers=args.workers,
+                           t_end=args.t_end, step=args.step)
+        cct = None
+        if args.cct:
+            model = StabilityModel(net, machines)
+            cct = [critical_clearing_time(model, d, step=args.step) for d in disturbances]
+        report(result, cct)
+        print(f'({time.perf_counter() - t0:.2f} s)')
+
+
+if __name__ == '__main__':
+    main()
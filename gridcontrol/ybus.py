@@ -0,0 +1,135 @@
+"""Sparse bus admittance matrix assembly."""
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def pi_admittances(r, x, b, tap):
+    """Two-port admittances ``(yff, yft, ytf, ytt)`` of pi-model branches.
+
+    Uses the MATPOWER model: series ``1/(r + jx)``, total line charging
+    ``b`` split between the ends and an off-nominal tap on the from side.
+    """
+    ys = 1.0 / (r + 1j * x)
+    ytt = ys + 0.5j * b
+    return ytt / tap ** 2, -ys / tap, -ys / tap, ytt
+
+
+def _check_impedances(net):
+    bad = (np.isnan(net.branch_r) | np.isnan(net.branch_x)) & (net.branch_status != 0)
+    if bad.any():
+        names = ', '.join(net.branch_names[bad][:5])
+        raise ValueError(f'{net.name}: no impedance data for branches {names} '
+                         '(load the study network with load_case())')
+
+
+def branch_admittances(net, k=None):
+    """Return the per-branch two-port admittances ``(yff, yft, ytf, ytt)``.
+
+    Open branches (``branch_status == 0``) contribute zeros.  ``k`` selects
+    a subset of branches (index or index array).
+    """
+    _check_impedances(net)
+    sel = slice(None) if k is None else k
+    status = net.branch_status[sel] != 0
+    r = np.where(status, net.branch_r[sel], 1.0)
+    x = np.where(status, net.branch_x[sel], 1.0)
+    return tuple(y * status for y in pi_admittances(r, x, net.branch_b[sel], net.branch_tap[sel]))
+
+
+def assemble_ybus(n, f, t, yff, yft, ytf, ytt):
+    """Assemble an ``n x n`` CSR bus matrix from per-branch two-port values.
+
+    The diagonal is always stored explicitly (even for isolated buses) so the
+    sparsity pattern contains every ``(i, i)`` position.
+    """
+    diag = np.arange(n)
+    rows = np.concatenate((f, f, t, t, diag))
+    cols = np.concatenate((f, t, f, t, diag))
+    data = np.concatenate((yff, yft, ytf, ytt, np.zeros(n, dtype=np.result_type(yff))))
+    ybus = sp.csr_matrix((data, (rows, cols)), shape=(n, n))
+    ybus.sort_indices()
+    return ybus
+
+
+def bus_adjacency(n, f, t):
+    """Symmetric ``n x n`` CSR 0/1 matrix of the buses joined by branches ``f``-``t``.
+
+    Parallel branches give a single entry; self-loops are dropped.
+    """
+    keep = f != t
+    f, t = f[keep], t[keep]
+    a = sp.coo_matrix((np.ones(len(f)), (f, t)), shape=(n, n)).tocsr()
+    a = a + a.T
+    a.data[:] = 1.0
+    return a
+
+
+def csr_positions(matrix, rows, cols):
+    """Indices into ``matrix.data`` of entries ``(rows, cols)``; -1 if not stored.
+
+    ``matrix`` must be CSR with sorted indices.
+    """
+    n = matrix.shape[1]
+    keys = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr)) * n + matrix.indices
+    want = np.asarray(rows, dtype=np.int64) * n + np.asarray(cols)
+    pos = np.minimum(np.searchsorted(keys, want), len(keys) - 1)
+    return np.where(keys[pos] == want, pos, -1)
+
+
+def make_ybus(net):
+    """Assemble the ``n_bus x n_bus`` complex Ybus in CSR form."""
+    return assemble_ybus(net.n_bus, net.branch_from, net.branch_to, *branch_admittances(net))
+
+
+def make_b(net, alg='xb'):
+    """Fast-decoupled ``(B', B'')`` matrices for the ``'xb'`` or ``'bx'`` scheme.
+
+    ``B'`` ignores line charging and taps, ``B''`` keeps them; the XB scheme
+    drops branch resistance from ``B'``, the BX scheme from ``B''``.
+    """
+    if alg not in ('xb', 'bx'):
+        raise ValueError(f"unknown fast-decoupled scheme {alg!r}; expected 'xb' or 'bx'")
+    _check_impedances(net)
+    on = net.branch_status != 0
+    f, t = net.branch_from[on], net.branch_to[on]
+    r, x = net.branch_r[on], net.branch_x[on]
+    zero = np.zeros_like(r)
+    r_p, r_pp = (zero, r) if alg == 'xb' else (r, zero)
+    bp = assemble_ybus(net.n_bus, f, t, *pi_admittances(r_p, x, zero, np.ones_like(r)))
+    bpp = assemble_ybus(net.n_bus, f, t, *pi_admittances(r_pp, x, net.branch_b[on],
+                                                          net.branch_tap[on]))
+    return -bp.imag, -bpp.imag
+
+
+def dc_susceptance(net, k=None):
+    """DC-model series susceptance ``1 / (x * tap)`` of branches (0 when open)."""
+    sel = slice(None) if k is None else k
+    status = net.branch_status[sel] != 0
+    return np.where(status, 1.0 / np.where(status, net.branch_x[sel] * net.branch_tap[sel], 1.0), 0.0)
+
+
+def make_bdc(net):
+    """DC power-flow matrices ``(Bbus, Bf)``.
+
+    ``Bbus @ theta`` gives the bus active injections and ``Bf @ theta`` the
+    from-end branch flows (pu, angles in radians).
+    """
+    _check_impedances(net)
+    n, m = net.n_bus, net.n_branch
+    b = dc_susceptance(net)
+    rows = np.concatenate((np.arange(m), np.arange(m)))
+    cols = np.concatenate((net.branch_from, net.branch_to))
+    bf = sp.csr_matrix((np.concatenate((b, -b)), (rows, cols)), shape=(m, n))
+    bf.sort_indices()
+    bbus = assemble_ybus(n, net.branch_from, net.branch_to, b, -b, -b, b)
+    return bbus, bf
+
+
+def branch_flows(net, V):
+    """Complex power entering each branch at the from and to ends (pu)."""
+    f, t = net.branch_from, net.branch_to
+    yff, yft, ytf, ytt = branch_admittances(net)
+    i_f = yff * V[f] + yft * V[t]
+    i_t = ytf * V[f] + ytt * V[t]
+    return V[f] * np.conj(i_f), V[t] * np.conj(i_t)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from gridcontrol.alarms import AlarmEngine
+from gridcontrol.telemetry import TelemetryHub
+
+
+def engine_for(n_bus=2):
+    hub = TelemetryHub(capacity=64)
+    stream = hub.add_grid('g', [f'Bus{i}' for i in range(n_bus)])
+    engine = AlarmEngine(hub)
+    engine.set_limits(channel='vm', rate=np.nan)
+    return stream, engine
+
+
+def step(stream, engine, t, vm):
+    vm = np.atleast_2d(vm)
+    times = t + 0.01 * np.arange(len(vm))
+    stream.write(times, vm, np.zeros_like(vm))
+    return [(a.element, a.kind, a.raised) for a in engine.tick()]
+
+
+def test_low_voltage_clears_only_past_the_deadband():
+    stream, engine = engine_for()
+    assert step(stream, engine, 0.0, [1.00, 1.00]) == []
+    assert step(stream, engine, 1.0, [0.94, 1.00]) == [('Bus0', 'low', True)]
+    assert step(stream, engine, 2.0, [0.952, 1.00]) == []   # inside limit, not past deadband
+    assert step(stream, engine, 3.0, [0.94, 1.00]) == []    # still active: no second raise
+    assert len(engine.active_alarms()) == 1
+    assert step(stream, engine, 4.0, [0.96, 1.00]) == [('Bus0', 'low', False)]
+    assert engine.active_alarms() == []
+
+
+def test_transient_within_one_tick_is_raised_and_cleared():
+    stream, engine = engine_for()
+    events = step(stream, engine, 0.0, [[1.0, 1.0], [1.0, 1.08], [1.0, 1.0]])
+    assert events == [('Bus1', 'high', True), ('Bus1', 'high', False)]
+    assert engine.active_alarms() == []
+
+
+def test_rate_alarm_resets_below_its_fraction():
+    stream, engine = engine_for(1)
+    engine.set_limits(channel='vm', low=np.nan, high=np.nan, rate=0.05)
+    assert step(stream, engine, 0.0, [1.0]) == []
+    assert step(stream, engine, 1.0, [1.1]) == [('Bus0', 'rate', True)]    # 0.1 pu/s
+    assert step(stream, engine, 2.0, [1.145]) == []                         # 0.045 > 0.8 * 0.05
+    assert step(stream, engine, 3.0, [1.15]) == [('Bus0', 'rate', False)]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.powerflow import batch_injections, newton_raphson, newton_raphson_batch
+from gridcontrol.synthetic import synthetic_network
+
+
+def scaled(net, n, seed=0):
+    scale = np.random.default_rng(seed).uniform(0.7, 1.2, (n, net.n_bus))
+    return scale * net.pd, scale * net.qd
+
+
+@pytest.mark.parametrize('net, dense', [(load_case(1), None), (load_case(5), False),
+                                        (synthetic_network(300), None)],
+                         ids=['grid1-dense', 'grid5-sparse', 'synthetic300'])
+def test_rows_match_single_solves(net, dense):
+    pd, qd = scaled(net, 6)
+    batch = newton_raphson_batch(net, batch_injections(net, pd=pd, qd=qd), tol=1e-10,
+                                 dense=dense)
+    assert batch.converged.all()
+    own_pd, own_qd = net.pd.copy(), net.qd.copy()
+    for row in range(len(pd)):
+        net.pd[:], net.qd[:] = pd[row], qd[row]
+        single = newton_raphson(net, tol=1e-10)
+        assert np.abs(batch.V[row] - single.V).max() < 1e-9
+        assert abs(batch.losses[row] - single.losses) < 1e-6
+    net.pd[:], net.qd[:] = own_pd, own_qd
+
+
+def test_infeasible_row_does_not_spoil_the_others():
+    net = load_case(1)
+    pd, qd = scaled(net, 3)
+    pd[1] *= 50.0
+    qd[1] *= 50.0
+    batch = newton_raphson_batch(net, batch_injections(net, pd=pd, qd=qd))
+    assert list(batch.converged) == [True, False, True]
+    single = newton_raphson_batch(net, batch_injections(net, pd=pd[[0, 2]], qd=qd[[0, 2]]))
+    assert np.abs(batch.V[[0, 2]] - single.V).max() < 1e-12
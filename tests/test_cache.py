@@ -0,0 +1,74 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from gridcontrol.cache import StudyCache
+
+calls = []
+
+
+@dataclass
+class Numbers:
+    values: np.ndarray
+    count: int
+
+
+def read_numbers(path):
+    calls.append(path)
+    values = np.loadtxt(path, ndmin=1)
+    return Numbers(values, len(values))
+
+
+def write(path, values):
+    np.savetxt(path, values)
+
+
+def test_hit_skips_the_reader(tmp_path):
+    source = tmp_path / 'study.txt'
+    write(source, [1.0, 2.0, 3.0])
+    cache = StudyCache(tmp_path / 'cache')
+    calls.clear()
+    first = cache.get(source, read_numbers)
+    again = cache.get(source, read_numbers)
+    assert len(calls) == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert np.array_equal(again.values, first.values) and again.count == 3
+    assert not again.values.flags.writeable
+
+
+def test_touched_file_is_rehashed_not_reread(tmp_path):
+    source = tmp_path / 'study.txt'
+    write(source, [1.0, 2.0])
+    cache = StudyCache(tmp_path / 'cache')
+    calls.clear()
+    cache.get(source, read_numbers)
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    cache.get(source, read_numbers)
+    assert len(calls) == 1 and cache.hits == 1
+
+
+def test_changed_file_is_reread(tmp_path):
+    source = tmp_path / 'study.txt'
+    write(source, [1.0, 2.0])
+    cache = StudyCache(tmp_path / 'cache')
+    calls.clear()
+    cache.get(source, read_numbers)
+    write(source, [4.0, 5.0, 6.0])
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    record = cache.get(source, read_numbers)
+    assert len(calls) == 2 and cache.misses == 2 and record.count == 3
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = StudyCache(tmp_path / 'cache', max_entries=1)
+    sources = []
+    for i in range(2):
+        sources.append(tmp_path / f'study{i}.txt')
+        write(sources[-1], [float(i)])
+        cache.get(sources[-1], read_numbers)
+    assert [e['source'] for e in cache.entries()] == [str(sources[1])]
+    calls.clear()
+    cache.get(sources[0], read_numbers)
+    assert len(calls) == 1
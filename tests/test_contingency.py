@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from gridcontrol.contingency import run_n1
+from gridcontrol.grids import load_case
+from gridcontrol.synthetic import synthetic_network
+
+
+@pytest.mark.parametrize('net', [load_case(1), synthetic_network(300)], ids=lambda net: net.name)
+def test_screen_keeps_every_violation(net):
+    screened = run_n1(net, workers=1)
+    full = run_n1(net, workers=1, screen=None)
+    assert ({c.branch: c.outcome for c in screened.violations}
+            == {c.branch: c.outcome for c in full.violations})
+
+
+def test_in_process_run_does_not_switch_the_callers_network():
+    net = load_case(1)
+    status = net.branch_status.copy()
+    net.branch_status.flags.writeable = False       # any in-place switching raises
+    rep = run_n1(net, workers=1, screen=None)
+    assert rep.count('secure') + rep.count('violation') > 0
+    assert np.array_equal(net.branch_status, status)
+
+
+def test_out_of_service_branch_is_rejected():
+    net = load_case(1)
+    net.branch_status[2] = 0
+    with pytest.raises(ValueError, match='out of service'):
+        run_n1(net, branches=[1, 2], workers=1)
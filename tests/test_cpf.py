@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from gridcontrol.cpf import loadability, main, trace
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.network import PQ
+from gridcontrol.powerflow import newton_raphson
+from gridcontrol.synthetic import synthetic_network
+
+
+def brute_force_nose(net, hi, rounds=30):
+    """Largest all-load scaling ``lam`` (pu added) at which Newton-Raphson still solves.
+
+    Loads grow at constant power factor as in ``direction(net)``; bisection
+    warm-starts each solve from the last converged one.
+    """
+    pd, qd = net.pd.copy(), net.qd.copy()
+    total = pd.sum() / net.base_mva
+    lo, V = 0.0, None
+    try:
+        for _ in range(rounds):
+            lam = (lo + hi) / 2
+            net.pd, net.qd = pd * (1 + lam / total), qd * (1 + lam / total)
+            res = newton_raphson(net, tol=1e-8, max_iter=40, v0=V)
+            if res.converged and np.isfinite(res.vm).all():
+                lo, V = lam, res.V
+            else:
+                hi = lam
+    finally:
+        net.pd, net.qd = pd, qd
+    return lo
+
+
+@pytest.mark.parametrize('net', [load_case(1), load_case(3), load_case(5), synthetic_network(300)],
+                         ids=lambda net: net.name)
+def test_nose_matches_brute_force_load_scaling(net):
+    curve = trace(net)
+    assert curve.converged
+    assert abs(brute_force_nose(net, 2 * curve.lam_max) / curve.lam_max - 1) < 1e-6
+
+
+@pytest.mark.parametrize('grid', GRIDS)
+def test_loadability_defaults_to_pq_load_buses(grid):
+    net = load_case(grid)
+    margins = loadability(net, workers=1)
+    assert all(net.bus_type[m.bus] == PQ and net.pd[m.bus] > 0 for m in margins)
+    assert all(m.nose_vm < 1.0 for m in margins if m.converged)
+
+
+@pytest.mark.parametrize('bus', ['Bus_6', 'Nope'])
+def test_qv_rejects_pv_and_unknown_buses(bus, capsys):
+    with pytest.raises(SystemExit):
+        main(['grid3', '--no-buses', '--qv', bus])
+    assert '--qv' in capsys.readouterr().err
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from gridcontrol.estimation import KINDS, StateEstimator, synthetic_measurements
+from gridcontrol.grids import load_case
+from gridcontrol.powerflow import newton_raphson
+from gridcontrol.synthetic import synthetic_network
+
+
+@pytest.fixture(scope='module', params=['grid3', 'synthetic300'])
+def case(request):
+    net = load_case(3) if request.param == 'grid3' else synthetic_network(300)
+    truth = newton_raphson(net, tol=1e-10)
+    meas = synthetic_measurements(net, truth.V, seed=1)
+    return net, truth, meas
+
+
+def test_clean_measurements_fit_the_true_state(case):
+    net, truth, meas = case
+    result = StateEstimator(net, meas).estimate(meas)
+    assert result.converged and not len(result.bad) and not result.suspect
+    assert np.abs(result.vm - truth.vm).max() < 0.01
+
+
+def test_gross_errors_are_identified(case):
+    net, truth, meas = case
+    flows = np.flatnonzero(meas.kind == KINDS.index('pf'))
+    injections = np.flatnonzero(meas.kind == KINDS.index('p'))
+    wrong = np.array([flows[len(flows) // 2], injections[-1]])
+    corrupted = synthetic_measurements(net, truth.V, seed=1)
+    corrupted.value[wrong] += 20 * corrupted.sigma[wrong]
+    result = StateEstimator(net, corrupted).estimate(corrupted, candidates=None)
+    assert sorted(result.bad) == sorted(wrong)
+    assert min(result.normalized) > 3.0
+    assert np.abs(result.vm - truth.vm).max() < 0.01
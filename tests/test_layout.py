@@ -0,0 +1,21 @@
+import numpy as np
+
+from gridcontrol import layout
+from gridcontrol.grids import definition
+from gridcontrol.network import Network
+
+
+def test_definition_without_positions_gets_its_own_layout(monkeypatch):
+    def no_disk(*args, **kwargs):
+        raise AssertionError('layout written to disk')
+
+    monkeypatch.setattr(layout.np, 'save', no_disk)
+    defn = {k: getattr(definition(5), k) for k in dir(definition(5)) if k.isupper()}
+    del defn['BUS_POSITIONS']
+    layout.clear_cache()
+    first = Network.from_definition(defn, name='grid5')
+    again = Network.from_definition(defn, name='grid5', study=True)
+    assert first.bus_xyz.flags.writeable and first.bus_xyz.base is None
+    assert np.array_equal(first.bus_xyz, again.bus_xyz)
+    first.bus_xyz[0] += 1.0                        # does not touch the cached layout
+    assert not np.array_equal(first.bus_xyz, again.bus_xyz)
@@ -0,0 +1,37 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import Collection
+
+from gridcontrol.grids import load_case, load_grid
+from gridcontrol.live import LiveDashboard, load_flow_stream
+from gridcontrol.render import draw_network
+
+
+def test_dashboard_updates_drawn_artists():
+    net, case = load_grid(1), load_case(1)
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    artists = draw_network(ax, net)
+    collections, texts = len(ax.collections), len(ax.texts)
+    lines = artists['lines']
+    style = Collection.get_edgecolor(lines).copy()
+    dash = LiveDashboard(ax, net, artists, case)
+    result = next(load_flow_stream(case, steps=1))
+    dash.show(result)
+
+    assert len(ax.collections) == collections and len(ax.texts) == texts + 1
+    vm = dict(zip(case.bus_names, result.vm))
+    for coll, idx in zip(artists['buses'], artists['bus_index']):
+        expected = dash.voltage.to_rgba([vm[name] for name in net.bus_names[idx]])
+        assert np.allclose(Collection.get_facecolor(coll)[:, :3], expected[:, :3])  # style alpha kept
+    for b, text in artists['bus_labels'].items():
+        assert text.get_text().endswith(f'{vm[net.bus_names[b]]:.3f} pu')
+    drawn = dash.branch_map[np.flatnonzero(net.lines)]
+    assert (drawn < 0).any() and (drawn >= 0).any()
+    colors = Collection.get_edgecolor(lines)
+    loading = np.nan_to_num(result.loading)  # unrated branches show as unloaded
+    assert np.allclose(colors[drawn < 0], style)
+    assert np.allclose(colors[drawn >= 0, :3], dash.loading.to_rgba(loading[drawn[drawn >= 0]])[:, :3])
+    plt.close(fig)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from scipy.optimize import root
+
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.network import PQ, SLACK
+from gridcontrol.powerflow import solve
+
+
+def matlab_ybus(net):
+    """Dense Ybus assembled branch by branch as in LFA_Verification.m."""
+    Y = np.zeros((net.n_bus, net.n_bus), dtype=complex)
+    for f, t, r, x, b, on in zip(net.branch_from, net.branch_to, net.branch_r, net.branch_x,
+                                 net.branch_b, net.branch_status):
+        if not on:
+            continue
+        y = 1 / (r + 1j * x)
+        Y[f, t] -= y
+        Y[t, f] -= y
+        Y[f, f] += y + 1j * b / 2
+        Y[t, t] += y + 1j * b / 2
+    return Y
+
+
+def matlab_solution(net):
+    """``(vm, va)`` (pu, degrees) of the LFA_Verification.m mismatch equations.
+
+    The equations are those of the MATLAB scripts (P/Q from G and B, angles
+    of all non-slack buses and magnitudes of the PQ buses unknown); they are
+    solved with a general root finder rather than a power-flow Jacobian.
+    """
+    Y = matlab_ybus(net)
+    G, B = Y.real, Y.imag
+    p_net = (net.pg - net.pd) / net.base_mva
+    q_net = (net.qg - net.qd) / net.base_mva
+    ang = np.flatnonzero(net.bus_type != SLACK)
+    mag = np.flatnonzero(net.bus_type == PQ)
+
+    def state(z):
+        vm, va = net.vm.astype(float), np.deg2rad(net.va)
+        va[ang], vm[mag] = z[:len(ang)], z[len(ang):]
+        return vm, va
+
+    def mismatch(z):
+        vm, va = state(z)
+        d = va[:, None] - va[None, :]
+        vv = vm[:, None] * vm[None, :]
+        p = (vv * (G * np.cos(d) + B * np.sin(d))).sum(1)
+        q = (vv * (G * np.sin(d) - B * np.cos(d))).sum(1)
+        return np.concatenate(((p_net - p)[ang], (q_net - q)[mag]))
+
+    z0 = np.concatenate((np.deg2rad(net.va[ang]), net.vm[mag]))
+    sol = root(mismatch, z0, method='hybr', tol=1e-13)
+    assert sol.success and np.abs(mismatch(sol.x)).max() < 1e-10
+    vm, va = state(sol.x)
+    return vm, np.rad2deg(va)
+
+
+@pytest.mark.parametrize('grid', GRIDS)
+def test_newton_raphson_matches_matlab(grid):
+    net = load_case(grid)
+    vm, va = matlab_solution(net)
+    result = solve(net, 'nr', tol=1e-10)
+    assert result.converged
+    assert np.abs(result.vm - vm).max() < 1e-8
+    assert np.abs(result.va - va).max() < 1e-6
+
+
+@pytest.mark.parametrize('grid', GRIDS)
+@pytest.mark.parametrize('method', ['fdxb', 'fdbx'])
+def test_fast_decoupled_matches_matlab(grid, method):
+    net = load_case(grid)
+    vm, va = matlab_solution(net)
+    result = solve(net, method, tol=1e-9, max_iter=100)
+    assert result.converged
+    assert np.abs(result.vm - vm).max() < 1e-6
+    assert np.abs(result.va - va).max() < 1e-4
+
+
+@pytest.mark.parametrize('grid', GRIDS)
+def test_dc_matches_dense_solve(grid):
+    net = load_case(grid)
+    on = net.branch_status != 0
+    bdc = np.zeros((net.n_bus, net.n_bus))
+    np.add.at(bdc, (net.branch_from[on], net.branch_to[on]), -1 / net.branch_x[on])
+    np.add.at(bdc, (net.branch_to[on], net.branch_from[on]), -1 / net.branch_x[on])
+    np.fill_diagonal(bdc, -bdc.sum(1))
+    ang = np.flatnonzero(net.bus_type != SLACK)
+    p = (net.pg - net.pd) / net.base_mva
+    va = np.zeros(net.n_bus)
+    va[ang] = np.linalg.solve(bdc[np.ix_(ang, ang)], p[ang])
+    result = solve(net, 'dc')
+    assert np.abs(result.va - np.rad2deg(va)).max() < 1e-9
+
+
+def test_singular_jacobian_returns_unconverged():
+    net = load_case(1)
+    net.branch_status[net.branch_names == 'T1 (100 MVA)'] = 0  # islands Bus9
+    result = solve(net, 'nr')
+    assert not result.converged
@@ -0,0 +1,33 @@
+import numpy as np
+
+from gridcontrol.grids import load_case
+from gridcontrol.probabilistic import QuantileSketch, probabilistic_load_flow
+
+
+def test_results_do_not_depend_on_worker_count():
+    net = load_case(3)
+    one = probabilistic_load_flow(net, samples=600, batch=100, workers=1, bins=500)
+    three = probabilistic_load_flow(net, samples=600, batch=100, workers=3, bins=500)
+    assert one.samples + one.failed == 600
+    assert (one.samples, one.failed) == (three.samples, three.failed)
+    for name in ('vm', 'loading', 'flow'):
+        a, b = getattr(one, name), getattr(three, name)
+        assert np.array_equal(a.counts, b.counts)
+        assert np.array_equal(a.min, b.min) and np.array_equal(a.max, b.max)
+        assert np.allclose(a.total, b.total, rtol=1e-12)
+
+
+def test_seed_changes_the_draws():
+    net = load_case(3)
+    a = probabilistic_load_flow(net, samples=200, batch=100, seed=0, bins=500)
+    b = probabilistic_load_flow(net, samples=200, batch=100, seed=1, bins=500)
+    assert not np.array_equal(a.vm.counts, b.vm.counts)
+
+
+def test_sketch_quantiles_within_a_bin():
+    values = np.random.default_rng(0).normal(1.0, 0.02, (5000, 3))
+    sketch = QuantileSketch(0.8, 1.2, 3, bins=4000)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+    q = [0.05, 0.5, 0.95]
+    assert np.abs(sketch.quantile(q) - np.quantile(values, q, axis=0)).max() < 2 * 0.4 / 4000
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.protection import (CTI, CURVE_NAMES, CURVES, MAX_MULTIPLE, RelayTable,
+                                    check_coordination, default_relays, grade, relay_currents,
+                                    trip_times)
+from gridcontrol.shortcircuit import (sequence_currents, sequence_ybus,
+                                      zero_sequence_admittances)
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.ybus import branch_admittances
+
+A = np.exp(2j * np.pi / 3)
+
+
+def reference_currents(net, relays):
+    """Relay currents from dense Zbus inverses and the full phase transform."""
+    z = [np.linalg.inv(y.toarray()) for y in sequence_ybus(net)]
+    diag = [np.diag(zs) for zs in z]
+    seq = sequence_currents(*diag)                                      # (bus, type, seq)
+    to_phase = np.array([[1, 1, 1], [A * A, A, 1], [A, A * A, 1]])
+    out = np.empty((len(relays), net.n_bus, 4))
+    two_ports = (branch_admittances(net), branch_admittances(net), zero_sequence_admittances(net))
+    for r, (br, bus, ground) in enumerate(zip(relays.branch, relays.bus, relays.ground)):
+        at_from = bus == net.branch_from[br]
+        far = net.branch_to[br] if at_from else net.branch_from[br]
+        for f in range(net.n_bus):
+            i_seq = np.empty((4, 3), dtype=complex)
+            for s, (y, zs) in enumerate(zip(two_ports, z)):
+                dv_near, dv_far = -zs[bus, f] * seq[f, :, s], -zs[far, f] * seq[f, :, s]
+                a, b = (y[0][br], y[1][br]) if at_from else (y[3][br], y[2][br])
+                i_seq[:, s] = -(a * dv_near + b * dv_far)
+            phase = np.abs(i_seq @ to_phase.T)
+            out[r, f] = 3 * np.abs(i_seq[:, 2]) if ground else phase.max(axis=1)
+        out[r] *= net.base_mva / (np.sqrt(3) * net.bus_kv[bus]) * 1e3
+    return out
+
+
+@pytest.mark.parametrize('grid', [3, 5])
+@pytest.mark.parametrize('negative_source', [False, True])
+def test_relay_currents_match_dense_reference(grid, negative_source):
+    net = load_case(grid)
+    if negative_source:
+        # Distinct negative-sequence sources take the general phase formulas
+        net.source_z2[:] = np.where(net.bus_type >= 2, 0.05 + 0.3j, np.nan)
+    relays = default_relays(net)
+    relays = relays.replace(ground=np.arange(len(relays)) % 3 == 0)
+    expected = reference_currents(net, relays)
+    assert np.abs(relay_currents(net, relays) - expected).max() < 1e-10 * expected.max()
+
+
+@pytest.mark.parametrize('curve', CURVE_NAMES)
+def test_trip_time_follows_curve(curve):
+    net = load_case(3)
+    relays = RelayTable.from_records(net, [
+        dict(name='R1', branch=0, bus=int(net.branch_from[0]), pickup=100.0, tms=0.25,
+             curve=curve),
+        dict(name='R2', branch=0, bus=int(net.branch_from[0]), pickup=100.0, tms=0.25,
+             curve=curve, inst_pickup=1500.0, inst_delay=0.02)])
+    k, alpha, c = CURVES[curve]
+    amps = np.array([50.0, 100.0, 300.0, 1000.0, 1500.0, 4000.0])
+    m = np.minimum(amps / 100.0, MAX_MULTIPLE)
+    with np.errstate(divide='ignore'):
+        idmt = np.where(m > 1, 0.25 * (k / (m ** alpha - 1) + c), np.inf)
+    times = trip_times(relays, np.vstack((amps, amps)))
+    assert np.allclose(times[0], idmt) and np.isinf(times[0, :2]).all()
+    assert times[0, -1] == 0.25 * (k / (MAX_MULTIPLE ** alpha - 1) + c)   # flat beyond 20x
+    assert np.allclose(times[1], np.where(amps >= 1500.0, np.minimum(idmt, 0.02), idmt))
+
+
+def test_margins_are_backup_minus_primary_times():
+    net = load_case(3)
+    coord = check_coordination(net, default_relays(net))
+    times = coord.times
+    p, b = coord.primary[coord.pair], coord.backup[coord.pair]
+    tp, tb = times[p, coord.fault], times[b, coord.fault]
+    assert len(coord.margins) and np.array_equal(np.isnan(coord.margins), ~np.isfinite(tp))
+    finite = np.isfinite(tp)
+    assert np.allclose(coord.margins[finite], (tb - tp)[finite])
+    assert np.array_equal(coord.fastest, times.min(axis=(1, 2)))
+
+
+@pytest.mark.parametrize('net', [load_case(3), synthetic_network(300)], ids=['grid3', 'synthetic300'])
+def test_grading_meets_cti_or_reports_unresolvable(net):
+    relays = default_relays(net)
+    currents = relay_currents(net, relays)
+    assert len(check_coordination(net, relays, currents=currents).violations)
+    graded = grade(net, relays, currents=currents)
+    coord = check_coordination(net, graded, currents=currents)
+    assert np.all(graded.tms >= relays.tms)
+    with np.errstate(invalid='ignore'):
+        short = coord.margins < CTI - 1e-9
+    assert np.array_equal(np.argwhere(short), coord.violations)
+    # Whatever grading leaves short needs a backup TMS beyond the cap
+    assert np.array_equal(coord.violations, coord.unresolvable())
+    assert len(coord.unresolvable(max_tms=np.inf)) == 0
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.powerflow import bus_sets, newton_raphson
+from gridcontrol.synthetic import synthetic_network
+
+
+def tightened(n_bus, fraction=0.3, seed=0):
+    """Synthetic grid with a ``fraction`` of PV buses limited to half their Qg."""
+    net = synthetic_network(n_bus)
+    _, pv, _ = bus_sets(net.bus_type)
+    qg = newton_raphson(net).qg
+    pick = pv[np.random.default_rng(seed).random(len(pv)) < fraction]
+    net.qmin[pick] = np.minimum(0.5 * qg[pick], 0.0)
+    net.qmax[pick] = np.maximum(0.5 * qg[pick], 0.0)
+    return net
+
+
+@pytest.mark.parametrize('net', [load_case(4), tightened(300), tightened(1000)],
+                         ids=lambda net: net.name)
+def test_limits_hold_at_solution(net):
+    result = newton_raphson(net, q_limits=True)
+    assert result.converged and len(result.q_limited)
+    _, pv, _ = bus_sets(net.bus_type)
+    tol = 1e-6 * net.base_mva
+    held = result.q_limited
+    free = np.setdiff1d(pv, held)
+    qg = result.qg
+    assert (qg[free] <= net.qmax[free] + tol).all() and (qg[free] >= net.qmin[free] - tol).all()
+    assert np.abs(result.vm[free] - net.vm[free]).max(initial=0.0) < 1e-9
+    at_max = np.abs(qg[held] - net.qmax[held]) < tol
+    at_min = np.abs(qg[held] - net.qmin[held]) < tol
+    assert (at_max | at_min).all()
+
+
+def test_out_of_rounds_is_unconverged():
+    net = load_case(4)
+    result = newton_raphson(net, q_limits=True, max_rounds=0)
+    assert not result.converged
+    assert not len(result.q_limited)
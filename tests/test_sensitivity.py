@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.powerflow import solve
+from gridcontrol.sensitivity import clear_cache, lodf, ptdf, sensitivity_factors
+
+
+def dc_flows(net):
+    return solve(net, 'dc').branch_flows()[0].real
+
+
+@pytest.mark.parametrize('grid', [1, 3, 5])
+def test_ptdf_matches_dc_resolve(grid):
+    net = load_case(grid)
+    base = dc_flows(net)
+    factors = ptdf(net)
+    for b in range(net.n_bus):
+        net.pg[b] += 10.0
+        assert np.abs(dc_flows(net) - base - 10.0 * factors[:, b]).max() < 1e-9
+        net.pg[b] -= 10.0
+
+
+@pytest.mark.parametrize('grid', [1, 3, 5])
+def test_lodf_matches_dc_resolve(grid):
+    net = load_case(grid)
+    base = dc_flows(net)
+    factors = lodf(net)
+    for k in range(net.n_branch):
+        if np.isnan(factors[:, k]).any():
+            continue
+        net.branch_status[k] = 0
+        expected = base + factors[:, k] * base[k]
+        assert np.abs(dc_flows(net) - expected).max() < 1e-9
+        net.branch_status[k] = 1
+
+
+def test_double_outage_matches_dc_resolve():
+    net = load_case(1)
+    sens = sensitivity_factors(net, cache=False)
+    post = sens.outage_flows(dc_flows(net), ['Line1', 'Line10'])
+    net.branch_status[[sens.branch('Line1'), sens.branch('Line10')]] = 0
+    assert np.abs(post - dc_flows(net)).max() < 1e-9
+
+
+def test_factors_cached_per_topology():
+    clear_cache()
+    net = load_case(1)
+    first = sensitivity_factors(net)
+    assert sensitivity_factors(net) is first
+    net.branch_status[0] = 0
+    opened = sensitivity_factors(net)
+    assert opened is not first and opened.key != first.key
+    net.branch_status[0] = 1
+    assert sensitivity_factors(net) is first
@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import GRIDS, load_case
+from gridcontrol.shortcircuit import sequence_ybus, zbus_diagonal
+from gridcontrol.synthetic import synthetic_network
+
+
+@pytest.mark.parametrize('net', [load_case(g) for g in GRIDS] + [synthetic_network(300)],
+                         ids=lambda net: net.name)
+def test_zbus_diagonal_matches_dense_inverse(net):
+    for ybus in sequence_ybus(net):
+        z = np.diag(np.linalg.inv(ybus.toarray()))
+        assert np.abs(zbus_diagonal(ybus) - z).max() < 1e-9 * np.abs(z).max()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.powerflow import solve
+from gridcontrol.switching import IncrementalYbus
+from gridcontrol.synthetic import synthetic_network
+from gridcontrol.ybus import make_ybus
+
+
+def assert_matches_rebuild(sw):
+    rebuilt = make_ybus(sw.net).toarray()
+    assert np.abs(sw.ybus.toarray() - rebuilt).max() < 1e-12 * np.abs(rebuilt).max()
+
+
+@pytest.mark.parametrize('net', [load_case(1), load_case(5), synthetic_network(300)],
+                         ids=lambda net: net.name)
+def test_patch_matches_rebuild(net):
+    sw = IncrementalYbus(net)
+    for k in range(0, net.n_branch, max(1, net.n_branch // 8)):
+        sw.open(k)
+        assert_matches_rebuild(sw)
+        sw.set_tap(k, 1.05)
+        sw.update(k, r=2 * net.branch_r[k], b=0.5 * net.branch_b[k])
+        sw.close(k)
+        assert_matches_rebuild(sw)
+
+
+def test_added_branches_match_rebuild():
+    net = load_case(1)
+    sw = IncrementalYbus(net)
+    parallel = sw.add_branch('Bus1', 'Bus2', r=0.2, x=0.6, b=0.001)
+    assert not parallel.pattern_changed
+    assert_matches_rebuild(sw)
+    new = sw.add_branch('Bus1', 'Bus9', r=0.1, x=0.3)
+    assert new.pattern_changed
+    assert_matches_rebuild(sw)
+    sw.open(new.branch)
+    assert_matches_rebuild(sw)
+
+
+def test_dc_factor_update_matches_fresh_solve():
+    net = load_case(1)
+    sw = IncrementalYbus(net)
+    dc = solve(net, 'dc')
+    dc.factors.apply(sw.open('Line6'))
+    patched = solve(net, 'dc', factors=dc.factors)
+    assert np.abs(patched.va - solve(net, 'dc').va).max() < 1e-9
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from gridcontrol.grids import load_case
+from gridcontrol.transient import Disturbance, StabilityModel, run_study
+
+
+@pytest.mark.parametrize('grid', [1, 4])
+def test_bolted_fault_matches_small_impedance(grid):
+    model = StabilityModel(load_case(grid))
+    for bus in np.unique(model.machines.bus):
+        bolted = model.reduce(int(bus))
+        near = model.reduce(int(bus), zf=1e-9)
+        assert np.abs(bolted - near).max() < 1e-6
+
+
+def test_no_disturbance_stays_at_equilibrium():
+    model = StabilityModel(load_case(3))
+    result = model.simulate([Disturbance('none')], t_end=0.5)
+    assert np.abs(result.omega - 1).max() < 1e-10
+    assert np.abs(result.delta - result.delta[:, :1]).max() < 1e-8
+
+
+def test_grid4_faults_cleared_in_100ms_are_stable():
+    result = run_study(load_case(4), workers=1, t_end=1.5)
+    assert result.stable.all()